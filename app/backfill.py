@@ -0,0 +1,70 @@
+import asyncio
+import logging
+import os
+import time
+
+from app import warehouse
+from app.cache import current_season
+from app.espn import box_score, iter_games
+from app.metrics import stage
+from app.scraper import scrape_team_schedule
+
+# Backfill a team season's box scores: read the schedule once, skip finished
+# games the warehouse already has, and fetch the rest concurrently. Progress is
+# streamed as events, one per game in the order games finish, so a client sees
+# each box score as soon as it is parsed:
+#
+#   {"event": "start", "team", "league", "season", "games", "stored", "pending"}
+#   {"event": "game", "game_id", "done", "total", "box_score"}
+#   {"event": "error", "game_id", "done", "total", "error"}
+#   {"event": "done", "fetched", "failed", "skipped", "seconds"}
+#
+# Fetches still go through the page cache and the per-host rate limiter, so
+# the concurrency cap only bounds how many summaries are in flight at once.
+BACKFILL_CONCURRENCY = int(os.environ.get("SCOUTING_BACKFILL_CONCURRENCY", "8"))
+MAX_BACKFILL_CONCURRENCY = 32
+
+
+async def backfill_team_season(team: str, season: str = None, league: str = "ncaab", concurrency: int = None,
+                               box_scores: bool = True):
+    """Yield progress events while a team season's finished games are fetched and stored.
+
+    `season` defaults to the current one. Without `box_scores`, game events only
+    say which game finished, for callers that just want the warehouse filled.
+    """
+    logger = logging.getLogger("uvicorn.error")
+    started = time.perf_counter()
+    schedule = await scrape_team_schedule(team, league, season, seasons_played=False)
+    if "error" in schedule:
+        yield {"event": "error", "error": schedule["error"]}
+        return
+
+    game_ids = list(dict.fromkeys(game["game_id"] for game in schedule["schedule"]
+                                  if game.get("result") and game.get("game_id")))
+    stored = await asyncio.to_thread(warehouse.completed_games, league, game_ids)
+    pending = [game_id for game_id in game_ids if game_id not in stored]
+    yield {"event": "start", "team": team, "league": league, "season": season or str(current_season()),
+           "games": len(game_ids), "stored": len(stored), "pending": len(pending)}
+
+    fetched = failed = 0
+    concurrency = min(concurrency or BACKFILL_CONCURRENCY, MAX_BACKFILL_CONCURRENCY)
+    async for game_id, game in iter_games(pending, league, concurrency):
+        progress = {"game_id": game_id, "done": fetched + failed + 1, "total": len(pending)}
+        if not isinstance(game, Exception):
+            try:
+                with stage("map"):
+                    progress["box_score"] = box_score(game) if box_scores else None
+            except ValueError as e:
+                game = e
+        if isinstance(game, Exception):
+            failed += 1
+            logger.warning(f"Backfilling game {game_id} failed: {game}")
+            yield {"event": "error", **progress, "error": str(game)}
+            continue
+        fetched += 1
+        yield {"event": "game", **progress}
+
+    seconds = round(time.perf_counter() - started, 3)
+    logger.info(f"Backfilled {team} {season} ({league}): {fetched} fetched, {failed} failed, "
+                f"{len(stored)} already stored in {seconds}s")
+    yield {"event": "done", "fetched": fetched, "failed": failed, "skipped": len(stored), "seconds": seconds}
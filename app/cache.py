@@ -0,0 +1,303 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+import tempfile
+import threading
+import time
+from datetime import datetime
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+import httpx
+
+from app import http_client, metrics, ratelimit
+from app.config import CACHE_DIR
+from app.singleflight import SingleFlight
+
+# Shared on-disk page cache for every upstream fetch (sports-reference and ESPN).
+# Entries are keyed by URL and written atomically, so several uvicorn workers can
+# point at the same directory without locking.
+PAGE_DIR = os.path.join(CACHE_DIR, "pages")
+
+# Cap on the page cache's size on disk. Each worker keeps a running total of what it
+# has written; once that passes the cap, the least recently written entries are
+# deleted until the cache is under PRUNE_TO of it. The first write rescans the
+# directory, so a restart enforces the cap on what earlier runs left behind.
+CACHE_MAX_BYTES = int(float(os.environ.get("SCOUTING_CACHE_MAX_MB", "1024")) * 1024 * 1024)
+PRUNE_TO = 0.9
+
+# TTLs in seconds. FOREVER means the page can never change (finished seasons).
+FOREVER = None
+TTL_CURRENT_SEASON = 60 * 60
+TTL_PLAYER_PAGE = 6 * 60 * 60
+TTL_SCHEDULE = 15 * 60
+TTL_LIVE_GAME = 30
+TTL_DEFAULT = 10 * 60
+
+_USE_POLICY = object()
+
+stats = {
+    "hits": 0,
+    "misses": 0,
+    "revalidated": 0,
+    "stale_served": 0,
+    "stores": 0,
+    "evictions": 0,
+}
+
+_size_lock = threading.Lock()
+_cache_bytes = None  # this worker's running total; None until the first scan
+
+
+def current_season(today: datetime = None) -> int:
+    """Season label of the season in progress (e.g. 2025 for 2024–25). Seasons tip off in November."""
+    today = today or datetime.now()
+    return today.year + 1 if today.month >= 10 else today.year
+
+
+def live_season(today: datetime = None) -> int:
+    """Oldest season a player's last row can be from and still count as active.
+
+    Until a returning player's first game of the new season, their last row is
+    from the season before, so that season counts too.
+    """
+    return current_season(today) - 1
+
+
+def _season_ttl(season: str):
+    if int(season) < current_season():
+        return FOREVER
+    return TTL_CURRENT_SEASON
+
+
+def ttl_for_url(url: str):
+    """Pick a TTL from the shape of the URL: past seasons are immutable, live data expires fast."""
+    match = re.search(r"/cbb/seasons/(?:men/)?(\d{4})-", url)
+    if match:
+        return _season_ttl(match.group(1))
+    match = re.search(r"/cbb/schools/[^/]+/(?:men/)?(\d{4})\.html", url)
+    if match:
+        return _season_ttl(match.group(1))
+    match = re.search(r"/schedule/_/id/\d+/season/(\d{4})", url)
+    if match:
+        return _season_ttl(match.group(1))
+    if "/cbb/players/" in url:
+        return TTL_PLAYER_PAGE
+    if "/summary?event=" in url or "/boxscore/" in url:
+        return TTL_LIVE_GAME
+    if "/schedule/" in url or "/team/stats/" in url:
+        return TTL_SCHEDULE
+    return TTL_DEFAULT
+
+
+class CachedResponse:
+    """The subset of an HTTP response the scrapers use, backed by a cache entry."""
+
+    def __init__(self, url: str, status_code: int, text: str, headers: dict = None, from_cache: bool = False,
+                 fetched_at: float = None):
+        self.url = url
+        self.status_code = status_code
+        self.text = text
+        self.headers = headers or {}
+        self.from_cache = from_cache
+        self.fetched_at = fetched_at or time.time()  # when upstream last sent (or confirmed) this text
+
+    def json(self):
+        return json.loads(self.text)
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise httpx.HTTPError(f"{self.status_code} Error for url: {self.url}")
+
+
+def _key(url: str) -> str:
+    return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+
+def _path(url: str) -> str:
+    key = _key(url)
+    return os.path.join(PAGE_DIR, key[:2], key)
+
+
+def read_entry(url: str):
+    """Return the cached entry for `url` as a dict (meta fields plus `body`), or None."""
+    try:
+        with open(_path(url), "r", encoding="utf-8") as f:
+            meta = json.loads(f.readline())
+            meta["body"] = f.read()
+            return meta
+    except (OSError, ValueError):
+        return None
+
+
+def write_entry(url: str, entry: dict):
+    """Atomically store an entry; readers in other workers see either the old or the new file."""
+    path = _path(url)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    meta = {k: v for k, v in entry.items() if k != "body"}
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(json.dumps(meta) + "\n")
+            f.write(entry["body"])
+        size = os.path.getsize(tmp_path)
+        replaced = os.path.getsize(path) if os.path.exists(path) else 0
+        os.replace(tmp_path, path)
+    except OSError:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    stats["stores"] += 1
+    _account(size - replaced)
+
+
+def _account(written: int):
+    """Count bytes written towards CACHE_MAX_BYTES, pruning once this worker's total passes it."""
+    global _cache_bytes
+    with _size_lock:
+        if _cache_bytes is not None:
+            _cache_bytes += written
+        over = _cache_bytes is None or _cache_bytes > CACHE_MAX_BYTES
+    if over:
+        prune_cache()
+
+
+def prune_cache(max_bytes: int = None) -> int:
+    """Delete the least recently written entries until the cache is under PRUNE_TO of `max_bytes`.
+
+    Returns the bytes freed. Files other workers delete meanwhile are skipped.
+    """
+    global _cache_bytes
+    max_bytes = CACHE_MAX_BYTES if max_bytes is None else max_bytes
+    with _size_lock:
+        files = []
+        for root, _, names in os.walk(PAGE_DIR):
+            for name in names:
+                path = os.path.join(root, name)
+                try:
+                    info = os.stat(path)
+                except OSError:
+                    continue
+                files.append((info.st_mtime, info.st_size, path))
+        total = sum(size for _, size, _ in files)
+        freed = 0
+        if total > max_bytes:
+            files.sort()
+            for _, size, path in files:
+                if total - freed <= max_bytes * PRUNE_TO:
+                    break
+                try:
+                    os.remove(path)
+                except OSError:
+                    continue
+                freed += size
+                stats["evictions"] += 1
+        _cache_bytes = total - freed
+    return freed
+
+
+async def mark_immutable(url: str):
+    """Pin an already cached page forever, e.g. once a game is known to be final."""
+    entry = await asyncio.to_thread(read_entry, url)
+    if entry and entry.get("ttl", FOREVER) is not FOREVER:
+        entry["ttl"] = FOREVER
+        await asyncio.to_thread(write_entry, url, entry)
+
+
+def _is_fresh(entry: dict) -> bool:
+    ttl = entry.get("ttl")
+    if ttl is FOREVER:
+        return True
+    return time.time() - entry.get("fetched_at", 0) < ttl
+
+
+_fetches = SingleFlight("upstream_fetch")
+
+
+def normalize_url(url: str) -> str:
+    """Canonical form of a URL for coalescing: lowercase host, sorted query, no fragment."""
+    parts = urlsplit(url)
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path, query, ""))
+
+
+async def fetch(url: str, headers: dict = None, ttl=_USE_POLICY, timeout: float = None) -> CachedResponse:
+    """GET `url` through the page cache.
+
+    Fresh entries are served from disk. Stale entries are revalidated upstream with
+    ETag/If-Modified-Since, and served as-is if upstream is unreachable. Only 200
+    responses are stored. Concurrent fetches of the same URL share one request.
+    """
+    with metrics.stage("fetch"):
+        return await _fetches.do(normalize_url(url), lambda: _fetch(url, headers, ttl, timeout))
+
+
+async def _fetch(url: str, headers: dict, ttl, timeout: float) -> CachedResponse:
+    logger = logging.getLogger("uvicorn.error")
+    if ttl is _USE_POLICY:
+        ttl = ttl_for_url(url)
+
+    entry = await asyncio.to_thread(read_entry, url)
+    if entry and _is_fresh(entry):
+        stats["hits"] += 1
+        return CachedResponse(url, 200, entry["body"], entry.get("headers"), from_cache=True,
+                              fetched_at=entry.get("fetched_at"))
+
+    request_headers = dict(headers or {})
+    if entry:
+        if entry.get("etag"):
+            request_headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            request_headers["If-Modified-Since"] = entry["last_modified"]
+
+    try:
+        response = await http_client.get(url, headers=request_headers, timeout=timeout)
+    except httpx.HTTPError as e:
+        if entry:
+            logger.warning(f"Upstream failed for {url} ({e}), serving stale copy")
+            stats["stale_served"] += 1
+            return CachedResponse(url, 200, entry["body"], entry.get("headers"), from_cache=True,
+                                  fetched_at=entry.get("fetched_at"))
+        raise
+
+    if response.status_code in ratelimit.RETRY_STATUSES and entry:
+        logger.warning(f"Upstream returned {response.status_code} for {url}, serving stale copy")
+        stats["stale_served"] += 1
+        return CachedResponse(url, 200, entry["body"], entry.get("headers"), from_cache=True,
+                              fetched_at=entry.get("fetched_at"))
+
+    if response.status_code == 304 and entry:
+        stats["revalidated"] += 1
+        entry["fetched_at"] = time.time()
+        entry["ttl"] = ttl
+        await asyncio.to_thread(write_entry, url, entry)
+        return CachedResponse(url, 200, entry["body"], entry.get("headers"), from_cache=True,
+                              fetched_at=entry.get("fetched_at"))
+
+    stats["misses"] += 1
+    if response.status_code == 200:
+        await asyncio.to_thread(write_entry, url, {
+            "url": url,
+            "fetched_at": time.time(),
+            "ttl": ttl,
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "headers": {"Content-Type": response.headers.get("Content-Type", "")},
+            "body": response.text,
+        })
+    return CachedResponse(url, response.status_code, response.text, dict(response.headers))
+
+
+def cache_stats() -> dict:
+    """Hit/miss counters for this worker process."""
+    lookups = stats["hits"] + stats["misses"] + stats["revalidated"] + stats["stale_served"]
+    served_from_cache = lookups - stats["misses"]
+    return {
+        **stats,
+        "hit_ratio": round(served_from_cache / lookups, 3) if lookups else None,
+        "pid": os.getpid(),
+        "cache_dir": CACHE_DIR,
+        "max_bytes": CACHE_MAX_BYTES,
+    }
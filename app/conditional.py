@@ -0,0 +1,117 @@
+import gzip
+import hashlib
+import zlib
+from contextvars import ContextVar
+from email.utils import formatdate, parsedate_to_datetime
+
+try:
+    import brotli
+except ImportError:
+    try:
+        import brotlicffi as brotli
+    except ImportError:
+        brotli = None
+
+# Conditional GET and compression for JSON responses.
+#
+# While a request runs, the loaders note which cached data they served (a player
+# page, a season table, a game summary...) and its version. json_response turns
+# those into an ETag/Last-Modified before serializing, so a client whose copy is
+# still current gets a 304 without the body ever being built. Bodies that are
+# sent are gzip- or brotli-compressed when they are large enough to be worth it.
+COMPRESS_MIN_SIZE = 1024
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+_request = ContextVar("conditional_request", default=None)
+
+
+class RequestState:
+    __slots__ = ("target", "headers", "sources")
+
+    def __init__(self, scope: dict):
+        query = scope.get("query_string", b"").decode("latin-1")
+        self.target = scope.get("path", "") + ("?" + query if query else "")
+        self.headers = {key.decode("latin-1").lower(): value.decode("latin-1") for key, value in scope.get("headers", [])}
+        self.sources = {}
+
+
+class ConditionalMiddleware:
+    """Give each HTTP request a RequestState that loaders can note their sources on."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        token = _request.set(RequestState(scope))
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _request.reset(token)
+
+
+def note_source(key: str, version, modified: float = None):
+    """Record that this request's response is built from `key` at `version`; a no-op outside requests."""
+    state = _request.get()
+    if state is not None:
+        state.sources[key] = (version, modified)
+
+
+def text_version(text: str) -> int:
+    """Version of raw upstream text that has no timestamp of its own."""
+    return zlib.crc32(text.encode("utf-8"))
+
+
+def note_text(key: str, text: str):
+    """note_source for raw upstream text, versioned by text_version."""
+    note_source(key, text_version(text))
+
+
+def validators():
+    """(ETag, Last-Modified) for the current request from its noted sources, or None if it has none."""
+    state = _request.get()
+    if state is None or not state.sources:
+        return None
+    digest = hashlib.sha1(state.target.encode("utf-8"))
+    for key in sorted(state.sources):
+        digest.update(f"\0{key}\0{state.sources[key][0]}".encode("utf-8"))
+    modified = [m for _, m in state.sources.values()]
+    last_modified = formatdate(max(modified), usegmt=True) if all(modified) else None
+    return f'W/"{digest.hexdigest()[:20]}"', last_modified
+
+
+def not_modified(etag: str, last_modified: str) -> bool:
+    """True if the request's If-None-Match / If-Modified-Since says the client's copy is current."""
+    headers = _request.get().headers
+    if_none_match = headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = [tag.strip() for tag in if_none_match.split(",")]
+        return "*" in tags or any(tag.removeprefix("W/") == etag.removeprefix("W/") for tag in tags)
+    if_modified_since = headers.get("if-modified-since")
+    if if_modified_since and last_modified:
+        try:
+            return parsedate_to_datetime(last_modified) <= parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def compress(response):
+    """Encode a rendered response's body with brotli or gzip if the client accepts it and it's large."""
+    state = _request.get()
+    if state is None or len(response.body) < COMPRESS_MIN_SIZE or "content-encoding" in response.headers:
+        return response
+    accepted = {part.split(";")[0].strip() for part in state.headers.get("accept-encoding", "").split(",")}
+    if brotli is not None and "br" in accepted:
+        body, encoding = brotli.compress(response.body, quality=BROTLI_QUALITY), "br"
+    elif "gzip" in accepted:
+        body, encoding = gzip.compress(response.body, compresslevel=GZIP_LEVEL), "gzip"
+    else:
+        return response
+    response.body = body
+    response.headers["content-length"] = str(len(body))
+    response.headers["content-encoding"] = encoding
+    response.headers["vary"] = "Accept-Encoding"
+    return response
@@ -0,0 +1,18 @@
+import os
+
+# Directory shared by all worker processes for cached pages and limiter state. Kept in
+# the user cache dir rather than the repo, which main.py serves under /static.
+CACHE_DIR = os.environ.get(
+    "SCOUTING_CACHE_DIR",
+    os.path.join(os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"), "sdsu-scouting"),
+)
+
+# Upstream base URLs. Overridable so the benchmarks can point the scrapers at a local stub.
+SPORTS_REFERENCE_URL = os.environ.get("SCOUTING_SPORTS_REFERENCE_URL", "https://www.sports-reference.com").rstrip("/")
+ESPN_URL = os.environ.get("SCOUTING_ESPN_URL", "https://www.espn.com").rstrip("/")
+ESPN_API_URL = os.environ.get("SCOUTING_ESPN_API_URL", "https://site.api.espn.com").rstrip("/")
+
+# Seconds the background refresher and prefetcher wait after a worker starts before
+# their first run, so a restart (or every --reload) serves requests before it
+# spends CPU and rate-limit tokens upstream
+STARTUP_DELAY = float(os.environ.get("SCOUTING_STARTUP_DELAY", "30"))
@@ -0,0 +1,262 @@
+import asyncio
+import logging
+import os
+import time
+
+from app import warehouse
+from app.cache import fetch, mark_immutable, TTL_LIVE_GAME
+from app.config import ESPN_API_URL
+from app.conditional import note_source
+from app.http_client import BROWSER_HEADERS
+from app.loader import CachedLoader
+from app.metrics import stage
+from app.schema import BoxScore, PlayerBoxScore, TeamTotals
+from app.singleflight import SingleFlight
+from app.teams import resolve_team, get_resolver
+
+# ESPN's summary API returns box score, plays and game info for a game in one JSON
+# payload. Every game-level endpoint is a projection of that payload, so each game
+# is fetched and decoded once per league.
+ESPN_LEAGUES = {
+    "nba": "nba",
+    "ncaab": "mens-college-basketball",
+}
+
+ESPN_SUMMARY_URL = ESPN_API_URL + "/apis/site/v2/sports/basketball/{league}/summary?event={game_id}"
+
+# Every men's college team with its ESPN id, for teams the bundled team data has no id for.
+# Off by default so team lookups stay offline; set SCOUTING_ESPN_TEAM_LIST=1 to fetch it
+# while app/data/teams.json is missing teams.
+ESPN_TEAMS_URL = ESPN_API_URL + "/apis/site/v2/sports/basketball/mens-college-basketball/teams?limit=500"
+ESPN_TEAM_LIST = os.environ.get("SCOUTING_ESPN_TEAM_LIST", "0") == "1"
+TTL_TEAM_LIST = 24 * 60 * 60
+
+MAX_GAMES = 512
+
+# How many game summaries a season-wide request may fetch at once
+GAME_CONCURRENCY = int(os.environ.get("SCOUTING_GAME_CONCURRENCY", "4"))
+
+# Box score column labels -> PlayerBoxScore/TeamTotals fields
+BOX_SCORE_LABELS = {
+    "MIN": "minutes",
+    "FG": "fg",
+    "3PT": "threept",
+    "FT": "ft",
+    "OREB": "oreb",
+    "DREB": "dreb",
+    "REB": "reb",
+    "AST": "ast",
+    "STL": "stl",
+    "BLK": "blk",
+    "TO": "to",
+    "PF": "pf",
+    "+/-": "plus_minus",
+    "PTS": "pts",
+}
+
+
+class GameSummary:
+    __slots__ = ("game_id", "league", "data", "completed", "loaded_at")
+
+    def __init__(self, game_id: str, league: str, data: dict, loaded_at: float = None):
+        self.game_id = game_id
+        self.league = league
+        self.data = data
+        self.completed = competition(data).get("status", {}).get("type", {}).get("completed", False)
+        self.loaded_at = loaded_at or time.time()
+
+
+def competition(data: dict) -> dict:
+    return (data.get("header", {}).get("competitions") or [{}])[0]
+
+
+def _is_fresh(game: GameSummary) -> bool:
+    return game.completed or time.time() - game.loaded_at < TTL_LIVE_GAME
+
+
+# Keyed by (league, game id)
+_games = CachedLoader("espn_summary", lambda key: warehouse.game_payload(*key),
+                      lambda key, stored: GameSummary(key[1], key[0], stored["data"], stored["updated_at"]),
+                      lambda key: _fetch_game(key[1], key[0]), _is_fresh, MAX_GAMES)
+
+
+async def load_game(game_id: str, league: str = "ncaab", refresh: bool = False) -> GameSummary:
+    """The decoded summary payload for a game; finished games are kept for good.
+
+    Games come from memory, then the warehouse, then upstream. `refresh` skips
+    straight to upstream.
+    """
+    if league not in ESPN_LEAGUES:
+        raise ValueError(f"Unknown league: {league}")
+    game = await _games.load((league, str(game_id)), refresh)
+    note_source(f"game:{league}:{game_id}", game.loaded_at, game.loaded_at)
+    return game
+
+
+async def iter_games(game_ids: list, league: str = "ncaab", concurrency: int = None):
+    """Yield (game_id, GameSummary or the raised exception) as each game finishes loading.
+
+    At most `concurrency` summaries are fetched at once. Loads still pending
+    when the caller stops iterating (or is cancelled) are cancelled.
+    """
+    semaphore = asyncio.Semaphore(concurrency or GAME_CONCURRENCY)
+
+    async def load(game_id):
+        async with semaphore:
+            try:
+                return game_id, await load_game(game_id, league)
+            except Exception as e:
+                return game_id, e
+
+    tasks = [asyncio.ensure_future(load(game_id)) for game_id in game_ids]
+    try:
+        for task in asyncio.as_completed(tasks):
+            yield await task
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+_team_list_loaded_at = None
+_team_list_loads = SingleFlight("espn_teams")
+
+
+async def resolve_espn_team(query: str):
+    """The Team for `query` if it has an ESPN id, else None.
+
+    With ESPN_TEAM_LIST on, teams the bundled data knows without an id (or
+    doesn't know at all) are looked up in ESPN's team list, fetched at most
+    once a day.
+    """
+    team = resolve_team(query)
+    if team and team.espn_id:
+        return team
+    if not ESPN_TEAM_LIST:
+        return None
+    try:
+        await _team_list_loads.do("teams", load_team_list)
+    except Exception as e:
+        logging.getLogger("uvicorn.error").warning(f"Loading ESPN's team list failed: {e}")
+    team = resolve_team(query)
+    return team if team and team.espn_id else None
+
+
+async def load_team_list():
+    """Add every team in ESPN's team list to the resolver, unless it was loaded within TTL_TEAM_LIST."""
+    global _team_list_loaded_at
+    if _team_list_loaded_at and time.time() - _team_list_loaded_at < TTL_TEAM_LIST:
+        return
+    response = await fetch(ESPN_TEAMS_URL, headers=BROWSER_HEADERS, ttl=TTL_TEAM_LIST)
+    if response.status_code != 200:
+        raise ValueError(f"Team list not found: {ESPN_TEAMS_URL}")
+    resolver = get_resolver()
+    for league in response.json()["sports"][0]["leagues"]:
+        for entry in league["teams"]:
+            resolver.add_espn_team(entry["team"])
+    _team_list_loaded_at = time.time()
+
+
+async def _fetch_game(game_id: str, league: str) -> GameSummary:
+    url = ESPN_SUMMARY_URL.format(league=ESPN_LEAGUES[league], game_id=game_id)
+    response = await fetch(url, headers=BROWSER_HEADERS)
+    if response.status_code != 200:
+        raise ValueError(f"Game {game_id} not found: {url}")
+
+    with stage("parse"):
+        game = GameSummary(game_id, league, response.json())
+    if game.completed:
+        await mark_immutable(url)
+    await asyncio.to_thread(store_game, game)
+    return game
+
+
+def store_game(game: GameSummary):
+    """Write a game and its box score lines and plays to the warehouse."""
+    try:
+        lines = {team: [line.dict() for line in players] for team, players in box_score(game).teams.items()}
+    except ValueError:
+        lines = {}  # not tipped off yet
+    warehouse.store_game(game.league, game.game_id, game_meta(game), game.data, lines, game.data.get("plays", []),
+                         game.loaded_at)
+
+
+def play_by_play_teams(data: dict):
+    """(home abbreviation, away abbreviation) from an ESPN summary payload, or None."""
+    competitors = competition(data).get('competitors', [])
+    if len(competitors) < 2:
+        return None
+
+    home_team = next((c for c in competitors if c.get("homeAway") == "home"), competitors[0])
+    away_team = next((c for c in competitors if c.get("homeAway") == "away"), competitors[1])
+
+    home_abbr = home_team.get('team', {}).get('abbreviation', 'HOME')
+    away_abbr = away_team.get('team', {}).get('abbreviation', 'AWAY')
+    return home_abbr, away_abbr
+
+
+def iter_plays(data: dict, teams: tuple, reverse: bool = True):
+    """Yield plays in one pass; latest first when `reverse`, as the endpoints always returned them."""
+    home_abbr, away_abbr = teams
+    plays = data['plays']
+    for play in (reversed(plays) if reverse else plays):
+        yield {
+            'period': play.get('period', {}).get('number', ''),
+            'clock': play.get('clock', {}).get('displayValue', ''),
+            'description': play.get('text', ''),
+            'team': play.get('team', {}).get('displayName', ''),
+            home_abbr: play.get('homeScore', ''),
+            away_abbr: play.get('awayScore', '')
+        }
+
+
+def game_meta(game: GameSummary) -> dict:
+    comp = competition(game.data)
+    meta = {
+        "game_id": game.game_id,
+        "league": game.league,
+        "date": comp.get("date"),
+        "completed": game.completed,
+        "status": comp.get("status", {}).get("type", {}).get("description"),
+        "conference_game": comp.get("conferenceCompetition"),
+        "neutral_site": comp.get("neutralSite"),
+        "venue": game.data.get("gameInfo", {}).get("venue", {}).get("fullName"),
+    }
+    for competitor in comp.get("competitors", []):
+        side = competitor.get("homeAway")
+        if side not in ("home", "away"):
+            continue
+        team = competitor.get("team", {})
+        meta[f"{side}_team"] = team.get("displayName")
+        meta[f"{side}_abbr"] = team.get("abbreviation")
+        meta[f"{side}_team_id"] = team.get("id")
+        score = competitor.get("score")
+        meta[f"{side}_score"] = int(score) if score and str(score).isdigit() else None
+    return meta
+
+
+def box_score(game: GameSummary) -> BoxScore:
+    """Project the summary's box score onto the BoxScore/PlayerBoxScore/TeamTotals schemas."""
+    teams = {}
+    team_stats = {}
+    for team_block in game.data.get("boxscore", {}).get("players", []):
+        team_name = team_block.get("team", {}).get("displayName", "")
+        players = []
+        for stat_group in team_block.get("statistics", []):
+            fields = [BOX_SCORE_LABELS.get(label) for label in stat_group.get("labels") or stat_group.get("names", [])]
+            for athlete in stat_group.get("athletes", []):
+                stats = athlete.get("stats") or []
+                if athlete.get("didNotPlay") or len(stats) < len(fields):
+                    continue
+                row = {field: value for field, value in zip(fields, stats) if field}
+                row["name"] = athlete.get("athlete", {}).get("displayName", "")
+                row["starter"] = athlete.get("starter")
+                players.append(PlayerBoxScore(**row))
+            totals = stat_group.get("totals") or []
+            if len(totals) >= len(fields):
+                row = {field: value for field, value in zip(fields, totals) if field and field != "plus_minus"}
+                team_stats[team_name] = TeamTotals(**row)
+        teams[team_name] = players
+
+    if not any(teams.values()):
+        raise ValueError("No valid player data found")
+    return BoxScore(game_id=game.game_id, game=game_meta(game), teams=teams, team_stats=team_stats)
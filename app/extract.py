@@ -0,0 +1,27 @@
+import re
+
+from app.metrics import stage
+
+
+def find_table_html(html: str, table_id: str):
+    """Return the raw `<table id=...>...</table>` markup for `table_id`, or None.
+
+    sports-reference ships most tables inside HTML comments. Searching the raw text
+    finds them either way without parsing the rest of the page.
+    """
+    with stage("unwrap"):
+        match = re.search(r'<table\b[^>]*\bid="%s"' % re.escape(table_id), html)
+        if not match:
+            return None
+        end = html.find("</table>", match.end())
+        if end == -1:
+            return None
+        return html[match.start():end + len("</table>")]
+
+
+def extract_heading(html: str):
+    """Text of the first <h1>, e.g. the player's name on a player page."""
+    match = re.search(r"<h1\b[^>]*>(.*?)</h1>", html, re.S)
+    if not match:
+        return None
+    return re.sub(r"<[^>]+>", "", match.group(1)).strip() or None
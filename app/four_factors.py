@@ -0,0 +1,143 @@
+import logging
+
+from app.metrics import stage
+from app.schema import StatRows
+from app.school_stats import load_opponent_stats, load_school_stats
+from app.singleflight import SingleFlight
+
+# Dean Oliver's Four Factors and per-possession efficiency for every Division I
+# team in a season, computed column-wise with numpy over the season's school
+# stats and opponent stats tables.
+#
+# Possessions use the college free throw weight: FGA - ORB + TOV + 0.475 * FTA,
+# averaged with the opponents' estimate when the opponent table has it.
+# Offensive factors: eFG% (FG + 0.5 * 3P) / FGA, TOV% per possession, ORB%
+# ORB / (ORB + opponent DRB) and FT rate FT / FGA; the defensive factors are the
+# same measured on opponents, with DRB% in place of ORB%. Percentiles rank each
+# team nationally from 0 (worst) to 100 (best), so for turnovers, defensive
+# rating and the opponent factors a lower value ranks higher; faster tempo ranks
+# higher.
+FT_WEIGHT = 0.475
+
+RATINGS = ("offensive_rating", "defensive_rating", "net_rating")
+FACTORS = ("efg_pct", "tov_pct", "orb_pct", "ft_rate", "opp_efg_pct", "opp_tov_pct", "drb_pct", "opp_ft_rate")
+# Ranked so that lower values get the higher percentile
+LOWER_IS_BETTER = {"defensive_rating", "tov_pct", "opp_efg_pct", "opp_ft_rate"}
+RANKED = RATINGS + FACTORS + ("tempo",)
+# Opponent-table stats used, without their opp_ prefix
+OPPONENT_STATS = ("fg", "fga", "fg3", "ft", "fta", "orb", "trb", "tov")
+
+FIELDS = ["school_name", "slug", "season", "games", "possessions", "tempo", *RATINGS, *FACTORS,
+          *(f"{metric}_pctile" for metric in RANKED)]
+
+# season -> (school stats loaded_at, opponent stats loaded_at, StatRows)
+_ratings = {}
+_computes = SingleFlight("four_factors")
+
+
+def percentiles(values, lower_is_better: bool = False):
+    """0-100 national rank of each value in a float array, ties sharing their average rank; NaN stays NaN."""
+    import numpy as np
+
+    valid = values[~np.isnan(values)]
+    result = np.full(values.shape, np.nan)
+    if len(valid) < 2:
+        return result
+    ordered = np.sort(valid)
+    below = np.searchsorted(ordered, values, "left")
+    at_or_below = np.searchsorted(ordered, values, "right")
+    rank = (below + at_or_below - 1) / 2 / (len(valid) - 1) * 100
+    if lower_is_better:
+        rank = 100 - rank
+    return np.where(np.isnan(values), np.nan, rank)
+
+
+def compute_four_factors(table, opponents=None) -> StatRows:
+    """Ratings and factors for every row of a SchoolStatsTable; `opponents` is the same season's opponent table."""
+    import numpy as np
+
+    def column(source, stat, rows=None):
+        values = np.array(source.numeric.get(stat, [None] * len(source)), dtype=float)
+        if rows is None:
+            return values
+        return np.where(rows >= 0, values[rows], np.nan)
+
+    if opponents is not None:
+        # Opponent rows in school-table order; -1 where a school has no opponent row
+        rows = np.array([opponents.by_slug.get(slug, -1) if slug else -1 for slug in table.slugs], dtype=int)
+        opp = {stat: column(opponents, f"opp_{stat}", rows) for stat in OPPONENT_STATS}
+    else:
+        opp = {stat: np.full(len(table), np.nan) for stat in OPPONENT_STATS}
+
+    games, pts, opp_pts = column(table, "g"), column(table, "pts"), column(table, "opp_pts")
+    fg, fga, fg3 = column(table, "fg"), column(table, "fga"), column(table, "fg3")
+    ft, fta, orb, trb, tov = (column(table, stat) for stat in ("ft", "fta", "orb", "trb", "tov"))
+    drb, opp_drb = trb - orb, opp["trb"] - opp["orb"]
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        own = fga - orb + tov + FT_WEIGHT * fta
+        theirs = opp["fga"] - opp["orb"] + opp["tov"] + FT_WEIGHT * opp["fta"]
+        possessions = np.where(np.isnan(theirs), own, (own + theirs) / 2)
+        metrics = {
+            "possessions": possessions,
+            "tempo": possessions / games,
+            "offensive_rating": 100 * pts / possessions,
+            "defensive_rating": 100 * opp_pts / possessions,
+            "efg_pct": (fg + 0.5 * fg3) / fga,
+            "tov_pct": tov / own,
+            "orb_pct": orb / (orb + opp_drb),
+            "ft_rate": ft / fga,
+            "opp_efg_pct": (opp["fg"] + 0.5 * opp["fg3"]) / opp["fga"],
+            "opp_tov_pct": opp["tov"] / theirs,
+            "drb_pct": drb / (drb + opp["orb"]),
+            "opp_ft_rate": opp["ft"] / opp["fga"],
+        }
+        metrics["net_rating"] = metrics["offensive_rating"] - metrics["defensive_rating"]
+    for name, values in metrics.items():
+        metrics[name] = np.where(np.isfinite(values), values, np.nan)
+    for metric in RANKED:
+        metrics[f"{metric}_pctile"] = percentiles(metrics[metric], metric in LOWER_IS_BETTER)
+
+    # Fractions to 4 places, everything else to 1
+    rounded = {name: np.round(values, 4 if name in FACTORS else 1) for name, values in metrics.items()}
+    columns = [rounded[field].tolist() if field in rounded else None for field in FIELDS]
+    columns[0], columns[1], columns[2] = table.names, table.slugs, [table.season] * len(table)
+    columns[3] = [None if g != g else int(g) for g in games.tolist()]
+    ratings = StatRows(FIELDS)
+    ratings.rows = [tuple(None if value != value else value for value in row) for row in zip(*columns)]
+    return ratings
+
+
+async def load_four_factors(season: str) -> StatRows:
+    """Every team's ratings for a season, recomputed only when either source table was reloaded."""
+    season = str(season)
+    table = await load_school_stats(season)
+    try:
+        opponents = await load_opponent_stats(season)
+    except Exception as e:
+        logging.getLogger("uvicorn.error").warning(f"No opponent stats for {season}, skipping defensive factors: {e}")
+        opponents = None
+    versions = (table.loaded_at, opponents.loaded_at if opponents else None)
+    cached = _ratings.get(season)
+    if cached and cached[:2] == versions:
+        ratings = cached[2]
+    else:
+        ratings = await _computes.do((season, versions), lambda: _compute(season, table, opponents, versions))
+    return ratings
+
+
+async def team_four_factors(team: str, season: str) -> dict:
+    """One team's row of load_four_factors, looked up like scrape_basic_team_stats."""
+    ratings = await load_four_factors(season)
+    i = (await load_school_stats(season)).lookup(team)
+    if i is None:
+        raise ValueError(f"Team {team} not found in {season} stats.")
+    return dict(zip(ratings.fields, ratings.rows[i]))
+
+
+async def _compute(season: str, table, opponents, versions: tuple) -> StatRows:
+    with stage("map"):
+        ratings = compute_four_factors(table, opponents)
+    if opponents is not None:  # retry the opponent table next time instead of keeping a partial result
+        _ratings[season] = (*versions, ratings)
+    return ratings
@@ -0,0 +1,88 @@
+import asyncio
+import importlib.util
+import logging
+from urllib.parse import urlsplit
+
+import httpx
+
+from app import metrics, ratelimit
+
+# One pooled client per worker process, shared by every scraper. Connections to
+# sports-reference and ESPN are kept alive between requests, and HTTP/2 is used
+# when the `h2` package is installed.
+HTTP2 = importlib.util.find_spec("h2") is not None
+BROTLI = importlib.util.find_spec("brotli") is not None or importlib.util.find_spec("brotlicffi") is not None
+
+DEFAULT_TIMEOUT = httpx.Timeout(15.0, connect=5.0)
+LIMITS = httpx.Limits(max_connections=20, max_keepalive_connections=10, keepalive_expiry=30.0)
+
+# Sent with every scraper request; ESPN serves its HTML pages only to browser-like clients
+BROWSER_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/58.0.3029.110 Safari/537.36",
+    "Accept-Language": "en-US,en;q=0.9",
+    "Accept-Encoding": "gzip, deflate, br",
+    "Connection": "keep-alive",
+    "Upgrade-Insecure-Requests": "1",
+}
+
+_client = None
+
+
+def get_client() -> httpx.AsyncClient:
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            http2=HTTP2,
+            timeout=DEFAULT_TIMEOUT,
+            limits=LIMITS,
+            follow_redirects=True,
+        )
+    return _client
+
+
+async def close_client():
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+async def get(url: str, headers: dict = None, timeout: float = None, reserve: float = 0.0) -> httpx.Response:
+    """GET through the shared client under the host's rate limit.
+
+    429 and 5xx responses and transport errors are retried with jittered
+    exponential backoff, honoring Retry-After. `timeout` overrides the default
+    read timeout; `reserve` is passed to the limiter for background callers.
+    """
+    logger = logging.getLogger("uvicorn.error")
+    headers = dict(headers or {})
+    if not BROTLI and "br" in headers.get("Accept-Encoding", ""):
+        # We couldn't decode a brotli body, so don't ask for one
+        headers["Accept-Encoding"] = "gzip, deflate"
+    request_timeout = httpx.Timeout(timeout, connect=5.0) if timeout else DEFAULT_TIMEOUT
+
+    host = urlsplit(url).hostname or ""
+    for attempt in range(ratelimit.MAX_RETRIES + 1):
+        await ratelimit.acquire(url, reserve)
+        try:
+            with metrics.stage("upstream"), metrics.in_flight("scouting_upstream_requests_in_flight", host=host):
+                response = await get_client().get(url, headers=headers, timeout=request_timeout)
+        except httpx.TransportError as e:
+            metrics.inc("scouting_upstream_requests_total", host=host, status="error")
+            if attempt == ratelimit.MAX_RETRIES:
+                raise
+            delay = ratelimit.backoff_delay(attempt)
+            logger.warning(f"{url} failed ({e}), retrying in {delay:.1f}s")
+        else:
+            metrics.inc("scouting_upstream_requests_total", host=host, status=response.status_code)
+            if response.status_code not in ratelimit.RETRY_STATUSES:
+                return response
+            retry_after = ratelimit.retry_after_seconds(response.headers.get("Retry-After"))
+            if response.status_code == 429:
+                await ratelimit.note_throttled(url, retry_after)
+            delay = ratelimit.backoff_delay(attempt, retry_after)
+            if attempt == ratelimit.MAX_RETRIES or delay > ratelimit.MAX_RETRY_WAIT:
+                return response
+            logger.warning(f"{url} returned {response.status_code}, retrying in {delay:.1f}s")
+        ratelimit.note_retry(url)
+        await asyncio.sleep(delay)
@@ -0,0 +1,54 @@
+import asyncio
+from collections import OrderedDict
+
+from app import warehouse
+from app.singleflight import SingleFlight
+
+
+class CachedLoader:
+    """Parsed upstream sources kept in memory, backed by the warehouse.
+
+    `load(key)` returns the in-memory copy while `is_fresh` says it still is.
+    Otherwise it loads the source once for all concurrent callers. It uses the
+    warehouse copy if that is fresh too: `read(key)` runs in a worker thread, and
+    `from_rows(key, stored)` rebuilds the copy. If not, `fetch(key)` parses it
+    from upstream, and the stored copy is served if upstream fails. `refresh=True`
+    skips memory and the warehouse. The `max_entries` most recently used sources
+    stay in memory, or all of them if it is None.
+    """
+
+    def __init__(self, name: str, read, from_rows, fetch, is_fresh, max_entries: int = None):
+        self.read = read
+        self.from_rows = from_rows
+        self.fetch = fetch
+        self.is_fresh = is_fresh
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._loads = SingleFlight(name)
+
+    async def load(self, key, refresh: bool = False):
+        value = self._entries.get(key)
+        if value is not None and not refresh and self.is_fresh(value):
+            self._entries.move_to_end(key)
+            return value
+        return await self._loads.do((key, refresh), lambda: self._load(key, refresh))
+
+    async def _load(self, key, refresh: bool):
+        stored = None if refresh else await asyncio.to_thread(self.read, key)
+        value = None if stored is None else self.from_rows(key, stored)
+        if value is not None and self.is_fresh(value):
+            warehouse.stats["hits"] += 1
+        else:
+            warehouse.stats["misses"] += 1
+            try:
+                value = await self.fetch(key)
+            except Exception:
+                if value is None:
+                    raise
+                warehouse.stats["fallbacks"] += 1  # upstream is down; serve what we have
+
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while self.max_entries is not None and len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return value
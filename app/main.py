@@ -1,14 +1,43 @@
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi import FastAPI, Query, HTTPException
-from app.scraper import test_scrape, scrape_season_stats, scrape_team_schedule, router, scrape_career_stats_totals, scrape_basic_team_stats, get_play_by_play, get_nba_play_by_play
-from app.schema import PlayerStats, TeamStats
+from app.scraper import test_scrape, scrape_season_stats, scrape_team_schedule, router, scrape_career_stats_totals, scrape_basic_team_stats, scrape_season_team_stats, scrape_team_roster, scrape_all_seasons, get_play_by_play, get_nba_play_by_play, stream_play_by_play
+from app.schema import PlayerStats, TeamStats, PlayerStatsNumeric, TeamStatsNumeric, trusted, numeric
+from app.cache import cache_stats
+from app.http_client import close_client
+from app.ratelimit import limiter_stats
+from app.singleflight import singleflight_stats
+from app.teams import get_resolver
+from app.player_index import directory as player_directory
+from app.splits import load_team_splits
+from app.similar import similar_players, MAX_SIMILAR
+from app.four_factors import load_four_factors, team_four_factors
+from app.backfill import backfill_team_season, MAX_BACKFILL_CONCURRENCY
+from app.warehouse import warehouse_stats
+from app.refresher import run_refresher
+from app.prefetch import run_prefetcher, prefetch_stats
+from app.responses import FastJSONResponse, dumps, json_response
+from app.conditional import ConditionalMiddleware, COMPRESS_MIN_SIZE
+from app import metrics, warehouse
+from app.metrics import stage
 from fastapi.responses import Response
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse, JSONResponse
-from fastapi.encoders import jsonable_encoder
-import json
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
+from contextlib import asynccontextmanager
+import asyncio
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app):
+    # Keep current-season warehouse rows fresh and prewarm upcoming opponents in the background
+    background_tasks = [asyncio.create_task(run_refresher()), asyncio.create_task(run_prefetcher())]
+    yield
+    for task in background_tasks:
+        task.cancel()
+    await player_directory.flush()
+    # Close pooled upstream connections on shutdown
+    await close_client()
+
+app = FastAPI(lifespan=lifespan, default_response_class=FastJSONResponse)
 
 origins = [
     "http://localhost:5500",
@@ -28,15 +57,24 @@ app.add_middleware(
     expose_headers=["*"]
 )
 
+# Large bodies not already compressed by json_response (streams, stats) are gzipped here
+app.add_middleware(GZipMiddleware, minimum_size=COMPRESS_MIN_SIZE)
+app.add_middleware(ConditionalMiddleware)
+
 @app.middleware("http")
 async def catch_exceptions_middleware(request, call_next):
+    # Stage timings for the Server-Timing header and /metrics are collected around the whole request
+    started = metrics.start_request()
     try:
-        return await call_next(request)
+        with metrics.in_flight("scouting_http_requests_in_flight"):
+            response = await call_next(request)
     except Exception as e:
-        return JSONResponse(
+        response = JSONResponse(
             status_code=500,
             content={"error": str(e)}
         )
+    metrics.finish_request(started, request.scope, response)
+    return response
 
 app.mount("/static", StaticFiles(directory="."), name="static")
 
@@ -49,72 +87,180 @@ async def read_index():
 #    stats = scrape_player_data(player)
 #    return {"player": player, "stats": stats}
 
+@app.get("/players/search")
+async def search_players(q: str = Query(..., min_length=1), limit: int = Query(10, ge=1, le=50)):
+    """Typeahead over players we've already seen; never touches the network."""
+    return json_response(player_directory.search(q, limit))
+
 @app.get("/players/{name}")
-def get_player_stats(name: str):
-    raw_stats = test_scrape(name)
-    print(raw_stats)
-    return PlayerStats(**raw_stats)
+async def get_player_stats(name: str):
+    raw_stats = await test_scrape(name)
+    with stage("validate"):
+        stats = trusted(PlayerStats, raw_stats)
+    return json_response(stats)
 
 @app.get("/players/{name}/season/{year}")
-def get_season_stats(name: str, year: str):
-    raw_stats = scrape_season_stats(name, year)
-    return PlayerStats(**raw_stats)
+async def get_season_stats(name: str, year: str, typed: bool = Query(False, description="Numbers instead of strings; percentages as fractions")):
+    raw_stats = await scrape_season_stats(name, year)
+    with stage("validate"):
+        stats = numeric(PlayerStatsNumeric, raw_stats) if typed else trusted(PlayerStats, raw_stats)
+    return json_response(stats)
+
+@app.get("/players/{name}/seasons")
+async def get_all_seasons(name: str):
+    return json_response(await scrape_all_seasons(name))
 
 @app.get("/players/{name}/career_totals")
-def get_career_totals(name: str, pretty: bool = Query(False)):
-    raw_stats = scrape_career_stats_totals(name)
+async def get_career_totals(name: str, pretty: bool = Query(False)):
+    raw_stats = await scrape_career_stats_totals(name)
     filtered_stats = {k: v for k, v in raw_stats.items() if v is not None}
+    return json_response(filtered_stats, pretty)
 
-    if pretty:
-        import json
-        pretty_json = json.dumps(filtered_stats, indent=4)
-        return Response(content=pretty_json, media_type="application/json")
+@app.get("/players/{name}/similar")
+async def get_similar_players(
+        name: str,
+        season: str = Query(None, description="Season to compare, e.g., '2024'; defaults to the latest with enough minutes"),
+        k: int = Query(10, ge=1, le=MAX_SIMILAR, description="How many players to return")
+):
+    """Players whose per-40 production and shooting splits look most like this player's season."""
+    return json_response(await similar_players(name, season, k))
 
-    return filtered_stats
+@app.get("/teams/search")
+async def search_teams(q: str = Query(..., min_length=1), limit: int = Query(10, ge=1, le=50)):
+    return json_response([team.to_dict() for team in get_resolver().search(q, limit)])
 
 @app.get("/teams/{name}/season/{year}")
-def get_team_season_stats(name: str, year: str, pretty: bool = Query(False)):
-    raw_stats = scrape_basic_team_stats(name, year)
+async def get_team_season_stats(name: str, year: str, pretty: bool = Query(False), typed: bool = Query(False, description="Numbers instead of strings; percentages as fractions")):
+    raw_stats = await scrape_basic_team_stats(name, year)
 
     if pretty:
-        import json
-        pretty_json = json.dumps(raw_stats, indent=4)
-        return Response(content=pretty_json, media_type="application/json")
+        return json_response(raw_stats, pretty)
+    with stage("validate"):
+        stats = numeric(TeamStatsNumeric, raw_stats) if typed else trusted(TeamStats, raw_stats)
+    return json_response(stats)
+
+@app.get("/teams/{name}/four-factors/{year}")
+async def get_team_four_factors(name: str, year: str):
+    """Possessions, offensive/defensive ratings and Four Factors for one team, with national percentiles."""
+    return json_response(await team_four_factors(name, year))
 
-    return TeamStats(**raw_stats)
+@app.get("/teams/{name}/roster/{year}")
+async def get_team_roster(
+        name: str,
+        year: str,
+        concurrency: int = Query(None, ge=1, le=16, description="Max player pages fetched at once"),
+        typed: bool = Query(False, description="Numbers instead of strings; percentages as fractions")
+):
+    result = await scrape_team_roster(name, year, concurrency)
+    with stage("validate"):
+        for player in result["players"]:
+            if player["stats"] is not None:
+                player["stats"] = numeric(PlayerStatsNumeric, player["stats"]) if typed else trusted(PlayerStats, player["stats"])
+    return json_response(result)
+
+@app.get("/teams/{name}/splits/{year}")
+async def get_team_splits(name: str, year: str):
+    """Conference vs non-conference shooting per player, from the season's box scores."""
+    splits = await load_team_splits(name, year)
+    with stage("validate"):
+        model = splits.to_model()
+    return json_response(model)
+
+@app.get("/seasons/{year}/teams")
+async def get_season_team_stats(
+        year: str,
+        typed: bool = Query(False, description="Numbers instead of strings; percentages as fractions"),
+        compact: bool = Query(False, description='{"fields": [...], "rows": [[...]]} instead of one object per team')
+):
+    teams = await scrape_season_team_stats(year, typed)
+    return json_response(teams.to_columns() if compact else teams.to_dicts(skip_none=True))
+
+@app.get("/seasons/{year}/four-factors")
+async def get_season_four_factors(
+        year: str,
+        compact: bool = Query(False, description='{"fields": [...], "rows": [[...]]} instead of one object per team')
+):
+    """Four Factors and efficiency ratings for every Division I team, in school-stats table order."""
+    ratings = await load_four_factors(year)
+    return json_response(ratings.to_columns() if compact else ratings.to_dicts())
 
 @app.get("/team-schedule/")
-def get_team_schedule(team: str = Query("lal", description="NBA team slug, e.g., 'lal' for Lakers")):
-    return scrape_team_schedule(team)
+async def get_team_schedule(
+        team: str = Query("lal", description="NBA team slug, e.g., 'lal' for Lakers, or a college team name, e.g., 'SDSU'"),
+        league: str = Query("nba", description="'nba' or 'ncaab'")
+):
+    return json_response(await scrape_team_schedule(team, league))
+
+@app.get("/team-schedule/backfill")
+async def backfill_team_schedule(
+        team: str = Query(..., description="College team name, e.g., 'SDSU', or NBA team slug with league=nba"),
+        season: str = Query(None, description="Season, e.g., '2024' for 2023-24; defaults to the current one"),
+        league: str = Query("ncaab", description="'nba' or 'ncaab'"),
+        concurrency: int = Query(None, ge=1, le=MAX_BACKFILL_CONCURRENCY, description="Box scores fetched at once"),
+        box_scores: bool = Query(True, description="Include each game's box score, not just progress")
+):
+    """Fetch and store every finished game's box score for a team season, streamed as NDJSON progress events."""
+    events = backfill_team_season(team, season, league, concurrency, box_scores)
+    return StreamingResponse((dumps(event) + b"\n" async for event in events), media_type="application/x-ndjson")
 
 #@app.get("/playbyplay/")
 #def get_game_play_by_play(gameId: str = Query(..., description="ESPN game ID, e.g., '401706868'")):
 #    return get_play_by_play(gameId)
-@app.get("/playbyplay/")
-def get_play_by_play_endpoint(
-        gameId: str = Query(..., description="ESPN game ID, e.g., '401706868'"),
-        pretty: bool = Query(False, description="Return pretty-printed JSON")
-):
-    data = get_play_by_play(gameId)
 
-    if pretty:
-        pretty_json = json.dumps(data, indent=4)
-        return Response(content=pretty_json, media_type="application/json")
+async def play_by_play_response(game_ids: str, league: str, pretty: bool, reverse: bool, format: str):
+    ids = [game_id.strip() for game_id in game_ids.split(",") if game_id.strip()]
+    if not ids:
+        raise HTTPException(status_code=400, detail="gameId is required")
+
+    if format in ("ndjson", "stream"):
+        media_type = "application/x-ndjson" if format == "ndjson" else "application/json"
+        fmt = "ndjson" if format == "ndjson" else "json"
+        return StreamingResponse(stream_play_by_play(ids, league, reverse, fmt), media_type=media_type)
+
+    loader = get_nba_play_by_play if league == "nba" else get_play_by_play
+    if len(ids) == 1:
+        data = await loader(ids[0], reverse)
+    else:
+        data = {game_id: await loader(game_id, reverse) for game_id in ids}
 
-    return data
+    # Serialize once, straight from the plain dicts
+    return json_response(data, pretty)
+
+@app.get("/playbyplay/")
+async def get_play_by_play_endpoint(
+        gameId: str = Query(..., description="ESPN game ID, e.g., '401706868'; comma-separate several games"),
+        pretty: bool = Query(False, description="Return pretty-printed JSON"),
+        reverse: bool = Query(True, description="Latest play first"),
+        format: str = Query("json", pattern="^(json|ndjson|stream)$", description="'ndjson' or 'stream' (chunked JSON array) to stream plays as they are ready")
+):
+    return await play_by_play_response(gameId, "ncaab", pretty, reverse, format)
 
 @app.get("/nbaplaybyplay/")
-def get_nba_play_by_play_endpoint(
-        gameId: str = Query(..., description="ESPN game ID, e.g., '401705764'"),
-        pretty: bool = Query(False, description="Return pretty-printed JSON")
+async def get_nba_play_by_play_endpoint(
+        gameId: str = Query(..., description="ESPN game ID, e.g., '401705764'; comma-separate several games"),
+        pretty: bool = Query(False, description="Return pretty-printed JSON"),
+        reverse: bool = Query(True, description="Latest play first"),
+        format: str = Query("json", pattern="^(json|ndjson|stream)$", description="'ndjson' or 'stream' (chunked JSON array) to stream plays as they are ready")
 ):
-    data = get_nba_play_by_play(gameId)
+    return await play_by_play_response(gameId, "nba", pretty, reverse, format)
 
-    if pretty:
-        pretty_json = json.dumps(data, indent=4)
-        return Response(content=pretty_json, media_type="application/json")
+@app.get("/cache/stats")
+def get_cache_stats():
+    return {**cache_stats(), "coalescing": singleflight_stats(), "warehouse": warehouse_stats()}
+
+@app.get("/ratelimit/stats")
+def get_ratelimit_stats():
+    return limiter_stats()
+
+@app.get("/prefetch/stats")
+def get_prefetch_stats():
+    return prefetch_stats()
 
-    return data
+@app.get("/metrics")
+def get_metrics():
+    """Prometheus metrics for this worker: stage and request latency, upstream statuses, cache and in-flight gauges."""
+    body = metrics.render(cache_stats(), warehouse.stats, singleflight_stats(), limiter_stats())
+    return Response(body, media_type=metrics.CONTENT_TYPE)
 
 # Include the router
 app.include_router(router)
\ No newline at end of file
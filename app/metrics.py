@@ -0,0 +1,186 @@
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# Per-stage timing for every request, exposed two ways: Prometheus histograms on
+# /metrics (per worker process, like the other /stats endpoints) and a
+# Server-Timing header on each response, so a slow request shows where its time
+# went in the browser's network panel.
+#
+# Stages: fetch (page cache lookup, including any upstream call), upstream (the
+# HTTP call itself), unwrap (finding a table in the raw page, comments included),
+# parse (HTML/JSON into rows), map (rows into response fields), validate (pydantic
+# models), serialize (JSON encoding) and warehouse (SQLite reads and writes).
+# Stages can nest and run concurrently, so one request's stages needn't add up to
+# its total.
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Histogram bucket upper bounds, in seconds
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+HELP = {
+    "scouting_stage_seconds": ("histogram", "Time spent in each stage of handling a request."),
+    "scouting_http_request_seconds": ("histogram", "End-to-end request latency by route and status."),
+    "scouting_http_requests_in_flight": ("gauge", "Requests being handled right now."),
+    "scouting_upstream_requests_total": ("counter", "Upstream responses by host and status code."),
+    "scouting_upstream_requests_in_flight": ("gauge", "Upstream requests waiting for a response, by host."),
+    "scouting_cache_lookups_total": ("counter", "Page cache lookups by outcome."),
+    "scouting_cache_hit_ratio": ("gauge", "Share of page cache lookups served without a full upstream fetch."),
+    "scouting_warehouse_events_total": ("counter", "Warehouse reads and writes by outcome."),
+    "scouting_coalesced_total": ("counter", "Loads that joined one already in flight, by loader."),
+    "scouting_loads_in_flight": ("gauge", "Loads in flight, by loader."),
+    "scouting_ratelimit_queue_depth": ("gauge", "Requests waiting for a rate limit token, by host."),
+}
+
+
+class Histogram:
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self):
+        self.counts = [0] * len(BUCKETS)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        for i, bound in enumerate(BUCKETS):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        self.sum += value
+        self.count += 1
+
+
+_lock = threading.Lock()
+_histograms = {}  # (name, labels) -> Histogram
+_counters = {}    # (name, labels) -> value
+_gauges = {}      # (name, labels) -> value
+
+# {stage: seconds} for the request being handled, for its Server-Timing header
+_timings = ContextVar("stage_timings", default=None)
+
+
+def _labels(labels: dict) -> tuple:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def observe(name: str, seconds: float, **labels):
+    key = (name, _labels(labels))
+    with _lock:
+        histogram = _histograms.get(key)
+        if histogram is None:
+            histogram = _histograms[key] = Histogram()
+        histogram.observe(seconds)
+
+
+def inc(name: str, amount: float = 1, **labels):
+    key = (name, _labels(labels))
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + amount
+
+
+def gauge_add(name: str, amount: float, **labels):
+    key = (name, _labels(labels))
+    with _lock:
+        _gauges[key] = _gauges.get(key, 0) + amount
+
+
+@contextmanager
+def in_flight(name: str, **labels):
+    """Count the block in gauge `name` while it runs."""
+    gauge_add(name, 1, **labels)
+    try:
+        yield
+    finally:
+        gauge_add(name, -1, **labels)
+
+
+@contextmanager
+def stage(name: str):
+    """Time the block as stage `name`, in the histogram and the current request's Server-Timing."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        observe("scouting_stage_seconds", elapsed, stage=name)
+        timings = _timings.get()
+        if timings is not None:
+            timings[name] = timings.get(name, 0.0) + elapsed
+
+
+def start_request():
+    """Start collecting stage timings for this request; pass the result to finish_request."""
+    return _timings.set({}), time.perf_counter()
+
+
+def finish_request(started, scope: dict, response):
+    """Record the request's latency and add its Server-Timing header to `response`."""
+    token, start = started
+    elapsed = time.perf_counter() - start
+    timings = _timings.get()
+    _timings.reset(token)
+    route = scope.get("route")
+    observe("scouting_http_request_seconds", elapsed,
+            route=getattr(route, "path", "unmatched"), status=response.status_code)
+    entries = [f"{name};dur={seconds * 1000:.1f}" for name, seconds in (timings or {}).items()]
+    entries.append(f"total;dur={elapsed * 1000:.1f}")
+    response.headers["Server-Timing"] = ", ".join(entries)
+
+
+def _format_labels(labels: tuple, extra: tuple = ()) -> str:
+    pairs = labels + extra
+    if not pairs:
+        return ""
+    escaped = (value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, value in pairs)
+    return "{" + ",".join(f'{key}="{value}"' for (key, _), value in zip(pairs, escaped)) + "}"
+
+
+def _collected(cache: dict, warehouse: dict, coalescing: dict, limiter: dict):
+    """(counters, gauges) read from the stats dicts the other modules already keep."""
+    counters = {}
+    gauges = {}
+    for outcome in ("hits", "misses", "revalidated", "stale_served"):
+        counters[("scouting_cache_lookups_total", (("result", outcome),))] = cache.get(outcome, 0)
+    if cache.get("hit_ratio") is not None:
+        gauges[("scouting_cache_hit_ratio", ())] = cache["hit_ratio"]
+    for outcome in ("hits", "misses", "fallbacks", "writes", "errors"):
+        counters[("scouting_warehouse_events_total", (("result", outcome),))] = warehouse.get(outcome, 0)
+    for group, stats in coalescing.items():
+        counters[("scouting_coalesced_total", (("loader", group),))] = stats["coalesced"]
+        gauges[("scouting_loads_in_flight", (("loader", group),))] = stats["in_flight"]
+    for host, stats in limiter.items():
+        gauges[("scouting_ratelimit_queue_depth", (("host", host),))] = stats["queue_depth"]
+    return counters, gauges
+
+
+def render(cache: dict, warehouse: dict, coalescing: dict, limiter: dict) -> str:
+    """Everything in the Prometheus text exposition format."""
+    with _lock:
+        histograms = {key: (list(h.counts), h.sum, h.count) for key, h in _histograms.items()}
+        counters = dict(_counters)
+        gauges = dict(_gauges)
+    collected_counters, collected_gauges = _collected(cache, warehouse, coalescing, limiter)
+    counters.update(collected_counters)
+    gauges.update(collected_gauges)
+
+    series = {}
+    for (name, labels), (counts, total, count) in histograms.items():
+        lines = series.setdefault(name, [])
+        cumulative = 0
+        for bound, bucket in zip(BUCKETS, counts):
+            cumulative += bucket
+            lines.append(f"{name}_bucket{_format_labels(labels, (('le', repr(bound)),))} {cumulative}")
+        lines.append(f"{name}_bucket{_format_labels(labels, (('le', '+Inf'),))} {count}")
+        lines.append(f"{name}_sum{_format_labels(labels)} {total}")
+        lines.append(f"{name}_count{_format_labels(labels)} {count}")
+    for (name, labels), value in list(counters.items()) + list(gauges.items()):
+        series.setdefault(name, []).append(f"{name}{_format_labels(labels)} {value}")
+
+    out = []
+    for name in sorted(series):
+        kind, description = HELP.get(name, ("untyped", ""))
+        out.append(f"# HELP {name} {description}")
+        out.append(f"# TYPE {name} {kind}")
+        out.extend(series[name])
+    return "\n".join(out) + "\n"
@@ -0,0 +1,149 @@
+import asyncio
+import json
+import os
+import re
+import time
+
+from app.config import CACHE_DIR
+from app.search_index import SearchIndex, normalize
+from app.teams import team_key
+
+# Local directory of every player we've seen, so names resolve to the right slug
+# without a network round trip. Each sighting is appended to a JSON-lines log in
+# the cache directory, which every worker can append to and replay on start.
+INDEX_FILE = os.path.join(CACHE_DIR, "players.jsonl")
+
+# New sightings are appended in one batch from a worker thread, FLUSH_DELAY seconds
+# after the first of them; lookups replay other workers' lines at most every
+# REPLAY_INTERVAL seconds rather than checking the file on every call.
+FLUSH_DELAY = 1.0
+REPLAY_INTERVAL = 5.0
+
+
+class PlayerDirectory:
+    def __init__(self):
+        self.players = {}
+        self._index = SearchIndex()
+        self._offset = 0
+        self._replayed_at = None
+        self._pending = []
+        self._flush_task = None
+
+    def _refresh(self):
+        """Replay log lines appended since the last read, including other workers' sightings."""
+        now = time.monotonic()
+        if self._replayed_at is not None and now - self._replayed_at < REPLAY_INTERVAL:
+            return
+        self._replayed_at = now
+        try:
+            if os.path.getsize(INDEX_FILE) == self._offset:
+                return
+            with open(INDEX_FILE, "rb") as f:
+                f.seek(self._offset)
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        break  # another worker is mid-write; pick it up next time
+                    self._offset += len(line)
+                    try:
+                        self._merge(json.loads(line))
+                    except ValueError:
+                        continue  # torn write from a crashed worker
+        except OSError:
+            pass
+
+    def _merge(self, record: dict) -> bool:
+        """Fold a sighting into the directory; True if it added anything new."""
+        slug = record["slug"]
+        entry = self.players.get(slug)
+        if entry is None:
+            entry = self.players[slug] = {"slug": slug, "name": None, "schools": [], "seasons": []}
+        changed = False
+        if record.get("name") and record["name"] != entry["name"]:
+            entry["name"] = record["name"]
+            self._index.add(record["name"], slug)
+            changed = True
+        for field, values in (("schools", record.get("schools", ())), ("seasons", record.get("seasons", ()))):
+            for value in values:
+                if value and value not in entry[field]:
+                    entry[field].append(value)
+                    changed = True
+        if changed:
+            entry["seasons"].sort()
+        return changed
+
+    def record(self, slug: str, name: str = None, schools=(), seasons=()):
+        self._refresh()
+        record = {"slug": slug, "name": name, "schools": list(schools), "seasons": list(seasons)}
+        if not self._merge(record):
+            return
+        self._pending.append(json.dumps(record) + "\n")
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._append(self._take_pending())  # no event loop to block, e.g. a script
+            return
+        if self._flush_task is None:
+            self._flush_task = loop.create_task(self._flush_later())
+
+    def _take_pending(self) -> list:
+        lines, self._pending = self._pending, []
+        return lines
+
+    @staticmethod
+    def _append(lines: list):
+        if not lines:
+            return
+        try:
+            os.makedirs(os.path.dirname(INDEX_FILE), exist_ok=True)
+            with open(INDEX_FILE, "a", encoding="utf-8") as f:
+                f.write("".join(lines))
+        except OSError:
+            pass  # the in-memory directory still has them
+
+    async def _flush_later(self):
+        await asyncio.sleep(FLUSH_DELAY)
+        self._flush_task = None
+        await asyncio.to_thread(self._append, self._take_pending())
+
+    async def flush(self):
+        """Write pending sightings now instead of at the scheduled flush (on shutdown)."""
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            self._flush_task = None
+        await asyncio.to_thread(self._append, self._take_pending())
+
+    def candidates(self, name: str) -> list:
+        """Players whose name matches exactly, most recent season first."""
+        self._refresh()
+        entries = [self.players[slug] for slug in self._index.exact(name)]
+        return sorted(entries, key=lambda e: e["seasons"][-1] if e["seasons"] else "", reverse=True)
+
+    def search(self, query: str, limit: int = 10) -> list:
+        self._refresh()
+        return [self.players[slug] for slug in self._index.search(query, limit)]
+
+
+directory = PlayerDirectory()
+
+
+def record_player_page(page):
+    """Add what a parsed PlayerPage tells us: name, schools and seasons."""
+    per_game = page.tables.get("per_game") or page.tables.get("totals")
+    if not per_game:
+        directory.record(page.slug, page.name)
+        return
+    schools = [team_key(school) for school in per_game.columns.get("team_name_abbr", []) if school]
+    directory.record(page.slug, page.name, schools, per_game.seasons())
+
+
+def record_roster(team_slug: str, season: str, players: list):
+    for name, slug in players:
+        directory.record(slug, name, [team_slug], [str(season)])
+
+
+def lookup_slug(name: str):
+    """Best-known slug for a player name, or None if we've never seen them."""
+    if re.fullmatch(r"[a-z\-]+-\d+", name.lower()):
+        return name.lower()
+    candidates = directory.candidates(normalize(name))
+    return candidates[0]["slug"] if candidates else None
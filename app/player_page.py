@@ -0,0 +1,138 @@
+import asyncio
+import re
+import time
+
+from app import warehouse
+from app.cache import fetch, live_season, TTL_PLAYER_PAGE
+from app.config import SPORTS_REFERENCE_URL
+from app.conditional import note_source
+from app.extract import extract_heading
+from app.loader import CachedLoader
+from app.metrics import stage
+from app.player_index import record_player_page
+from app.tables import TableSpec, append_cells
+
+PLAYER_TABLES = ("per_game", "totals")
+# Season rows have ids like "players_per_game.2024"; the row id kept is the part after the dot
+PLAYER_TABLE_SPECS = {table_type: TableSpec(f"players_{table_type}", row_id_prefix=f"players_{table_type}.")
+                      for table_type in PLAYER_TABLES}
+MAX_PAGES = 256
+
+
+class PlayerTable:
+    """One stats table from a player page, stored column-wise.
+
+    `columns[stat][i]` is the cell for `data-stat=stat` in row `row_ids[i]`
+    (a season like "2024" or "Career"); empty cells are None.
+    """
+    __slots__ = ("row_ids", "stats", "columns", "_index")
+
+    def __init__(self):
+        self.row_ids = []
+        self.stats = []
+        self.columns = {}
+        self._index = {}
+
+    @classmethod
+    def from_table(cls, table) -> "PlayerTable":
+        parsed = cls()
+        parsed.row_ids = table.row_ids
+        parsed.stats = table.stats
+        parsed.columns = table.columns
+        parsed._index = {row_id: i for i, row_id in enumerate(table.row_ids)}
+        return parsed
+
+    def add_row(self, row_id: str, cells: list):
+        i = len(self.row_ids)
+        self.row_ids.append(row_id)
+        self._index[row_id] = i
+        append_cells(self.stats, self.columns, i, cells)
+
+    def row(self, row_id: str):
+        """Return {data-stat: value} for a row in page order, or None if the row is missing."""
+        i = self._index.get(row_id)
+        if i is None:
+            return None
+        return {stat: self.columns[stat][i] for stat in self.stats}
+
+    def seasons(self) -> list:
+        return [row_id for row_id in self.row_ids if re.fullmatch(r"\d{4}", row_id)]
+
+
+class PlayerPage:
+    """Everything we use from /cbb/players/{slug}.html, parsed once."""
+    __slots__ = ("slug", "name", "tables", "loaded_at")
+
+    def __init__(self, slug: str, name: str, tables: dict):
+        self.slug = slug
+        self.name = name
+        self.tables = tables
+        self.loaded_at = time.time()
+
+    def row(self, table_type: str, row_id: str):
+        table = self.tables.get(table_type)
+        return table.row(row_id) if table else None
+
+    def seasons_played(self) -> int:
+        table = self.tables.get("totals")
+        return len(table.seasons()) if table else 0
+
+    def last_season(self):
+        seasons = [season for table in self.tables.values() for season in table.seasons()]
+        return max(seasons) if seasons else None
+
+
+def parse_player_page(slug: str, html: str) -> PlayerPage:
+    tables = {}
+    for table_type, spec in PLAYER_TABLE_SPECS.items():
+        table = spec.extract(html)
+        if table is not None:
+            tables[table_type] = PlayerTable.from_table(table)
+    return PlayerPage(slug, extract_heading(html), tables)
+
+
+def page_from_rows(slug: str, stored: dict) -> PlayerPage:
+    """Rebuild a PlayerPage from its warehouse rows."""
+    tables = {}
+    for table_type, rows in stored["tables"].items():
+        table = tables[table_type] = PlayerTable()
+        for row_id, row in rows:
+            table.add_row(row_id, list(row.items()))
+    page = PlayerPage(slug, stored["name"], tables)
+    page.loaded_at = stored["updated_at"]
+    return page
+
+
+def _is_fresh(loaded_at: float, last_season) -> bool:
+    if time.time() - loaded_at < TTL_PLAYER_PAGE:
+        return True
+    # Past the TTL, only pages of players gone for more than a season stay: they change only if the player returns
+    return not (last_season and int(last_season) >= live_season())
+
+
+async def _fetch_player_page(player_slug: str) -> PlayerPage:
+    url = f"{SPORTS_REFERENCE_URL}/cbb/players/{player_slug}.html"
+    response = await fetch(url)
+    if response.status_code != 200:
+        raise ValueError(f"Player not found or URL failed: {url}")
+
+    with stage("parse"):
+        page = await asyncio.to_thread(parse_player_page, player_slug, response.text)
+    record_player_page(page)
+    await asyncio.to_thread(warehouse.store_player_page, page)
+    return page
+
+
+_pages = CachedLoader("player_page", warehouse.player_page_rows, page_from_rows, _fetch_player_page,
+                      lambda page: _is_fresh(page.loaded_at, page.last_season()), MAX_PAGES)
+
+
+async def load_player_page(player_slug: str, refresh: bool = False) -> PlayerPage:
+    """Fetch and parse a player page, reusing the parsed page for repeat requests.
+
+    Pages come from memory, then the warehouse, then upstream. Concurrent requests
+    for the same slug share one fetch and parse. `refresh` skips straight to upstream.
+    """
+    page = await _pages.load(player_slug, refresh)
+    note_source(f"player:{player_slug}", page.loaded_at, page.loaded_at)
+    return page
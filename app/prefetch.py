@@ -0,0 +1,132 @@
+import asyncio
+import logging
+import os
+from datetime import datetime, timedelta
+
+from app.cache import current_season
+from app.config import STARTUP_DELAY
+from app.espn import iter_games
+from app.ratelimit import background
+from app.refresher import claim_worker_lock
+from app.roster import load_roster, load_roster_pages
+from app.school_stats import load_school_stats
+from app.scraper import scrape_team_schedule
+from app.teams import get_resolver
+
+# Background job that reads our schedule and, PREFETCH_DAYS before each game,
+# warms the cache and warehouse with the opponent's season stats, roster player
+# pages and last PREFETCH_GAMES games. It only runs off-peak and only on spare
+# rate-limit capacity, so game week starts with cache hits.
+HOME_TEAM = os.environ.get("SCOUTING_HOME_TEAM", "San Diego State")
+PREFETCH_DAYS = int(os.environ.get("SCOUTING_PREFETCH_DAYS", "3"))
+PREFETCH_GAMES = int(os.environ.get("SCOUTING_PREFETCH_GAMES", "5"))
+PREFETCH_INTERVAL = int(os.environ.get("SCOUTING_PREFETCH_INTERVAL", "3600"))
+# Local hours to run in, as "start-end"; "1-7" is 01:00 to 06:59, "22-6" wraps midnight
+PREFETCH_HOURS = os.environ.get("SCOUTING_PREFETCH_HOURS", "1-7")
+
+stats = {
+    "runs": 0,
+    "opponents": 0,
+    "player_pages": 0,
+    "games": 0,
+    "errors": 0,
+    "last_run": None,
+}
+
+_done = set()
+
+
+def off_peak(now: datetime = None) -> bool:
+    start, end = (int(hour) for hour in PREFETCH_HOURS.split("-"))
+    hour = (now or datetime.now()).hour
+    return start <= hour < end if start <= end else hour >= start or hour < end
+
+
+def upcoming_games(schedule: list, days: int, today: datetime = None) -> list:
+    """Unplayed games with a known opponent in the next `days` days, soonest first."""
+    today = today or datetime.now()
+    first, last = today.strftime("%Y-%m-%d"), (today + timedelta(days=days)).strftime("%Y-%m-%d")
+    games = [game for game in schedule
+             if not game.get("result") and game.get("date") and first <= game["date"] <= last]
+    return sorted(games, key=lambda game: game["date"])
+
+
+async def prefetch_opponent(team_id: str, season: str) -> dict:
+    """Warm an opponent's season stats, roster pages and last PREFETCH_GAMES games."""
+    logger = logging.getLogger("uvicorn.error")
+    team = get_resolver().by_id[team_id]
+    await load_school_stats(season)
+
+    players = await load_roster(team.sref_slug or team.id, season)
+    pages = await load_roster_pages(players)
+    loaded_pages = sum(not isinstance(page, Exception) for page in pages)
+
+    schedule = await scrape_team_schedule(team.id, "ncaab")
+    if "error" in schedule:
+        raise ValueError(schedule["error"])
+    recent = [game["game_id"] for game in schedule["schedule"] if game.get("result") and game.get("game_id")]
+    loaded_games = 0
+    async for game_id, game in iter_games(recent[-PREFETCH_GAMES:], "ncaab"):
+        if isinstance(game, Exception):
+            logger.warning(f"Prefetching game {game_id} failed: {game}")
+        else:
+            loaded_games += 1
+
+    stats["player_pages"] += loaded_pages
+    stats["games"] += loaded_games
+    return {"team": team.id, "player_pages": loaded_pages, "games": loaded_games}
+
+
+async def prefetch_once() -> list:
+    """Prefetch every opponent we play in the next PREFETCH_DAYS days that isn't done yet."""
+    logger = logging.getLogger("uvicorn.error")
+    stats["runs"] += 1
+    stats["last_run"] = datetime.now().isoformat(timespec="seconds")
+    schedule = await scrape_team_schedule(HOME_TEAM, "ncaab")
+    if "error" in schedule:
+        raise ValueError(schedule["error"])
+
+    season = str(current_season())
+    results = []
+    for game in upcoming_games(schedule["schedule"], PREFETCH_DAYS):
+        key = game.get("game_id") or (game["date"], game["opponent"])
+        if key in _done:
+            continue
+        if not game.get("opponent_team_id"):
+            logger.warning(f"Can't prefetch unknown opponent {game['opponent']!r}")
+            _done.add(key)
+            continue
+        try:
+            results.append(await prefetch_opponent(game["opponent_team_id"], season))
+            stats["opponents"] += 1
+            _done.add(key)
+        except Exception as e:
+            stats["errors"] += 1
+            logger.warning(f"Prefetching {game['opponent_team_id']} failed: {e}")
+    return results
+
+
+async def run_prefetcher():
+    """Prefetch off-peak every PREFETCH_INTERVAL seconds until cancelled."""
+    if PREFETCH_INTERVAL <= 0:
+        return
+    lock = await asyncio.to_thread(claim_worker_lock, "prefetch")
+    if lock is None:
+        return
+    try:
+        await asyncio.sleep(STARTUP_DELAY)
+        with background():
+            while True:
+                if off_peak():
+                    try:
+                        await prefetch_once()
+                    except Exception as e:
+                        stats["errors"] += 1
+                        logging.getLogger("uvicorn.error").warning(f"Prefetch run failed: {e}")
+                await asyncio.sleep(PREFETCH_INTERVAL)
+    finally:
+        lock.close()
+
+
+def prefetch_stats() -> dict:
+    return {**stats, "home_team": HOME_TEAM, "off_peak": off_peak(), "done": len(_done)}
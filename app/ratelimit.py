@@ -0,0 +1,196 @@
+import asyncio
+import contextvars
+import json
+import os
+import random
+import time
+from contextlib import contextmanager
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+from app.config import CACHE_DIR
+
+try:
+    import fcntl
+except ImportError:  # Windows: buckets are per process only
+    fcntl = None
+
+# Token buckets per upstream host: (requests per second, burst size).
+# sports-reference asks for no more than 20 requests a minute and bans clients that go over.
+HOST_LIMITS = {
+    "www.sports-reference.com": (20 / 60, 3),
+    "www.espn.com": (4.0, 8),
+    "site.api.espn.com": (8.0, 16),
+}
+DEFAULT_LIMIT = (2.0, 4)
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+MAX_RETRIES = 3
+BACKOFF_BASE = 1.0
+MAX_RETRY_WAIT = 30.0
+
+# Tokens per host that background jobs leave free for interactive requests
+BACKGROUND_RESERVE = 2.0
+
+STATE_DIR = os.path.join(CACHE_DIR, "ratelimit")
+
+_reserve = contextvars.ContextVar("ratelimit_reserve", default=0.0)
+
+host_stats = {}
+
+
+def _host_stats(host: str) -> dict:
+    if host not in host_stats:
+        host_stats[host] = {
+            "queue_depth": 0,
+            "max_queue_depth": 0,
+            "acquired": 0,
+            "waited_seconds": 0.0,
+            "retries": 0,
+            "throttled": 0,
+        }
+    return host_stats[host]
+
+
+class TokenBucket:
+    """Token bucket for one host, shared by all workers through a locked state file."""
+
+    def __init__(self, host: str, rate: float, burst: int):
+        self.host = host
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.time()
+        self.blocked_until = 0.0
+        self._path = os.path.join(STATE_DIR, f"{host}.json")
+
+    def _refill(self, state: dict, now: float) -> dict:
+        elapsed = max(0.0, now - state["updated"])
+        state["tokens"] = min(self.burst, state["tokens"] + elapsed * self.rate)
+        state["updated"] = now
+        return state
+
+    def _update(self, change):
+        """Apply `change(state, now)` to the shared state under an exclusive lock and return its result."""
+        now = time.time()
+        if fcntl is None:
+            state = {"tokens": self.tokens, "updated": self.updated, "blocked_until": self.blocked_until}
+            result = change(self._refill(state, now), now)
+            self.tokens, self.updated, self.blocked_until = state["tokens"], state["updated"], state["blocked_until"]
+            return result
+
+        os.makedirs(STATE_DIR, exist_ok=True)
+        with open(self._path, "a+") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                f.seek(0)
+                try:
+                    state = json.loads(f.read())
+                except ValueError:
+                    state = {"tokens": float(self.burst), "updated": now, "blocked_until": 0.0}
+                result = change(self._refill(state, now), now)
+                f.seek(0)
+                f.truncate()
+                f.write(json.dumps(state))
+                f.flush()  # before unlocking, or the next reader sees an empty file
+                return result
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def try_take(self, reserve: float = 0.0) -> float:
+        """Take a token if one is free beyond `reserve`; return 0, or seconds to wait before retrying."""
+        def change(state, now):
+            if state["blocked_until"] > now:
+                return state["blocked_until"] - now
+            if state["tokens"] >= 1 + reserve:
+                state["tokens"] -= 1
+                return 0.0
+            return (1 + reserve - state["tokens"]) / self.rate
+        return self._update(change)
+
+    def block(self, seconds: float):
+        """Stop every worker from calling this host for `seconds` (after a 429)."""
+        def change(state, now):
+            state["blocked_until"] = max(state["blocked_until"], now + seconds)
+            state["tokens"] = 0.0
+        self._update(change)
+
+
+_buckets = {}
+
+
+def bucket_for(url: str) -> TokenBucket:
+    host = urlsplit(url).hostname or ""
+    if host not in _buckets:
+        rate, burst = HOST_LIMITS.get(host, DEFAULT_LIMIT)
+        _buckets[host] = TokenBucket(host, rate, burst)
+    return _buckets[host]
+
+
+async def acquire(url: str, reserve: float = 0.0):
+    """Wait until the host of `url` may be called.
+
+    `reserve` keeps that many tokens free for interactive requests, so background
+    jobs only use spare capacity. Calls made inside `background()` reserve too.
+    """
+    reserve = max(reserve, _reserve.get())
+    bucket = bucket_for(url)
+    stats = _host_stats(bucket.host)
+    stats["queue_depth"] += 1
+    stats["max_queue_depth"] = max(stats["max_queue_depth"], stats["queue_depth"])
+    start = time.monotonic()
+    try:
+        while True:
+            wait = await asyncio.to_thread(bucket.try_take, reserve)
+            if wait <= 0:
+                break
+            await asyncio.sleep(wait)
+    finally:
+        stats["queue_depth"] -= 1
+    stats["acquired"] += 1
+    stats["waited_seconds"] += time.monotonic() - start
+
+
+@contextmanager
+def background(reserve: float = BACKGROUND_RESERVE):
+    """Make every upstream call in this block (and tasks it starts) run on spare capacity."""
+    token = _reserve.set(reserve)
+    try:
+        yield
+    finally:
+        _reserve.reset(token)
+
+
+def retry_after_seconds(value: str):
+    """Parse a Retry-After header (seconds or HTTP date) into seconds, or None."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_delay(attempt: int, retry_after: float = None) -> float:
+    """Upstream's Retry-After if given, else full-jitter exponential backoff."""
+    if retry_after is not None:
+        return retry_after
+    return random.uniform(0, BACKOFF_BASE * 2 ** attempt)
+
+
+async def note_throttled(url: str, retry_after: float = None):
+    bucket = bucket_for(url)
+    _host_stats(bucket.host)["throttled"] += 1
+    await asyncio.to_thread(bucket.block, retry_after if retry_after is not None else BACKOFF_BASE * 4)
+
+
+def note_retry(url: str):
+    _host_stats(bucket_for(url).host)["retries"] += 1
+
+
+def limiter_stats() -> dict:
+    return {host: dict(stats) for host, stats in host_stats.items()}
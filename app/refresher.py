@@ -0,0 +1,71 @@
+import asyncio
+import logging
+import os
+
+from app import warehouse
+from app.cache import current_season, live_season, TTL_CURRENT_SEASON, TTL_PLAYER_PAGE
+from app.config import CACHE_DIR, STARTUP_DELAY
+from app.espn import load_game
+from app.player_page import load_player_page
+from app.ratelimit import background
+from app.school_stats import load_school_stats
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process lock, so every worker runs the background jobs
+    fcntl = None
+
+# Background task that re-scrapes current-season warehouse rows once they pass
+# their TTL, so requests keep hitting the warehouse instead of waiting on upstream.
+# One worker holds the lock file and refreshes; the others share its writes.
+REFRESH_INTERVAL = int(os.environ.get("SCOUTING_REFRESH_INTERVAL", "600"))
+REFRESH_BATCH = 50
+
+
+def claim_worker_lock(name: str):
+    """Hold `name`.lock in the cache dir for the life of this process; None if another worker has it."""
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    f = open(os.path.join(CACHE_DIR, f"{name}.lock"), "w")
+    if fcntl is None:
+        return f
+    try:
+        fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        f.close()
+        return None
+    return f
+
+
+async def refresh_once() -> dict:
+    """Refresh one batch of stale rows; returns how many of each were refreshed."""
+    logger = logging.getLogger("uvicorn.error")
+    stale = await asyncio.to_thread(warehouse.stale_entries, str(current_season()), str(live_season()),
+                                    TTL_PLAYER_PAGE, TTL_CURRENT_SEASON, REFRESH_BATCH)
+    jobs = [("team_seasons", load_school_stats, (season,)) for season in stale["team_seasons"]]
+    jobs += [("players", load_player_page, (slug,)) for slug in stale["players"]]
+    jobs += [("games", load_game, (game_id, league)) for league, game_id in stale["games"]]
+    refreshed = {"team_seasons": 0, "players": 0, "games": 0}
+    for kind, load, args in jobs:
+        try:
+            await load(*args, refresh=True)
+            refreshed[kind] += 1
+        except Exception as e:
+            logger.warning(f"Refreshing {kind} {args} failed: {e}")
+    return refreshed
+
+
+async def run_refresher():
+    """Refresh stale rows every REFRESH_INTERVAL seconds until cancelled."""
+    if REFRESH_INTERVAL <= 0:
+        return
+    lock = await asyncio.to_thread(claim_worker_lock, "refresher")
+    if lock is None:
+        return
+    try:
+        await asyncio.sleep(STARTUP_DELAY)
+        with background():
+            while True:
+                await refresh_once()
+                await asyncio.sleep(REFRESH_INTERVAL)
+    finally:
+        lock.close()
@@ -0,0 +1,69 @@
+import json
+
+from fastapi.responses import JSONResponse, Response
+from pydantic import BaseModel
+
+from app import conditional
+from app.metrics import stage
+from app.schema import PYDANTIC_V2, StatRows
+
+try:
+    import orjson
+except ImportError:  # stdlib json fallback
+    orjson = None
+
+# One JSON encoder for every response. Endpoints return `json_response(...)` so
+# FastAPI hands the content over as-is instead of running jsonable_encoder first:
+# pydantic models serialize themselves, plain dicts and lists go through orjson
+# when it's installed. Pretty-printing is an indent flag, not a second dump.
+
+
+def _default(obj):
+    """Encode what orjson/json don't know natively: nested schema models and StatRows."""
+    if isinstance(obj, BaseModel):
+        return obj.model_dump() if PYDANTIC_V2 else obj.dict()
+    if isinstance(obj, StatRows):
+        return obj.to_dicts()
+    if isinstance(obj, (set, frozenset, tuple)):
+        return list(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(content, pretty: bool = False) -> bytes:
+    if PYDANTIC_V2 and isinstance(content, BaseModel):
+        # Serialized by pydantic-core straight to bytes, no intermediate dict
+        return content.model_dump_json(indent=2 if pretty else None).encode()
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if pretty else 0)
+        return orjson.dumps(content, default=_default, option=option)
+    if pretty:
+        return json.dumps(content, default=_default, indent=2, ensure_ascii=False).encode()
+    return json.dumps(content, default=_default, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with `dumps`; used as the app's default response class."""
+
+    def __init__(self, content=None, status_code: int = 200, headers: dict = None, media_type: str = None,
+                 background=None, pretty: bool = False):
+        self.pretty = pretty
+        super().__init__(content, status_code, headers, media_type, background)
+
+    def render(self, content) -> bytes:
+        with stage("serialize"):
+            return dumps(content, self.pretty)
+
+
+def json_response(content, pretty: bool = False, status_code: int = 200) -> Response:
+    """Serialize `content`, or answer 304 first if the client already has this version of it."""
+    found = conditional.validators() if status_code == 200 else None
+    headers = {}
+    if found:
+        etag, last_modified = found
+        headers["ETag"] = etag
+        if last_modified:
+            headers["Last-Modified"] = last_modified
+        if conditional.not_modified(etag, last_modified):
+            return Response(status_code=304, headers=headers)
+    response = FastJSONResponse(content, status_code=status_code, headers=headers, pretty=pretty)
+    return conditional.compress(response)
@@ -0,0 +1,61 @@
+import asyncio
+import os
+import re
+
+from app.cache import fetch
+from app.config import SPORTS_REFERENCE_URL
+from app.conditional import note_text
+from app.metrics import stage
+from app.player_page import load_player_page
+from app.player_index import record_roster
+from app.tables import TableSpec
+
+TEAM_SEASON_URL = SPORTS_REFERENCE_URL + "/cbb/schools/{slug}/men/{season}.html"
+
+ROSTER_SPEC = TableSpec("roster", links=("player",))
+
+# How many player pages a roster request may fetch at once
+ROSTER_CONCURRENCY = int(os.environ.get("SCOUTING_ROSTER_CONCURRENCY", "4"))
+
+
+def parse_roster(html: str) -> list:
+    """[(player name, player slug)] from the roster table of a team season page."""
+    table = ROSTER_SPEC.extract(html)
+    if table is None:
+        return []
+
+    players = []
+    for link in table.links["player"]:
+        if not link:
+            continue
+        href, name = link
+        match = re.search(r"/cbb/players/([^/]+)\.html", href)
+        if match:
+            players.append((name, match.group(1)))
+    return players
+
+
+async def load_roster(team_slug: str, season: str) -> list:
+    url = TEAM_SEASON_URL.format(slug=team_slug, season=season)
+    response = await fetch(url)
+    if response.status_code != 200:
+        raise ValueError(f"Team season page not found: {url}")
+    note_text(url, response.text)
+    with stage("parse"):
+        players = await asyncio.to_thread(parse_roster, response.text)
+    record_roster(team_slug, season, players)
+    return players
+
+
+async def load_roster_pages(players: list, concurrency: int = None) -> list:
+    """Load every player's page in parallel, at most `concurrency` at a time.
+
+    Returns a PlayerPage or the raised exception per player, in roster order.
+    """
+    semaphore = asyncio.Semaphore(concurrency or ROSTER_CONCURRENCY)
+
+    async def load(player_slug):
+        async with semaphore:
+            return await load_player_page(player_slug)
+
+    return await asyncio.gather(*(load(slug) for _, slug in players), return_exceptions=True)
@@ -1,6 +1,6 @@
 # schema.py
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import Optional, Union, get_args, get_type_hints
 
 class ShotDistribution(BaseModel):
     atRim: Optional[float]
@@ -93,6 +93,202 @@ class TeamStats(BaseModel):
         extra = "ignore"
         allow_population_by_field_name = True
 
+# Numeric variants of PlayerStats/TeamStats: numbers are parsed once when the row is
+# scraped and percentages are fractions (0.456), so callers can sort and do math.
+class PlayerStatsNumeric(BaseModel):
+    season: Optional[str] = None
+    team: Optional[str] = None
+    conference: Optional[str] = None
+    class_year: Optional[str] = None
+    position: Optional[str] = None
+
+    games_played: Optional[int] = None
+    games_started: Optional[int] = None
+    minutes_played: Optional[float] = None
+
+    field_goals_made: Optional[float] = None
+    field_goal_attempts: Optional[float] = None
+    fg_percentage: Optional[float] = None
+
+    three_pt_made: Optional[float] = None
+    three_pt_attempts: Optional[float] = None
+    three_pt_percentage: Optional[float] = None
+
+    two_pt_made: Optional[float] = None
+    two_pt_attempts: Optional[float] = None
+    two_pt_percentage: Optional[float] = None
+
+    effective_fg_percentage: Optional[float] = None
+
+    free_throws_made: Optional[float] = None
+    free_throw_attempts: Optional[float] = None
+    free_throw_percentage: Optional[float] = None
+
+    offensive_rebounds: Optional[float] = None
+    defensive_rebounds: Optional[float] = None
+    total_rebounds: Optional[float] = None
+
+    assists: Optional[float] = None
+    steals: Optional[float] = None
+    blocks: Optional[float] = None
+    turnovers: Optional[float] = None
+    personal_fouls: Optional[float] = None
+    points: Optional[float] = None
+
+    awards: Optional[str] = None
+
+
+class TeamStatsNumeric(BaseModel):
+    school_name: Optional[str] = None
+    games: Optional[int] = None
+    wins: Optional[int] = None
+    losses: Optional[int] = None
+    win_loss_pct: Optional[float] = None
+    simple_rating_system: Optional[float] = None
+    strength_of_schedule: Optional[float] = None
+
+    wins_conference: Optional[int] = None
+    losses_conference: Optional[int] = None
+
+    wins_home: Optional[int] = None
+    losses_home: Optional[int] = None
+
+    wins_away: Optional[int] = None
+    losses_away: Optional[int] = None
+
+    points: Optional[int] = None
+    opponent_points: Optional[int] = None
+
+    minutes_played: Optional[int] = None
+    field_goals: Optional[int] = None
+    field_goal_attempts: Optional[int] = None
+    field_goal_percentage: Optional[float] = None
+    three_point_field_goals: Optional[int] = None
+    three_point_field_goal_attempts: Optional[int] = None
+    three_point_field_goal_percentage: Optional[float] = None
+    free_throws: Optional[int] = None
+    free_throw_attempts: Optional[int] = None
+    free_throw_percentage: Optional[float] = None
+    offensive_rebounds: Optional[int] = None
+    total_rebounds: Optional[int] = None
+    assists: Optional[int] = None
+    steals: Optional[int] = None
+    blocks: Optional[int] = None
+    turnovers: Optional[int] = None
+    personal_fouls: Optional[int] = None
+
+
+_field_kinds = {}
+
+
+def field_kinds(model) -> dict:
+    """{field: str | int | float | "pct"} from a model's annotations, computed once per model."""
+    kinds = _field_kinds.get(model)
+    if kinds is None:
+        kinds = {}
+        for name, hint in get_type_hints(model).items():
+            if name.startswith("_") or getattr(hint, "__origin__", None) is not Union:
+                continue
+            kind = next(arg for arg in get_args(hint) if arg is not type(None))
+            kinds[name] = "pct" if kind is float and (name.endswith("percentage") or name.endswith("_pct")) else kind
+        _field_kinds[model] = kinds
+    return kinds
+
+
+def to_number(value):
+    """int or float from a stats cell ("31", "31.2", ".456", "1,024"); None for blanks and non-numbers."""
+    if value is None or isinstance(value, (int, float)):
+        return value
+    value = value.strip().replace(",", "").rstrip("%")
+    if not value:
+        return None
+    try:
+        return float(value) if "." in value else int(value)
+    except ValueError:
+        return None
+
+
+def percentage(value):
+    """A percentage as a fraction: ".456", "0.456", "45.6" and "45.6%" all give 0.456."""
+    number = to_number(value)
+    if number is None:
+        return None
+    return round(number / 100, 4) if number > 1 else float(number)
+
+
+PYDANTIC_V2 = hasattr(BaseModel, "model_validate")
+
+
+def trusted(model, values: dict):
+    """Build `model` from data we produced ourselves; unknown keys are dropped.
+
+    Pydantic 1 validation is slow, so it's skipped with `construct`. Pydantic 2's
+    compiled validator is faster than its Python-side `model_construct`, so there
+    we validate.
+    """
+    if PYDANTIC_V2:
+        return model.model_validate(values)
+    kinds = field_kinds(model)
+    return model.construct(**{key: value for key, value in values.items() if key in kinds})
+
+
+def numeric_values(model, values: dict) -> dict:
+    """Raw scraped strings (or already-parsed numbers) typed for a numeric model's fields."""
+    kinds = field_kinds(model)
+    typed = {}
+    for key, value in values.items():
+        kind = kinds.get(key)
+        if kind is None:
+            continue
+        if kind == "pct":
+            value = percentage(value)
+        elif kind is not str:
+            value = to_number(value)
+            if value is not None:
+                value = kind(value)
+        typed[key] = value
+    return typed
+
+
+def numeric(model, values: dict):
+    """Build a numeric model (PlayerStatsNumeric, TeamStatsNumeric) from a scraped row."""
+    return trusted(model, numeric_values(model, values))
+
+
+class StatRows:
+    """Array-backed rows for bulk results: one tuple per row over a shared field list.
+
+    Far smaller than a list of dicts or models; serialize with `to_dicts()` or,
+    more compactly, `to_columns()` ({"fields": [...], "rows": [[...], ...]}).
+    """
+    __slots__ = ("fields", "rows", "_positions")
+
+    def __init__(self, fields: list):
+        self.fields = list(fields)
+        self.rows = []
+        self._positions = {field: i for i, field in enumerate(self.fields)}
+
+    def __len__(self):
+        return len(self.rows)
+
+    def append(self, values: dict):
+        row = [None] * len(self.fields)
+        for key, value in values.items():
+            i = self._positions.get(key)
+            if i is not None:
+                row[i] = value
+        self.rows.append(tuple(row))
+
+    def to_dicts(self, skip_none: bool = False) -> list:
+        fields = self.fields
+        if skip_none:
+            return [{f: v for f, v in zip(fields, row) if v is not None} for row in self.rows]
+        return [dict(zip(fields, row)) for row in self.rows]
+
+    def to_columns(self) -> dict:
+        return {"fields": self.fields, "rows": [list(row) for row in self.rows]}
+
+
 class PlayerBoxScore(BaseModel):
     name: str
     minutes: str
@@ -108,6 +304,8 @@ class PlayerBoxScore(BaseModel):
     to: str
     pf: str
     pts: str
+    plus_minus: Optional[str] = None
+    starter: Optional[bool] = None
 
 class TeamTotals(BaseModel):
     minutes: str
@@ -126,6 +324,34 @@ class TeamTotals(BaseModel):
 
 class BoxScore(BaseModel):
     game_id: str
+    game: Optional[dict] = None
     teams: dict[str, list[PlayerBoxScore]]
     team_stats: dict[str, TeamTotals]
 
+
+class ShootingSplit(BaseModel):
+    games: int = 0
+    field_goals_made: int = 0
+    field_goal_attempts: int = 0
+    fg_percentage: Optional[float] = None
+    three_pt_made: int = 0
+    three_pt_attempts: int = 0
+    three_pt_percentage: Optional[float] = None
+    free_throws_made: int = 0
+    free_throw_attempts: int = 0
+    free_throw_percentage: Optional[float] = None
+    total_made: int = 0
+    total_attempts: int = 0
+    total_percentage: Optional[float] = None
+
+class PlayerSplits(BaseModel):
+    name: str
+    conference: ShootingSplit
+    non_conference: ShootingSplit
+
+class TeamSplits(BaseModel):
+    team: str
+    season: str
+    conference_games: int
+    non_conference_games: int
+    players: list[PlayerSplits]
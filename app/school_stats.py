@@ -0,0 +1,202 @@
+import asyncio
+import re
+import time
+
+from app import warehouse
+from app.cache import fetch, current_season, TTL_CURRENT_SEASON
+from app.config import SPORTS_REFERENCE_URL
+from app.conditional import note_source
+from app.loader import CachedLoader
+from app.metrics import stage
+from app.schema import to_number
+from app.singleflight import SingleFlight
+from app.tables import TableSpec, append_cells
+from app.teams import get_resolver
+
+SCHOOL_STATS_URL = SPORTS_REFERENCE_URL + "/cbb/seasons/{season}-school-stats.html"
+# What each school's opponents did against it, one row per school (opp_fga, opp_orb, ...)
+OPPONENT_STATS_URL = SPORTS_REFERENCE_URL + "/cbb/seasons/{season}-opponent-stats.html"
+
+# One row per school; repeated header rows have no school_name data cell
+SCHOOL_STATS_SPEC = TableSpec("basic_school_stats", required="school_name", links=("school_name",))
+
+
+def normalize_school_name(name: str) -> str:
+    """Lowercase, drop punctuation, so "Saint Mary's (CA)" and "saint-marys-ca" compare equal."""
+    name = name.lower().replace("&amp;", "&")
+    name = re.sub(r"['.&]", "", name)
+    name = re.sub(r"[^a-z0-9]+", " ", name)
+    return name.strip()
+
+
+class SchoolStatsTable:
+    """All Division I rows of one season's school-stats table.
+
+    Raw cell text is kept column-wise in `columns[stat]`, numeric columns are
+    parsed once into `numeric[stat]`, and rows are indexed by sports-reference
+    slug and by normalized school name.
+    """
+    __slots__ = ("season", "names", "slugs", "stats", "columns", "numeric", "by_slug", "by_name", "loaded_at")
+
+    def __init__(self, season: str):
+        self.season = season
+        self.names = []
+        self.slugs = []
+        self.stats = []
+        self.columns = {}
+        self.numeric = {}
+        self.by_slug = {}
+        self.by_name = {}
+        self.loaded_at = time.time()
+
+    def __len__(self):
+        return len(self.names)
+
+    def add_row(self, name: str, slug: str, cells: list):
+        i = len(self.names)
+        self.names.append(name)
+        self.slugs.append(slug)
+        append_cells(self.stats, self.columns, i, cells)
+        if slug:
+            self.by_slug[slug] = i
+        self.by_name[normalize_school_name(name)] = i
+
+    def finish(self):
+        for stat, column in self.columns.items():
+            values = [to_number(v) for v in column]
+            if any(v is not None for v in values):
+                self.numeric[stat] = values
+
+    def lookup(self, team: str):
+        """Row index for a slug ("san-diego-state"), school name or any alias the team resolver knows ("SDSU")."""
+        key = team.strip().lower()
+        if key in self.by_slug:
+            return self.by_slug[key]
+        resolved = get_resolver().resolve(team)
+        if resolved and resolved.sref_slug in self.by_slug:
+            return self.by_slug[resolved.sref_slug]
+        normalized = normalize_school_name(key.replace("-", " "))
+        if normalized in self.by_name:
+            return self.by_name[normalized]
+        return self.by_slug.get(normalized.replace(" ", "-"))
+
+    def row(self, i: int) -> dict:
+        return {stat: self.columns[stat][i] for stat in self.stats}
+
+
+def parse_school_stats(season: str, html: str, table_id: str = "basic_school_stats") -> SchoolStatsTable:
+    spec = SCHOOL_STATS_SPEC if table_id == SCHOOL_STATS_SPEC.table_id else TableSpec(
+        table_id, required="school_name", links=("school_name",))
+    table = spec.extract(html)
+    if table is None:
+        raise ValueError(f"School stats table not found for {season}")
+
+    parsed = SchoolStatsTable(season)
+    for i, link in enumerate(table.links["school_name"]):
+        if link:
+            href, name = link
+            slug_match = re.search(r"/cbb/schools/([^/]+)/", href)
+            name = name.replace("\xa0", " ").strip()
+        else:
+            slug_match = None
+            name = (table.columns["school_name"][i] or "").replace("\xa0", " ").strip()
+            if name.endswith("NCAA"):
+                name = name[:-len("NCAA")].strip()
+        parsed.names.append(name)
+        parsed.slugs.append(slug_match.group(1) if slug_match else None)
+        if slug_match:
+            parsed.by_slug[slug_match.group(1)] = i
+        parsed.by_name[normalize_school_name(name)] = i
+    parsed.stats = table.stats
+    parsed.columns = table.columns
+    parsed.finish()
+    return parsed
+
+
+def table_from_rows(season: str, stored: dict) -> SchoolStatsTable:
+    """Rebuild a season's table from its warehouse rows."""
+    table = SchoolStatsTable(season)
+    for name, slug, row in stored["rows"]:
+        table.add_row(name, slug, list(row.items()))
+    table.finish()
+    table.loaded_at = stored["updated_at"]
+    return table
+
+
+def _is_fresh(season: str, loaded_at: float) -> bool:
+    return int(season) < current_season() or time.time() - loaded_at < TTL_CURRENT_SEASON
+
+
+def _register(table: SchoolStatsTable) -> SchoolStatsTable:
+    """Add the season's schools to the team resolver."""
+    resolver = get_resolver()
+    for name, slug in zip(table.names, table.slugs):
+        resolver.add_school(slug, name)
+    return table
+
+
+async def _fetch_school_stats(season: str) -> SchoolStatsTable:
+    url = SCHOOL_STATS_URL.format(season=season)
+    response = await fetch(url)
+    if response.status_code != 200:
+        raise ValueError(f"School stats not found: {url}")
+
+    with stage("parse"):
+        table = await asyncio.to_thread(parse_school_stats, season, response.text)
+    await asyncio.to_thread(warehouse.store_team_season, table)
+    return _register(table)
+
+
+_seasons = CachedLoader("school_stats", warehouse.team_season_rows,
+                        lambda season, stored: _register(table_from_rows(season, stored)), _fetch_school_stats,
+                        lambda table: _is_fresh(table.season, table.loaded_at))
+
+
+async def load_school_stats(season: str, refresh: bool = False) -> SchoolStatsTable:
+    """One download and parse per season; finished seasons stay in memory for good.
+
+    Seasons come from memory, then the warehouse, then upstream. `refresh` skips
+    straight to upstream.
+    """
+    season = str(season)
+    table = await _seasons.load(season, refresh)
+    note_source(f"season:{season}", table.loaded_at, table.loaded_at)
+    return table
+
+
+_opponent_seasons = {}
+_opponent_loads = SingleFlight("opponent_stats")
+
+
+async def load_opponent_stats(season: str, refresh: bool = False) -> SchoolStatsTable:
+    """A season's opponent-stats table, kept in memory like load_school_stats (not in the warehouse)."""
+    season = str(season)
+    table = _opponent_seasons.get(season)
+    if not (table and not refresh and _is_fresh(season, table.loaded_at)):
+        table = await _opponent_loads.do((season, refresh), lambda: _fetch_opponent_stats(season))
+    note_source(f"opponents:{season}", table.loaded_at, table.loaded_at)
+    return table
+
+
+async def _fetch_opponent_stats(season: str) -> SchoolStatsTable:
+    url = OPPONENT_STATS_URL.format(season=season)
+    response = await fetch(url)
+    if response.status_code != 200:
+        raise ValueError(f"Opponent stats not found: {url}")
+
+    with stage("parse"):
+        table = await asyncio.to_thread(parse_school_stats, season, response.text, "basic_opp_stats")
+    _opponent_seasons[season] = table
+    return table
+
+
+async def resolve_school_slug(team: str, season: str) -> str:
+    """sports-reference slug for a team name or slug, falling back to a slugified name."""
+    try:
+        table = await load_school_stats(season)
+    except ValueError:
+        table = None
+    i = table.lookup(team) if table else None
+    if i is not None and table.slugs[i]:
+        return table.slugs[i]
+    return normalize_school_name(team.replace("-", " ")).replace(" ", "-")
@@ -1,12 +1,24 @@
-import requests
-from bs4 import BeautifulSoup
+from app.cache import fetch, current_season, ttl_for_url, FOREVER
+from app.config import ESPN_URL
+from app.http_client import BROWSER_HEADERS
+from app.espn import load_game, box_score, iter_plays, play_by_play_teams, resolve_espn_team
+from app.schema import BoxScore, StatRows, TeamStatsNumeric, numeric_values
+from app.responses import dumps, json_response
+from app.conditional import note_source, text_version
+from app.metrics import stage
+from app.singleflight import SingleFlight
+from app.school_stats import load_school_stats, resolve_school_slug, SCHOOL_STATS_SPEC
+from app.teams import resolve_team
+from app.player_index import lookup_slug
+from app.roster import load_roster, load_roster_pages
+from app.player_page import load_player_page, PLAYER_TABLES, PLAYER_TABLE_SPECS
 import re
 import logging
-from bs4 import Comment
-import json
+import time
+import asyncio
 from fastapi import APIRouter, HTTPException
+from collections import OrderedDict
 from datetime import datetime
-import pandas as pd
 
 router = APIRouter()
 
@@ -14,334 +26,315 @@ router = APIRouter()
 @router.get("/nba/schedule/{team_slug}")
 async def get_team_schedule(team_slug: str):
     """Scrape the NBA team schedule from ESPN."""
-    return scrape_team_schedule(team_slug)
+    return json_response(await scrape_team_schedule(team_slug))
 
 # Add new router endpoint near the top with other routes
 @router.get("/nba/game/{game_id}")
 async def get_game_box_score(game_id: str):
     """Get box score for a specific NBA game."""
-    return scrape_game_box_score(game_id)
-
-headers = {
-    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/58.0.3029.110 Safari/537.36",
-    "Accept-Language": "en-US,en;q=0.9",
-    "Accept-Encoding": "gzip, deflate, br",
-    "Connection": "keep-alive",
-    "Upgrade-Insecure-Requests": "1",
-}
+    return json_response(await scrape_game_box_score(game_id))
+
+@router.get("/ncaab/game/{game_id}")
+async def get_ncaab_game_box_score(game_id: str):
+    """Get box score for a specific men's college game."""
+    return json_response(await scrape_game_box_score(game_id, "ncaab"))
+
+headers = BROWSER_HEADERS
 
 def format_player_name(name):
     if re.fullmatch(r"[a-z\-]+-\d+", name.lower()):
         return name.lower()
+    # Players we've already seen resolve to their real slug, even when it isn't "-1"
+    known_slug = lookup_slug(name)
+    if known_slug:
+        return known_slug
     parts = name.lower().split()
     return '-'.join(parts) + "-1"
 
 
-def scrape_season_stats(player: str, season: str) -> dict:
+# Unified field mapping for one season row; stats without an entry keep their data-stat name
+SEASON_STATS_SPEC = PLAYER_TABLE_SPECS["per_game"].mapped({
+    "year_id": "season",
+    "team_name_abbr": "team",
+    "conf_abbr": "conference",
+    "class": "class_year",
+    "pos": "position",
+    "g": "games_played",
+    "gs": "games_started",
+    "mp": "minutes_played",
+    "fg": "field_goals_made",
+    "fga": "field_goal_attempts",
+    "fg_pct": "fg_percentage",
+    "fg3": "three_pt_made",
+    "fg3a": "three_pt_attempts",
+    "fg3_pct": "three_pt_percentage",
+    "fg2": "two_pt_made",
+    "fg2a": "two_pt_attempts",
+    "fg2_pct": "two_pt_percentage",
+    "efg_pct": "effective_fg_percentage",
+    "ft": "free_throws_made",
+    "fta": "free_throw_attempts",
+    "ft_pct": "free_throw_percentage",
+    "orb": "offensive_rebounds",
+    "drb": "defensive_rebounds",
+    "trb": "total_rebounds",
+    "ast": "assists",
+    "stl": "steals",
+    "blk": "blocks",
+    "tov": "turnovers",
+    "pf": "personal_fouls",
+    "pts": "points"
+}, keep_unmapped=True)
+
+
+async def scrape_season_stats(player: str, season: str) -> dict:
     """Scrape stats for a given NCAA player and a specific season (e.g., '2023' for 2022–23)."""
     logger = logging.getLogger("uvicorn.error")
-    player_slug = format_player_name(player)
-    url = f"https://www.sports-reference.com/cbb/players/{player_slug}.html"
-    response = requests.get(url)
-
-    if response.status_code != 200:
-        raise ValueError(f"Player not found or URL failed: {url}")
-
-    soup = BeautifulSoup(response.text, "html.parser")
-
-    # Try to find tables in both regular HTML and comments
-    tables = {
-        'per_game': soup.find("table", {"id": "players_per_game"}),
-        'totals': soup.find("table", {"id": "players_totals"})
-    }
-
-    # Check comments for hidden tables
-    comments = soup.find_all(string=lambda text: isinstance(text, Comment))
-    for comment in comments:
-        comment_soup = BeautifulSoup(comment, "html.parser")
-        if not tables['per_game']:
-            tables['per_game'] = comment_soup.find("table", {"id": "players_per_game"})
-        if not tables['totals']:
-            tables['totals'] = comment_soup.find("table", {"id": "players_totals"})
+    page = await load_player_page(format_player_name(player))
 
     # Look for season data in both tables
-    row_data = None
-    for table_type, table in tables.items():
-        if not table:
-            continue
-        row = table.find("tr", {"id": f"players_{table_type}.{season}"})
-        if row:
-            row_data = row
-            break
-
+    row_data = page.row("per_game", season) or page.row("totals", season)
     if not row_data:
         raise ValueError(f"No stats found for season {season}")
 
-    # Unified field mapping
-    key_map = {
-        "year_id": "season",
-        "team_name_abbr": "team",
-        "conf_abbr": "conference",
-        "class": "class_year",
-        "pos": "position",
-        "g": "games_played",
-        "gs": "games_started",
-        "mp": "minutes_played",
-        "fg": "field_goals_made",
-        "fga": "field_goal_attempts",
-        "fg_pct": "fg_percentage",
-        "fg3": "three_pt_made",
-        "fg3a": "three_pt_attempts",
-        "fg3_pct": "three_pt_percentage",
-        "fg2": "two_pt_made",
-        "fg2a": "two_pt_attempts",
-        "fg2_pct": "two_pt_percentage",
-        "efg_pct": "effective_fg_percentage",
-        "ft": "free_throws_made",
-        "fta": "free_throw_attempts",
-        "ft_pct": "free_throw_percentage",
-        "orb": "offensive_rebounds",
-        "drb": "defensive_rebounds",
-        "trb": "total_rebounds",
-        "ast": "assists",
-        "stl": "steals",
-        "blk": "blocks",
-        "tov": "turnovers",
-        "pf": "personal_fouls",
-        "pts": "points"
-    }
-
-    results = {}
-    cells = row_data.find_all(["td", "th"])
-    for cell in cells:
-        raw_key = cell.get("data-stat")
-        mapped_key = key_map.get(raw_key, raw_key)
-        val = cell.text.strip()
-        results[mapped_key] = val if val else None
+    with stage("map"):
+        results = SEASON_STATS_SPEC.project(row_data)
 
     logger.info(f"Scraped {season} stats for {player}: {results}")
     return results
 
 
-def scrape_career_stats_totals(player: str) -> dict:
-    player_slug = format_player_name(player)
-    url = f"https://www.sports-reference.com/cbb/players/{player_slug}.html"
-    response = requests.get(url)
-    if response.status_code != 200:
-        raise ValueError(f"Player not found: {url}")
-
-    soup = BeautifulSoup(response.text, "html.parser")
-
-    comments = soup.find_all(string=lambda text: isinstance(text, Comment))
-    for comment in comments:
-        soup.append(BeautifulSoup(comment, "html.parser"))
-
-    table = soup.find("table", {"id": "players_totals"})
-    if not table:
+# The Career totals row: mapped stats only, blank cells dropped
+CAREER_TOTALS_SPEC = PLAYER_TABLE_SPECS["totals"].mapped({
+    "year_id": "season",
+    "g": "games_played",
+    "games": "games_played",
+    "gs": "games_started",
+    "games_started": "games_started",
+    "mp": "minutes_played",
+    "fg": "field_goals_made",
+    "fga": "field_goal_attempts",
+    "fg_pct": "fg_percentage",
+    "fg3": "three_pt_made",
+    "fg3a": "three_pt_attempts",
+    "fg3_pct": "three_pt_percentage",
+    "fg2": "two_pt_made",
+    "fg2a": "two_pt_attempts",
+    "fg2_pct": "two_pt_percentage",
+    "efg_pct": "effective_fg_percentage",
+    "ft": "free_throws_made",
+    "fta": "free_throw_attempts",
+    "ft_pct": "free_throw_percentage",
+    "orb": "offensive_rebounds",
+    "drb": "defensive_rebounds",
+    "trb": "total_rebounds",
+    "ast": "assists",
+    "stl": "steals",
+    "blk": "blocks",
+    "tov": "turnovers",
+    "pf": "personal_fouls",
+    "pts": "points",
+    "awards": "awards"
+}, skip_empty=True)
+
+
+async def scrape_career_stats_totals(player: str) -> dict:
+    page = await load_player_page(format_player_name(player))
+    if "totals" not in page.tables:
         raise ValueError("Totals table not found.")
 
-    rows = table.find_all("tr")
-    seasons_played = 0
-    for row in rows:
-        row_id = row.get("id", "")
-        if row_id == "players_totals.Career":
-            break
-        if re.match(r"players_totals\.\d{4}", row_id):
-            seasons_played += 1
-
-    career_row = table.find("tr", {"id": "players_totals.Career"})
+    career_row = page.row("totals", "Career")
     if not career_row:
         raise ValueError("Career totals row not found.")
 
-    key_map = {
-        "year_id": "season",
-        "g": "games_played",
-        "games": "games_played",
-        "gs": "games_started",
-        "games_started": "games_started",
-        "mp": "minutes_played",
-        "fg": "field_goals_made",
-        "fga": "field_goal_attempts",
-        "fg_pct": "fg_percentage",
-        "fg3": "three_pt_made",
-        "fg3a": "three_pt_attempts",
-        "fg3_pct": "three_pt_percentage",
-        "fg2": "two_pt_made",
-        "fg2a": "two_pt_attempts",
-        "fg2_pct": "two_pt_percentage",
-        "efg_pct": "effective_fg_percentage",
-        "ft": "free_throws_made",
-        "fta": "free_throw_attempts",
-        "ft_pct": "free_throw_percentage",
-        "orb": "offensive_rebounds",
-        "drb": "defensive_rebounds",
-        "trb": "total_rebounds",
-        "ast": "assists",
-        "stl": "steals",
-        "blk": "blocks",
-        "tov": "turnovers",
-        "pf": "personal_fouls",
-        "pts": "points",
-        "awards": "awards"
-    }
-
-    results = {"seasons_played": seasons_played}
-    for cell in career_row.find_all(["td", "th"]):
-        key = key_map.get(cell.get("data-stat"))
-        if key and cell.text.strip():
-            results[key] = cell.text.strip()
+    with stage("map"):
+        results = {"seasons_played": page.seasons_played(), **CAREER_TOTALS_SPEC.project(career_row)}
     return results
 
 def slug_to_display_name(slug: str) -> str:
     return slug.replace("-", " ").title()
 
-def scrape_basic_team_stats(team: str, season: str) -> dict:
-    url = f"https://www.sports-reference.com/cbb/seasons/{season}-school-stats.html"
-    response = requests.get(url)
-    if response.status_code != 200:
-        raise ValueError(f"Player not found: {url}")
-
-    soup = BeautifulSoup(response.text, "html.parser")
-
-    comments = soup.find_all(string=lambda text: isinstance(text, Comment))
-    for comment in comments:
-        soup.append(BeautifulSoup(comment, "html.parser"))
-
-    table = soup.find("tbody")
-    if not table:
-        # Try to find any table if tbody not found directly
-        table = soup.find("table")
-        if table:
-            table = table.find("tbody")
-
-    display_name = slug_to_display_name(team)
-    rows = table.find_all("tr")
-    row = None
-    for r in rows:
-        school_cell = r.find("td", {"data-stat": "school_name"})
-        if school_cell and display_name.lower() in school_cell.get_text().lower():
-            row = r
-            break
-
-    if not row:
-        raise ValueError(f"Team {display_name} not found in {season} stats.")
-
-    key_map ={
-       "g": "games",
-       "wins" : "wins",
-       "losses" : "losses",
-       "win_loss_pct": "win_loss_pct",
-       "srs": "simple_rating_system",
-       "sos": "strength_of_schedule",
-       "wins_conf": "wins_conference",
-       "losses_conf": "losses_conference",
-       "wins_home": "wins_home",
-       "losses_home": "losses_home",
-       "wins_visitor": "wins_away",
-       "losses_visitor": "losses_away",
-       "pts": "points",
-       "opp_pts": "opponent_points",
-       "mp": "minutes_played",
-       "fg": "field_goals",
-       "fga": "field_goal_attempts",
-       "fg_pct": "field_goal_percentage",
-       "fg3": "three_point_field_goals",
-       "fg3a": "three_point_field_goal_attempts",
-       "fg3_pct": "three_point_field_goal_percentage",
-       "ft": "free_throws",
-       "fta": "free_throw_attempts",
-       "ft_pct": "free_throw_percentage",
-       "orb": "offensive_rebounds",
-       "trb": "total_rebounds",
-       "ast": "assists",
-       "stl": "steals",
-       "blk": "blocks",
-       "tov": "turnovers",
-       "pf": "personal_fouls",
-   }
-    results = {"school_name": display_name,
-               "season": season}
-    # Include <th> as well since "ranker" is in a <th>, not <td>
-    for cell in row.find_all(["td", "th"]):
-        key = key_map.get(cell.get("data-stat"))
-        value = cell.text.strip()
-        if key and value and value != '':  # Avoid empty or dummy cells
-            results[key] = value
+TEAM_KEY_MAP = {
+    "g": "games",
+    "wins" : "wins",
+    "losses" : "losses",
+    "win_loss_pct": "win_loss_pct",
+    "srs": "simple_rating_system",
+    "sos": "strength_of_schedule",
+    "wins_conf": "wins_conference",
+    "losses_conf": "losses_conference",
+    "wins_home": "wins_home",
+    "losses_home": "losses_home",
+    "wins_visitor": "wins_away",
+    "losses_visitor": "losses_away",
+    "pts": "points",
+    "opp_pts": "opponent_points",
+    "mp": "minutes_played",
+    "fg": "field_goals",
+    "fga": "field_goal_attempts",
+    "fg_pct": "field_goal_percentage",
+    "fg3": "three_point_field_goals",
+    "fg3a": "three_point_field_goal_attempts",
+    "fg3_pct": "three_point_field_goal_percentage",
+    "ft": "free_throws",
+    "fta": "free_throw_attempts",
+    "ft_pct": "free_throw_percentage",
+    "orb": "offensive_rebounds",
+    "trb": "total_rebounds",
+    "ast": "assists",
+    "stl": "steals",
+    "blk": "blocks",
+    "tov": "turnovers",
+    "pf": "personal_fouls",
+}
+# Mapped stats only; empty or dummy cells are dropped
+TEAM_STATS_SPEC = SCHOOL_STATS_SPEC.mapped(TEAM_KEY_MAP, skip_empty=True)
+
+async def scrape_basic_team_stats(team: str, season: str) -> dict:
+    table = await load_school_stats(season)
+
+    i = table.lookup(team)
+    if i is None:
+        raise ValueError(f"Team {slug_to_display_name(team)} not found in {season} stats.")
+
+    with stage("map"):
+        results = {"school_name": table.names[i],
+                   "season": season,
+                   **TEAM_STATS_SPEC.project(table.row(i))}
 
     return results
 
-def test_scrape(player):
+async def scrape_season_team_stats(season: str, typed: bool = False) -> StatRows:
+    """Every Division I team's row of the season school-stats table.
+
+    With `typed`, values come from the table's parsed numeric columns and are
+    typed as in TeamStatsNumeric.
+    """
+    table = await load_school_stats(season)
+    columns = TEAM_STATS_SPEC.columns
+    stats = [stat for stat in table.stats if stat in columns]
+    teams = StatRows(["school_name", "slug", "season", *(columns[stat] for stat in stats)])
+    with stage("map"):
+        for i in range(len(table)):
+            results = {"school_name": table.names[i], "slug": table.slugs[i], "season": season}
+            for stat in stats:
+                value = table.columns[stat][i]
+                if value:
+                    results[columns[stat]] = table.numeric[stat][i] if typed and stat in table.numeric else value
+            if typed:
+                results = {**numeric_values(TeamStatsNumeric, results), "slug": table.slugs[i], "season": season}
+            teams.append(results)
+    return teams
+
+PLAYER_KEY_MAP = {
+    "year_id": "season",
+    "team_name_abbr": "team",
+    "conf_abbr": "conference",
+    "class": "class_year",
+    "pos": "position",
+    "g": "games_played",
+    "games": "games_played",
+    "gs": "games_started",
+    "games_started": "games_started",
+    "mp": "minutes_played",
+    "fg": "field_goals_made",
+    "fga": "field_goal_attempts",
+    "fg_pct": "fg_percentage",
+    "fg3": "three_pt_made",
+    "fg3a": "three_pt_attempts",
+    "fg3_pct": "three_pt_percentage",
+    "fg2": "two_pt_made",
+    "fg2a": "two_pt_attempts",
+    "fg2_pct": "two_pt_percentage",
+    "efg_pct": "effective_fg_percentage",
+    "ft": "free_throws_made",
+    "fta": "free_throw_attempts",
+    "ft_pct": "free_throw_percentage",
+    "orb": "offensive_rebounds",
+    "drb": "defensive_rebounds",
+    "trb": "total_rebounds",
+    "ast": "assists",
+    "stl": "steals",
+    "blk": "blocks",
+    "tov": "turnovers",
+    "pf": "personal_fouls",
+    "pts": "points",
+    "awards": "awards"
+}
+PLAYER_ROW_SPEC = PLAYER_TABLE_SPECS["totals"].mapped(PLAYER_KEY_MAP, keep_unmapped=True)
+
+def map_player_row(row: dict) -> dict:
+    return PLAYER_ROW_SPEC.project(row)
+
+async def test_scrape(player):
     logger = logging.getLogger("uvicorn.error")
     player_slug = format_player_name(player)
     logger.info(f"PLAYER_SLUG: {player_slug}")
-    url = f"https://www.sports-reference.com/cbb/players/{player_slug}.html"
-    response = requests.get(url)
-    logger.info(f"URL: {url}")
+    page = await load_player_page(player_slug)
 
-    if response.status_code != 200:
-        raise ValueError(f"Player not found or URL failed: {url}")
-
-    soup = BeautifulSoup(response.text, "html.parser")
-    totals_table = soup.find("table", {"id": "players_totals"})
-    if not totals_table:
+    if "totals" not in page.tables:
         raise ValueError("No totals table found.")
 
-    row_2025 = totals_table.find("tr", {"id": "players_totals.2025"})
+    row_2025 = page.row("totals", "2025")
     if not row_2025:
         raise ValueError("No 2024–25 season stats found.")
 
-    key_map = {
-        "year_id": "season",
-        "team_name_abbr": "team",
-        "conf_abbr": "conference",
-        "class": "class_year",
-        "pos": "position",
-        "games": "games_played",
-        "games_started": "games_started",
-        "mp": "minutes_played",
-        "fg": "field_goals_made",
-        "fga": "field_goal_attempts",
-        "fg_pct": "fg_percentage",
-        "fg3": "three_pt_made",
-        "fg3a": "three_pt_attempts",
-        "fg3_pct": "three_pt_percentage",
-        "fg2": "two_pt_made",
-        "fg2a": "two_pt_attempts",
-        "fg2_pct": "two_pt_percentage",
-        "efg_pct": "effective_fg_percentage",
-        "ft": "free_throws_made",
-        "fta": "free_throw_attempts",
-        "ft_pct": "free_throw_percentage",
-        "orb": "offensive_rebounds",
-        "drb": "defensive_rebounds",
-        "trb": "total_rebounds",
-        "ast": "assists",
-        "stl": "steals",
-        "blk": "blocks",
-        "tov": "turnovers",
-        "pf": "personal_fouls",
-        "pts": "points",
-        "awards": "awards"
-    }
-
-    results = {}
-    cells = row_2025.find_all(["td", "th"])
-    logger.info(f"# of cells found in row: {len(cells)}")
-
-    for cell in cells:
-        raw_key = cell.get("data-stat")
-        mapped_key = key_map.get(raw_key, raw_key)
-        val = cell.text.strip()
-        results[mapped_key] = val if val else None
-
+    with stage("map"):
+        results = map_player_row(row_2025)
     logger.info(f"SCRAPED STATS: {results}")
     return results
 
-def parse_game_date(date_str: str) -> str:
-    """Convert date string to YYYY-MM-DD format."""
+async def scrape_all_seasons(player: str) -> dict:
+    """Every season of a player's per-game and totals tables plus the Career rows, from one page load."""
+    page = await load_player_page(format_player_name(player))
+    with stage("map"):
+        result = {"player": page.name, "slug": page.slug, "seasons_played": page.seasons_played()}
+        for table_type in PLAYER_TABLES:
+            table = page.tables.get(table_type)
+            seasons = table.seasons() if table else []
+            result[table_type] = [map_player_row(table.row(season)) for season in seasons]
+            career = table.row("Career") if table else None
+            result[f"career_{table_type}"] = map_player_row(career) if career else None
+    return result
+
+async def scrape_team_roster(team: str, season: str, concurrency: int = None) -> dict:
+    """Season stats for every player on a team's roster, fetched in parallel."""
+    logger = logging.getLogger("uvicorn.error")
+    team_slug = await resolve_school_slug(team, season)
+    players = await load_roster(team_slug, season)
+    if not players:
+        raise ValueError(f"No roster found for {team} in {season}")
+
+    pages = await load_roster_pages(players, concurrency)
+    roster = []
+    with stage("map"):
+        for (name, player_slug), page in zip(players, pages):
+            entry = {"name": name, "slug": player_slug, "stats": None}
+            if isinstance(page, Exception):
+                logger.warning(f"Roster player {player_slug} failed: {page}")
+                entry["error"] = str(page)
+            else:
+                row = page.row("per_game", season) or page.row("totals", season)
+                if row:
+                    entry["stats"] = map_player_row(row)
+            roster.append(entry)
+
+    return {"team": team_slug, "season": season, "players": roster}
+
+def parse_game_date(date_str: str, season: int = None) -> str:
+    """Convert date string to YYYY-MM-DD format.
+
+    With `season` (e.g. 2025 for 2024-25) the year comes from the season, so
+    upcoming games get their real date too.
+    """
     if date_str == "DATE" or not date_str:
         return None
     try:
+        if season:
+            date_obj = datetime.strptime(f"{date_str} {season}", "%a, %b %d %Y")
+            if date_obj.month >= 10:
+                date_obj = date_obj.replace(year=season - 1)
+            return date_obj.strftime("%Y-%m-%d")
         # Add current year since the input only has month and day
         current_year = datetime.now().year
         date_obj = datetime.strptime(f"{date_str} {current_year}", "%a, %b %d %Y")
@@ -390,7 +383,7 @@ def clean_game_result(result: str) -> dict:
 
     return result_data
 
-def clean_schedule_data(raw_schedule: list) -> list:
+def clean_schedule_data(raw_schedule: list, season: int = None) -> list:
     """Clean and structure raw schedule data."""
     cleaned = []
 
@@ -400,12 +393,15 @@ def clean_schedule_data(raw_schedule: list) -> list:
             continue
 
         clean_game = {
-            "date": parse_game_date(game["date"]),
+            "date": parse_game_date(game["date"], season),
             "opponent": game["opponent"],
             "record": game["record"],
             "game_id": game.get("game_id"),
             "game_url": game.get("game_url")
         }
+        for key in ("opponent_team_id", "conference_game"):
+            if key in game:
+                clean_game[key] = game[key]
 
         # Add parsed result data
         result_data = clean_game_result(game["result"])
@@ -416,15 +412,32 @@ def clean_schedule_data(raw_schedule: list) -> list:
 
     return cleaned
 
-def get_team_seasons(team_slug: str) -> int:
+# (team slug, current season) -> seasons played; the count only changes once a season
+_team_seasons = {}
+
+
+async def get_team_seasons(team_slug: str) -> int:
     """Get the number of seasons played by the team."""
-    url = f"https://www.espn.com/nba/team/stats/_/name/{team_slug}"
-    response = requests.get(url, headers=headers)
+    key = (team_slug, current_season())
+    if key not in _team_seasons:
+        count = await _get_team_seasons(team_slug)
+        if count is not None:
+            _team_seasons[key] = count
+        return count
+    return _team_seasons[key]
+
+
+async def _get_team_seasons(team_slug: str) -> int:
+    from bs4 import BeautifulSoup
+
+    url = f"{ESPN_URL}/nba/team/stats/_/name/{team_slug}"
+    response = await fetch(url, headers=headers)
 
     if response.status_code != 200:
         return None
 
-    soup = BeautifulSoup(response.text, "html.parser")
+    with stage("parse"):
+        soup = BeautifulSoup(response.text, "html.parser")
 
     # Look for team history in multiple possible locations
     possible_containers = [
@@ -458,27 +471,22 @@ def get_team_seasons(team_slug: str) -> int:
     # If we couldn't find the information
     return None
 
-def scrape_team_schedule(team_slug: str):
-    """Scrape the NBA team schedule from ESPN."""
-    url = f"https://www.espn.com/nba/team/schedule/_/name/{team_slug}/seasontype/2"
-
-    # Get seasons count first
-    seasons_count = get_team_seasons(team_slug)
-
-    # Make the GET request with headers
-    response = requests.get(url, headers=headers)
+def parse_opponent(text: str) -> tuple:
+    """Split an ESPN opponent cell like "vs 13 Houston *" into (name, is conference game)."""
+    conference = text.rstrip().endswith("*")
+    name = re.sub(r"^(vs\.?|@)\s*", "", text.strip().rstrip("*").strip())
+    name = re.sub(r"^\d+\s+", "", name)  # AP ranking
+    return name.strip(), conference
 
-    if response.status_code != 200:
-        print("Failed to fetch schedule")
-        return {"error": "Failed to fetch schedule"}
+def parse_schedule(html: str, league: str = "nba"):
+    """Raw game rows from an ESPN team schedule page, or None if it has no schedule table."""
+    from bs4 import BeautifulSoup
 
-    # Parse the response HTML using BeautifulSoup
-    soup = BeautifulSoup(response.text, "html.parser")
+    soup = BeautifulSoup(html, "html.parser")
     schedule_table = soup.find("table")
 
     if not schedule_table:
-        print(" Schedule table not found")
-        return {"error": "Schedule table not found"}
+        return None
 
     schedule = []
     for row in schedule_table.find_all("tr")[1:]:  # Skip header row
@@ -506,208 +514,162 @@ def scrape_team_schedule(team_slug: str):
             "game_id": game_id,
             "game_url": game_url
         }
+        if league == "ncaab":
+            opponent_name, conference_game = parse_opponent(game["opponent"])
+            opponent = resolve_team(opponent_name)
+            game["opponent_team_id"] = opponent.id if opponent else None
+            game["conference_game"] = conference_game
         schedule.append(game)
+    return schedule
+
+async def scrape_team_schedule(team_slug: str, league: str = "nba", season: str = None, seasons_played: bool = True):
+    """Scrape a team schedule from ESPN.
+
+    For the NBA `team_slug` is ESPN's abbreviation ('lal'). For men's college
+    basketball (league='ncaab') it can be any name the team resolver (or, with
+    SCOUTING_ESPN_TEAM_LIST set, ESPN's team list) knows.
+    `season` (e.g. '2024') picks a past season instead of the current one.
+    Callers that only want the games can skip the NBA seasons-played lookup
+    with `seasons_played=False`.
+    """
+    if league == "ncaab":
+        team = await resolve_espn_team(team_slug)
+        if not team:
+            return {"error": f"Unknown team: {team_slug}"}
+        url = f"{ESPN_URL}/mens-college-basketball/team/schedule/_/id/{team.espn_id}"
+        if season:
+            url += f"/season/{season}"
+        seasons_count = None
+    else:
+        url = f"{ESPN_URL}/nba/team/schedule/_/name/{team_slug}"
+        if season:
+            url += f"/season/{season}"
+        url += "/seasontype/2"
+        seasons_count = await get_team_seasons(team_slug) if seasons_played else None
 
-    # Clean and format the schedule data
-    cleaned_schedule = clean_schedule_data(schedule)
+    try:
+        cleaned_schedule = await load_schedule(url, league, int(season) if season else current_season())
+    except ValueError as e:
+        return {"error": str(e)}
     return {
         "team": team_slug.upper(),
         "seasons_played": seasons_count,
         "schedule": cleaned_schedule
     }
 
-def parse_meta_description(description: str) -> tuple:
-    """Parse game metadata from description."""
-    try:
-        if not description:
-            return None, None, None
-        # Example: "Box score for the Portland Trail Blazers vs. Los Angeles Lakers NBA game..."
-        teams = description.split('Box score for the ')[1].split(' NBA game')[0]
-        team1, team2 = teams.split(' vs. ')
-        return team1.strip(), team2.strip(), None
-    except:
-        return None, None, None
-
-def parse_meta_title(title: str) -> tuple:
-    """Parse game scores from title."""
-    try:
-        if not title or '-' not in title:
-            return None, None
-        # Example: "Trail Blazers 109-81 Lakers"
-        score_part = title.split('(')[0].strip()
-        score1, score2 = score_part.split('-')
-        team1_score = int(score1.split()[-1])
-        team2_score = int(score2.split()[0])
-        return team1_score, team2_score
-    except:
-        return None, None
-
-def scrape_game_box_score(game_id: str) -> dict:
-    """Scrape box score data for a specific NBA game."""
-    logger = logging.getLogger("uvicorn.error")
-
-    try:
-        box_score_url = f"https://www.espn.com/nba/boxscore/_/gameId/{game_id}"
-        logger.info(f"Fetching box score from: {box_score_url}")
-
-        response = requests.get(box_score_url, headers=headers, timeout=10)
-        response.raise_for_status()
-
-        soup = BeautifulSoup(response.text, "html.parser")
+# url -> (when upstream last sent the page, its text_version, cleaned games)
+_schedules = OrderedDict()
+_schedule_loads = SingleFlight("team_schedule")
+MAX_SCHEDULES = 512
+
+async def load_schedule(url: str, league: str, season: int) -> list:
+    """Cleaned games from an ESPN schedule page, parsed once and reused while the cached page is fresh."""
+    cached = _schedules.get(url)
+    ttl = ttl_for_url(url)
+    if cached and (ttl is FOREVER or time.time() - cached[0] < ttl):
+        _schedules.move_to_end(url)
+    else:
+        cached = await _schedule_loads.do(url, lambda: _load_schedule(url, league, season))
+    note_source(url, cached[1])
+    return cached[2]
 
-        # Initialize result structure
-        result = {
-            "game": {},
-            "teams": {},
-            "team_stats": {}
-        }
+async def _load_schedule(url: str, league: str, season: int) -> tuple:
+    # Make the GET request with headers
+    response = await fetch(url, headers=headers)
 
-        # Try to get game info from metadata first
-        meta_desc = soup.find("meta", attrs={"name": "description"})
-        meta_title = soup.find("meta", attrs={"name": "twitter:title"})
-
-        if meta_desc and meta_title:
-            team1, team2, _ = parse_meta_description(meta_desc.get("content"))
-            score1, score2 = parse_meta_title(meta_title.get("content"))
-
-            if all([team1, team2, score1, score2]):
-                result["game"] = {
-                    "home_team": team2,  # Second team is usually home team
-                    "away_team": team1,
-                    "home_score": score2,
-                    "away_score": score1
-                }
-                logger.info(f"Successfully parsed game info from metadata: {result['game']}")
-
-        # Find tables with the correct classes
-        box_score_tables = soup.find_all("table", class_=lambda x: x and "Table" in x)
-
-        for table in box_score_tables:
-            team_name = table.find_previous("div", class_=lambda x: x and "TeamName" in x)
-            if not team_name:
-                continue
-
-            team_name = team_name.text.strip()
-            starters = []
-            bench = []
-
-            # Find all player rows
-            rows = table.find_all("tr", class_=lambda x: x and "Table__TR" in x)
-
-            for row in rows:
-                # Skip header rows and empty rows
-                if not row.get('data-idx'):
-                    continue
-
-                cells = row.find_all("td", class_="Table__TD")
-                if len(cells) < 14:  # Need minimum number of stat columns
-                    continue
-
-                # Parse player stats
-                player_stats = {
-                    "name": cells[0].text.strip(),
-                    "minutes": cells[1].text.strip(),
-                    "fg": cells[2].text.strip(),
-                    "threept": cells[3].text.strip(),
-                    "ft": cells[4].text.strip(),
-                    "oreb": cells[5].text.strip(),
-                    "dreb": cells[6].text.strip(),
-                    "reb": cells[7].text.strip(),
-                    "ast": cells[8].text.strip(),
-                    "stl": cells[9].text.strip(),
-                    "blk": cells[10].text.strip(),
-                    "to": cells[11].text.strip(),
-                    "pf": cells[12].text.strip(),
-                    "plus_minus": cells[13].text.strip(),
-                    "pts": cells[14].text.strip() if len(cells) > 14 else "0"
-                }
-
-                # Check if player is starter or bench
-                if int(row.get('data-idx', 0)) <= 5:
-                    starters.append(player_stats)
-                else:
-                    bench.append(player_stats)
+    if response.status_code != 200:
+        logging.getLogger("uvicorn.error").warning(f"Failed to fetch schedule {url}: {response.status_code}")
+        raise ValueError("Failed to fetch schedule")
 
-            # Add team data to result
-            if starters or bench:
-                result["teams"][team_name] = {
-                    "starters": starters,
-                    "bench": bench
-                }
+    with stage("parse"):
+        schedule = parse_schedule(response.text, league)
+    if schedule is None:
+        logging.getLogger("uvicorn.error").warning(f"Schedule table not found in {url}")
+        raise ValueError("Schedule table not found")
 
-        if not result["teams"]:
-            raise ValueError("No valid player data found")
+    # Clean and format the schedule data
+    with stage("map"):
+        cleaned_schedule = clean_schedule_data(schedule, season)
+    cached = _schedules[url] = (response.fetched_at, text_version(response.text), cleaned_schedule)
+    _schedules.move_to_end(url)
+    while len(_schedules) > MAX_SCHEDULES:
+        _schedules.popitem(last=False)
+    return cached
+
+async def scrape_game_box_score(game_id: str, league: str = "nba") -> BoxScore:
+    """Box score for a game, projected from its cached ESPN summary payload."""
+    logger = logging.getLogger("uvicorn.error")
 
-        return result
+    try:
+        game = await load_game(game_id, league)
+        with stage("map"):
+            return box_score(game)
 
     except Exception as e:
         logger.error(f"Error scraping box score: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
-def get_play_by_play(game_id: str):
-    url = f"https://site.api.espn.com/apis/site/v2/sports/basketball/mens-college-basketball/summary?event={game_id}"
-
-    response = requests.get(url, headers=headers)
-    data = response.json()
-
-    if 'plays' not in data:
-        return {"error": "No play-by-play data found for this game ID."}
-
-    competitors = data.get('header', {}).get('competitions', [{}])[0].get('competitors', [])
-    if len(competitors) < 2:
-        return {"error": "Could not determine teams."}
-
-    home_team = next((c for c in competitors if c.get("homeAway") == "home"), competitors[0])
-    away_team = next((c for c in competitors if c.get("homeAway") == "away"), competitors[1])
-
-    home_abbr = home_team.get('team', {}).get('abbreviation', 'HOME')
-    away_abbr = away_team.get('team', {}).get('abbreviation', 'AWAY')
-
-    plays = data['plays']
-    play_by_play = []
-
-    for play in plays:
-        play_by_play.insert(0, {
-            'period': play.get('period', {}).get('number', ''),
-            'clock': play.get('clock', {}).get('displayValue', ''),
-            'description': play.get('text', ''),
-            'team': play.get('team', {}).get('displayName', ''),
-            home_abbr: play.get('homeScore', ''),
-            away_abbr: play.get('awayScore', '')
-        })
-
-    return play_by_play
-
-def get_nba_play_by_play(game_id: str):
-    url = f"https://site.api.espn.com/apis/site/v2/sports/basketball/nba/summary?event={game_id}"
-
-    response = requests.get(url, headers=headers)
-    data = response.json()
+async def load_play_by_play(game_id: str, league: str = "ncaab"):
+    """Load a game's ESPN summary; returns (payload, teams) or an error dict."""
+    data = (await load_game(game_id, league)).data
 
     if 'plays' not in data:
         return {"error": "No play-by-play data found for this game ID."}
 
-    competitors = data.get('header', {}).get('competitions', [{}])[0].get('competitors', [])
-    if len(competitors) < 2:
+    teams = play_by_play_teams(data)
+    if not teams:
         return {"error": "Could not determine teams."}
-
-    home_team = next((c for c in competitors if c.get("homeAway") == "home"), competitors[0])
-    away_team = next((c for c in competitors if c.get("homeAway") == "away"), competitors[1])
-
-    home_abbr = home_team.get('team', {}).get('abbreviation', 'HOME')
-    away_abbr = away_team.get('team', {}).get('abbreviation', 'AWAY')
-
-    plays = data['plays']
-    play_by_play = []
-
-    for play in plays:
-        play_by_play.insert(0, {
-            'period': play.get('period', {}).get('number', ''),
-            'clock': play.get('clock', {}).get('displayValue', ''),
-            'description': play.get('text', ''),
-            'team': play.get('team', {}).get('displayName', ''),
-            home_abbr: play.get('homeScore', ''),
-            away_abbr: play.get('awayScore', '')
-        })
-
-    return play_by_play
+    return data, teams
+
+async def get_play_by_play(game_id: str, reverse: bool = True):
+    loaded = await load_play_by_play(game_id, "ncaab")
+    if isinstance(loaded, dict):
+        return loaded
+    with stage("map"):
+        return list(iter_plays(*loaded, reverse))
+
+async def get_nba_play_by_play(game_id: str, reverse: bool = True):
+    loaded = await load_play_by_play(game_id, "nba")
+    if isinstance(loaded, dict):
+        return loaded
+    with stage("map"):
+        return list(iter_plays(*loaded, reverse))
+
+async def stream_play_by_play(game_ids: list, league: str = "ncaab", reverse: bool = True, fmt: str = "ndjson"):
+    """Stream plays for several games as NDJSON lines or one chunked JSON array.
+
+    Each play carries its `game_id`. The next game is fetched while the current
+    one is streamed, so at most two games' payloads are held at a time. If the
+    client goes away mid-stream, the lookahead fetch is cancelled.
+    """
+    tasks = {}
+
+    def start(i):
+        if i < len(game_ids) and i not in tasks:
+            tasks[i] = asyncio.ensure_future(load_play_by_play(game_ids[i], league))
+
+    first = True
+    if fmt == "json":
+        yield b"["
+    start(0)
+    try:
+        for i, game_id in enumerate(game_ids):
+            start(i + 1)  # look one game ahead
+            try:
+                loaded = await tasks.pop(i)
+            except Exception as e:
+                loaded = {"error": str(e)}
+            items = [{"game_id": game_id, **loaded}] if isinstance(loaded, dict) else (
+                {"game_id": game_id, **play} for play in iter_plays(*loaded, reverse))
+            for item in items:
+                line = dumps(item)
+                if fmt == "json":
+                    yield line if first else b"," + line
+                    first = False
+                else:
+                    yield line + b"\n"
+    finally:
+        for task in tasks.values():
+            task.cancel()
+    if fmt == "json":
+        yield b"]"
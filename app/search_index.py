@@ -0,0 +1,88 @@
+import bisect
+import re
+import unicodedata
+
+
+def normalize(text: str) -> str:
+    """Lowercase ASCII words only: "San José State" -> "san jose state", "Texas A&M" -> "texas am"."""
+    text = unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode("ascii")
+    text = re.sub(r"['.&]", "", text.lower())
+    return re.sub(r"[^a-z0-9]+", " ", text).strip()
+
+
+def trigrams(text: str) -> set:
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class SearchIndex:
+    """Exact, prefix and trigram-fuzzy lookup of string aliases to ids.
+
+    Aliases are normalized on the way in and out. Prefix search bisects a sorted
+    alias list; fuzzy search scores candidates sharing trigrams with the query.
+    """
+
+    def __init__(self):
+        self._exact = {}
+        self._sorted = []
+        self._grams = {}
+        self._alias_grams = {}
+
+    def add(self, alias: str, item_id):
+        key = normalize(alias)
+        if not key:
+            return
+        ids = self._exact.setdefault(key, [])
+        if item_id in ids:
+            return
+        ids.append(item_id)
+        if len(ids) == 1:
+            bisect.insort(self._sorted, key)
+            grams = trigrams(key)
+            self._alias_grams[key] = len(grams)
+            for gram in grams:
+                self._grams.setdefault(gram, set()).add(key)
+
+    def exact(self, query: str) -> list:
+        return list(self._exact.get(normalize(query), ()))
+
+    def prefix(self, query: str, limit: int = 10) -> list:
+        key = normalize(query)
+        if not key:
+            return []
+        results = []
+        i = bisect.bisect_left(self._sorted, key)
+        while i < len(self._sorted) and self._sorted[i].startswith(key) and len(results) < limit:
+            results.append(self._sorted[i])
+            i += 1
+        return results
+
+    def fuzzy(self, query: str, limit: int = 10, min_score: float = 0.3) -> list:
+        """[(alias, score)] best first, scored by trigram Jaccard similarity."""
+        key = normalize(query)
+        if not key:
+            return []
+        grams = trigrams(key)
+        shared = {}
+        for gram in grams:
+            for alias in self._grams.get(gram, ()):
+                shared[alias] = shared.get(alias, 0) + 1
+        scored = []
+        for alias, count in shared.items():
+            score = count / (len(grams) + self._alias_grams[alias] - count)
+            if score >= min_score:
+                scored.append((alias, score))
+        scored.sort(key=lambda pair: (-pair[1], pair[0]))
+        return scored[:limit]
+
+    def search(self, query: str, limit: int = 10) -> list:
+        """Ids matching `query`: exact matches first, then prefix, then fuzzy; no duplicates."""
+        seen = []
+        aliases = [normalize(query)] + self.prefix(query, limit) + [a for a, _ in self.fuzzy(query, limit)]
+        for alias in aliases:
+            for item_id in self._exact.get(alias, ()):
+                if item_id not in seen:
+                    seen.append(item_id)
+                    if len(seen) == limit:
+                        return seen
+        return seen
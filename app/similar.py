@@ -0,0 +1,193 @@
+import asyncio
+import os
+
+from app import warehouse
+from app.conditional import note_source
+from app.player_page import load_player_page
+from app.scraper import format_player_name
+from app.singleflight import SingleFlight
+
+# "Who does this player play like?": every player season in the warehouse as a
+# vector of per-40-minute production and shooting splits, z-scored across all of
+# them, with nearest neighbours found by a KD-tree (scipy's cKDTree when it is
+# installed, a vectorized numpy scan otherwise).
+#
+# The index syncs from the warehouse before each query, reading only players
+# stored since the last sync, so pages scraped by any worker join it on the next
+# request; the matrix and tree are rebuilt only when something changed.
+#
+# (data-stat, response field, per 40 minutes?)
+FEATURES = (
+    ("pts", "points_per_40", True),
+    ("fga", "field_goal_attempts_per_40", True),
+    ("fg3a", "three_pt_attempts_per_40", True),
+    ("fta", "free_throw_attempts_per_40", True),
+    ("orb", "offensive_rebounds_per_40", True),
+    ("drb", "defensive_rebounds_per_40", True),
+    ("ast", "assists_per_40", True),
+    ("tov", "turnovers_per_40", True),
+    ("stl", "steals_per_40", True),
+    ("blk", "blocks_per_40", True),
+    ("fg2_pct", "two_pt_percentage", False),
+    ("fg3_pct", "three_pt_percentage", False),
+    ("ft_pct", "free_throw_percentage", False),
+)
+
+# Seasons with fewer minutes are too noisy to compare
+MIN_MINUTES = int(os.environ.get("SCOUTING_SIMILAR_MIN_MINUTES", "200"))
+MAX_SIMILAR = 50
+
+# Versions of players stored up to this many seconds before the last sync are
+# checked again, for pages another worker parsed before that sync but wrote after it
+SYNC_OVERLAP = 60
+
+
+def _number(value):
+    try:
+        return float(str(value).replace(",", ""))
+    except ValueError:
+        return None
+
+
+def feature_vector(row: dict):
+    """Raw feature values for a totals row (None where a stat is missing), or None under MIN_MINUTES."""
+    minutes = _number(row.get("mp")) if row.get("mp") else None
+    if not minutes or minutes < MIN_MINUTES:
+        return None
+    vector = []
+    for stat, _, per_40 in FEATURES:
+        value = _number(row[stat]) if row.get(stat) else None
+        if value is not None and per_40:
+            value = value * 40 / minutes
+        vector.append(value)
+    return vector
+
+
+class SimilarityIndex:
+    def __init__(self):
+        self.players = {}  # slug -> (updated_at, name, [(season, team, raw vector)])
+        self.synced = 0.0
+        self._dirty = False
+        # (keys [(slug, season)], raw matrix, mean, std, z-scored matrix, cKDTree or None)
+        self._built = None
+
+    def sync(self):
+        """Fold in players stored since the last sync; rebuild if any changed. Blocking."""
+        versions = warehouse.player_versions_since(max(0.0, self.synced - SYNC_OVERLAP))
+        self.synced = max(versions.values(), default=self.synced)
+        changed = [slug for slug, updated_at in versions.items()
+                   if slug not in self.players or self.players[slug][0] != updated_at]
+        for slug, player in warehouse.player_seasons("totals", changed).items():
+            seasons = []
+            for season, row in player["seasons"]:
+                vector = feature_vector(row)
+                if vector is not None:
+                    seasons.append((season, row.get("team_name_abbr"), vector))
+            self.players[slug] = (player["updated_at"], player["name"], seasons)
+            self._dirty = True
+        if self._dirty or self._built is None:
+            self._build()
+
+    def _build(self):
+        import numpy as np
+
+        keys = []
+        vectors = []
+        for slug, (_, _, seasons) in self.players.items():
+            for season, _, vector in seasons:
+                keys.append((slug, season))
+                vectors.append(vector)
+        raw = np.array(vectors, dtype=float).reshape(len(vectors), len(FEATURES))
+        if len(raw):
+            with np.errstate(invalid="ignore"):
+                mean, std = np.nanmean(raw, axis=0), np.nanstd(raw, axis=0)
+            mean, std = np.nan_to_num(mean), np.where(np.isnan(std) | (std == 0), 1.0, std)
+        else:
+            mean, std = np.zeros(len(FEATURES)), np.ones(len(FEATURES))
+        scaled = np.nan_to_num((raw - mean) / std)  # a missing stat counts as average
+        try:
+            from scipy.spatial import cKDTree
+            tree = cKDTree(scaled) if len(scaled) else None
+        except ImportError:
+            tree = None
+        self._built = (keys, raw, mean, std, scaled, tree)
+        self._dirty = False
+
+    def __len__(self):
+        return len(self._built[0]) if self._built else 0
+
+    def query(self, vector: list, k: int, exclude: str = None) -> list:
+        """[(slug, season, distance)] for the k players nearest `vector`, one season per player, nearest first."""
+        import numpy as np
+
+        keys, _, mean, std, scaled, tree = self._built
+        if not keys:
+            return []
+        point = np.nan_to_num((np.array(vector, dtype=float) - mean) / std)
+        # Ask for extra neighbours: other seasons of the same players are dropped below
+        wanted = min(len(keys), (k + 1) * 4)
+        while True:
+            if tree is not None:
+                distances, rows = tree.query(point, k=wanted)
+                distances, rows = np.atleast_1d(distances), np.atleast_1d(rows)
+            else:
+                all_distances = np.sqrt(((scaled - point) ** 2).sum(axis=1))
+                rows = np.argpartition(all_distances, wanted - 1)[:wanted]
+                rows = rows[np.argsort(all_distances[rows], kind="stable")]
+                distances = all_distances[rows]
+            found = {}
+            for distance, row in zip(distances.tolist(), rows.tolist()):
+                slug, season = keys[row]
+                if slug != exclude and slug not in found:
+                    found[slug] = (slug, season, distance)
+            if len(found) >= k or wanted == len(keys):
+                return list(found.values())[:k]
+            wanted = min(len(keys), wanted * 4)
+
+    def features(self, slug: str, season: str) -> dict:
+        for known_season, _, vector in self.players.get(slug, (None, None, ()))[2]:
+            if known_season == season:
+                return feature_fields(vector)
+        return {}
+
+
+def feature_fields(vector: list) -> dict:
+    return {field: None if value is None else round(value, 1 if per_40 else 3)
+            for (_, field, per_40), value in zip(FEATURES, vector)}
+
+
+index = SimilarityIndex()
+_syncs = SingleFlight("similar_index")
+
+
+async def similar_players(name: str, season: str = None, k: int = 10) -> dict:
+    """The k players whose seasons look most like `name`'s `season` (default: their latest full one)."""
+    page = await load_player_page(format_player_name(name))
+    totals = page.tables.get("totals")
+    if not totals:
+        raise ValueError("Totals table not found.")
+    seasons = [season] if season else list(reversed(totals.seasons()))
+    target = None
+    for candidate in seasons:
+        row = totals.row(candidate)
+        vector = feature_vector(row) if row else None
+        if vector is not None:
+            season, target = candidate, (row, vector)
+            break
+    if target is None:
+        raise ValueError(f"No season with at least {MIN_MINUTES} minutes" + (f" in {season}" if season else ""))
+
+    # The warehouse has this page now, so the sync picks it up too if it's new
+    await _syncs.do("sync", lambda: asyncio.to_thread(index.sync))
+    # Neighbours change whenever the index does, not just when this player's page does. The
+    # newest warehouse write it has seen is the same in every worker once they have synced
+    note_source("similar_index", index.synced, index.synced)
+    row, vector = target
+    similar = []
+    for slug, match_season, distance in index.query(vector, min(k, MAX_SIMILAR), exclude=page.slug):
+        _, match_name, match_seasons = index.players[slug]
+        team = next((team for s, team, _ in match_seasons if s == match_season), None)
+        similar.append({"slug": slug, "name": match_name, "season": match_season, "team": team,
+                        "distance": round(distance, 3), "features": index.features(slug, match_season)})
+    return {"player": page.name, "slug": page.slug, "season": season, "team": row.get("team_name_abbr"),
+            "features": feature_fields(vector), "compared": len(index), "similar": similar}
@@ -0,0 +1,44 @@
+import asyncio
+
+_groups = {}
+
+
+class SingleFlight:
+    """Coalesce concurrent calls for the same key into one in-flight task.
+
+    The first caller for a key starts the work; everyone who asks for that key
+    before it finishes awaits the same task and gets the same result or error.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._inflight = {}
+        self.stats = {"calls": 0, "executions": 0, "coalesced": 0, "in_flight": 0}
+        _groups[name] = self
+
+    async def do(self, key, fn):
+        """Run `fn()` (a coroutine function) for `key`, or join the run already in flight."""
+        self.stats["calls"] += 1
+        task = self._inflight.get(key)
+        if task is None:
+            self.stats["executions"] += 1
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            self.stats["in_flight"] = len(self._inflight)
+            task.add_done_callback(lambda _: self._done(key, task))
+        else:
+            self.stats["coalesced"] += 1
+        # Shield so one caller disconnecting doesn't cancel the work for the others
+        return await asyncio.shield(task)
+
+    def _done(self, key, task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        self.stats["in_flight"] = len(self._inflight)
+        if not task.cancelled():
+            task.exception()  # mark retrieved even if every waiter went away
+
+
+def singleflight_stats() -> dict:
+    """Per-group counters; `coalesced` is the number of fetches saved."""
+    return {name: dict(group.stats) for name, group in _groups.items()}
@@ -0,0 +1,130 @@
+import logging
+
+from app.conditional import note_source
+from app.espn import competition, iter_games, resolve_espn_team
+from app.schema import PlayerSplits, ShootingSplit, TeamSplits
+from app.scraper import scrape_team_schedule
+from app.singleflight import SingleFlight
+
+# Per-player conference / non-conference shooting, kept as running totals per
+# team season. Each box score is folded in once: a new game costs O(players) and
+# the season is never re-summed. Totals are [games, FGM, FGA, 3PM, 3PA, FTM, FTA].
+SHOT_LABELS = ("FG", "3PT", "FT")
+
+
+def made_attempted(value: str) -> tuple:
+    """'5-12' -> (5, 12); anything unparseable counts as (0, 0)."""
+    made, _, attempted = str(value).partition("-")
+    try:
+        return int(made), int(attempted)
+    except ValueError:
+        return 0, 0
+
+
+def percentage(made: int, attempted: int):
+    return round(made / attempted, 3) if attempted else None
+
+
+class SeasonSplits:
+    __slots__ = ("team_id", "espn_id", "season", "games", "skipped", "players")
+
+    def __init__(self, team_id: str, espn_id: int, season: str):
+        self.team_id = team_id
+        self.espn_id = str(espn_id)
+        self.season = str(season)
+        self.games = {}    # game id -> True for a conference game
+        self.skipped = set()  # finished games whose box score has no block for this team
+        self.players = {}  # athlete id -> [name, conference totals, non-conference totals]
+
+    def ingest(self, game_id: str, data: dict, conference: bool = None) -> bool:
+        """Fold one finished game's box score into the totals; False if it was skipped."""
+        if game_id in self.games or game_id in self.skipped:
+            return False
+        comp = competition(data)
+        if not comp.get("status", {}).get("type", {}).get("completed", False):
+            return False
+        if comp.get("conferenceCompetition") is not None:
+            conference = comp["conferenceCompetition"]
+        block = next((b for b in data.get("boxscore", {}).get("players", [])
+                      if str(b.get("team", {}).get("id")) == self.espn_id), None)
+        if block is None:
+            self.skipped.add(game_id)  # it won't appear later, so don't fetch the game again
+            return False
+
+        slot = 1 if conference else 2
+        for stat_group in block.get("statistics", []):
+            labels = stat_group.get("labels") or stat_group.get("names", [])
+            columns = [labels.index(label) if label in labels else None for label in SHOT_LABELS]
+            for athlete in stat_group.get("athletes", []):
+                stats = athlete.get("stats") or []
+                if athlete.get("didNotPlay") or len(stats) < len(labels):
+                    continue
+                info = athlete.get("athlete", {})
+                key = info.get("id") or info.get("displayName", "")
+                entry = self.players.get(key)
+                if entry is None:
+                    entry = self.players[key] = [info.get("displayName", ""), [0] * 7, [0] * 7]
+                totals = entry[slot]
+                totals[0] += 1
+                for i, column in enumerate(columns):
+                    if column is not None:
+                        made, attempted = made_attempted(stats[column])
+                        totals[1 + 2 * i] += made
+                        totals[2 + 2 * i] += attempted
+        self.games[game_id] = bool(conference)
+        return True
+
+    @staticmethod
+    def _split(totals: list) -> ShootingSplit:
+        games, fgm, fga, tpm, tpa, ftm, fta = totals
+        return ShootingSplit(
+            games=games,
+            field_goals_made=fgm, field_goal_attempts=fga, fg_percentage=percentage(fgm, fga),
+            three_pt_made=tpm, three_pt_attempts=tpa, three_pt_percentage=percentage(tpm, tpa),
+            free_throws_made=ftm, free_throw_attempts=fta, free_throw_percentage=percentage(ftm, fta),
+            total_made=fgm + ftm, total_attempts=fga + fta, total_percentage=percentage(fgm + ftm, fga + fta),
+        )
+
+    def to_model(self) -> TeamSplits:
+        conference_games = sum(self.games.values())
+        players = [PlayerSplits(name=name, conference=self._split(conf), non_conference=self._split(non_conf))
+                   for name, conf, non_conf in self.players.values()]
+        players.sort(key=lambda p: -(p.conference.total_attempts + p.non_conference.total_attempts))
+        return TeamSplits(team=self.team_id, season=self.season, conference_games=conference_games,
+                          non_conference_games=len(self.games) - conference_games, players=players)
+
+
+_splits = {}
+_updates = SingleFlight("team_splits")
+
+
+async def load_team_splits(team: str, season: str) -> SeasonSplits:
+    """Running splits for a team season, after folding in any games finished since the last call."""
+    resolved = await resolve_espn_team(team)
+    if not resolved:
+        raise ValueError(f"Unknown team: {team}")
+    key = (resolved.id, str(season))
+    splits = _splits.get(key)
+    if splits is None:
+        splits = _splits[key] = SeasonSplits(resolved.id, resolved.espn_id, season)
+    splits = await _updates.do(key, lambda: _update(splits))
+    note_source(f"splits:{resolved.id}:{season}", len(splits.games))
+    return splits
+
+
+async def _update(splits: SeasonSplits) -> SeasonSplits:
+    schedule = await scrape_team_schedule(splits.team_id, "ncaab", splits.season)
+    if "error" in schedule:
+        raise ValueError(schedule["error"])
+
+    # Only finished games not yet folded in; the schedule's "*" marker is the
+    # fallback when a summary doesn't say whether it was a conference game
+    pending = {game["game_id"]: game.get("conference_game") for game in schedule["schedule"]
+               if game.get("game_id") and game.get("result")
+               and game["game_id"] not in splits.games and game["game_id"] not in splits.skipped}
+    async for game_id, game in iter_games(list(pending), "ncaab"):
+        if isinstance(game, Exception):
+            logging.getLogger("uvicorn.error").warning(f"Skipping game {game_id} for splits: {game}")
+            continue
+        splits.ingest(game_id, game.data, pending[game_id])
+    return splits
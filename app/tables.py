@@ -0,0 +1,169 @@
+import re
+from html import unescape
+
+from app.extract import find_table_html
+from app.schema import to_number
+
+# Declarative table extraction for sports-reference stats tables.
+#
+# A TableSpec names a table id, which rows to keep and how data-stat columns map
+# to response fields. `extract` pulls the table out of the raw page (comment-
+# wrapped or not) and tokenizes it in one regex pass into column arrays, without
+# building a soup or a Python object per cell. `project` applies the column map
+# to one row; `to_columns` to a whole table.
+
+# One pass over the table markup: each match is either a row start or a whole cell
+_TOKENS = re.compile(
+    r"<tr\b(?P<row>[^>]*)>"
+    r"|<(?P<tag>td|th)\b(?P<attrs>[^>]*)>(?P<text>.*?)</(?P=tag)\s*>",
+    re.S | re.I,
+)
+_ID = re.compile(r'\bid="([^"]*)"')
+_DATA_STAT = re.compile(r'\bdata-stat="([^"]*)"')
+_LINK = re.compile(r'<a\b[^>]*\bhref="([^"]*)"[^>]*>(.*?)</a\s*>', re.S | re.I)
+_TAGS = re.compile(r"<[^>]*>")
+
+
+def cell_text(markup: str) -> str:
+    """A cell's text as bs4's `.text.strip()` gives it: tags dropped, entities decoded."""
+    if "<" in markup:
+        markup = _TAGS.sub("", markup)
+    if "&" in markup:
+        markup = unescape(markup)
+    return markup.strip()
+
+
+def append_cells(stats: list, columns: dict, i: int, cells):
+    """Add row `i`'s (data-stat, value) cells to column-wise `columns`; columns it has no cell for get None."""
+    for stat, value in cells:
+        column = columns.get(stat)
+        if column is None:
+            stats.append(stat)
+            column = columns[stat] = [None] * i
+        column.append(value)
+    for column in columns.values():
+        if len(column) <= i:
+            column.append(None)
+
+
+class Table:
+    """An extracted table, column-wise: `columns[stat][i]` is row i's cell for that data-stat, None if empty.
+
+    `links[stat][i]` is (href, link text) of the first link in that cell, for the
+    spec's link columns.
+    """
+    __slots__ = ("row_ids", "stats", "columns", "links")
+
+    def __init__(self, row_ids: list, stats: list, columns: dict, links: dict):
+        self.row_ids = row_ids
+        self.stats = stats
+        self.columns = columns
+        self.links = links
+
+    def __len__(self):
+        return len(self.row_ids)
+
+    def row(self, i: int) -> dict:
+        return {stat: self.columns[stat][i] for stat in self.stats}
+
+
+class TableSpec:
+    """One table's id, row selector and column map.
+
+    Rows are kept if their id starts with `row_id_prefix` and they have a data
+    cell (<td>, not a header <th>) for `required`; either may be None. `columns`
+    maps data-stat names to response fields; `keep_unmapped` passes other stats
+    through under their own name, `skip_empty` drops blank cells.
+    """
+    __slots__ = ("table_id", "row_id_prefix", "required", "links", "columns", "keep_unmapped", "skip_empty")
+
+    def __init__(self, table_id: str, row_id_prefix: str = None, required: str = None, links: tuple = (),
+                 columns: dict = None, keep_unmapped: bool = False, skip_empty: bool = False):
+        self.table_id = table_id
+        self.row_id_prefix = row_id_prefix
+        self.required = required
+        self.links = tuple(links)
+        self.columns = dict(columns or {})
+        self.keep_unmapped = keep_unmapped
+        self.skip_empty = skip_empty
+
+    def mapped(self, columns: dict, keep_unmapped: bool = False, skip_empty: bool = False) -> "TableSpec":
+        """The same table and rows under another column map."""
+        return TableSpec(self.table_id, self.row_id_prefix, self.required, self.links, columns,
+                         keep_unmapped, skip_empty)
+
+    def extract(self, html: str):
+        """The table from a raw page as a Table, or None if the page doesn't have it."""
+        markup = find_table_html(html, self.table_id)
+        if markup is None:
+            return None
+        return self._tokenize(markup)
+
+    def _tokenize(self, markup: str) -> Table:
+        prefix = self.row_id_prefix
+        link_stats = self.links
+        required = self.required
+        rows = []  # (row id, [(stat, value)], {stat: link})
+        row = cells = links = None
+        for token in _TOKENS.finditer(markup):
+            attrs = token.group("row")
+            if attrs is not None:
+                row_id = _ID.search(attrs)
+                row_id = row_id.group(1) if row_id else ""
+                if prefix is not None and not row_id.startswith(prefix):
+                    cells = None
+                    continue
+                cells, links = [], {}
+                row = (row_id[len(prefix):] if prefix else row_id, cells, links)
+                if required is None:
+                    rows.append(row)
+                continue
+            if cells is None:
+                continue
+            stat = _DATA_STAT.search(token.group("attrs"))
+            stat = stat.group(1) if stat else None
+            if stat == required and token.group("tag").lower() == "td" and (not rows or rows[-1] is not row):
+                rows.append(row)
+            raw = token.group("text")
+            if stat in link_stats:
+                link = _LINK.search(raw)
+                links[stat] = (unescape(link.group(1)), cell_text(link.group(2))) if link else None
+            value = cell_text(raw)
+            cells.append((stat, value if value else None))
+        return self._columns(rows)
+
+    def _columns(self, rows: list) -> Table:
+        row_ids = []
+        stats = []
+        columns = {}
+        links = {stat: [] for stat in self.links}
+        for i, (row_id, cells, row_links) in enumerate(rows):
+            row_ids.append(row_id)
+            append_cells(stats, columns, i, cells)
+            for stat, column in links.items():
+                column.append(row_links.get(stat))
+        return Table(row_ids, stats, columns, links)
+
+    def project(self, row: dict) -> dict:
+        """One raw {data-stat: value} row under the column map."""
+        columns = self.columns
+        if self.keep_unmapped:
+            return {columns.get(stat, stat): value for stat, value in row.items()
+                    if value or not self.skip_empty}
+        return {columns[stat]: value for stat, value in row.items()
+                if stat in columns and (value or not self.skip_empty)}
+
+    def to_columns(self, table: Table, typed: bool = False) -> dict:
+        """{field: [value per row]} for the whole table; `typed` converts numeric columns to int/float."""
+        result = {}
+        for stat in table.stats:
+            field = self.columns.get(stat, stat if self.keep_unmapped else None)
+            if field is None:
+                continue
+            values = table.columns[stat]
+            if typed:
+                numbers = [to_number(value) for value in values]
+                if any(number is not None for number in numbers):
+                    values = numbers
+            result[field] = values
+        return result
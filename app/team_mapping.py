@@ -1,51 +1,47 @@
-import requests
-import pandas as pd
-from bs4 import BeautifulSoup
+from collections.abc import Mapping
 
-# read table from html
-url = "https://en.wikipedia.org/wiki/List_of_NCAA_Division_I_men%27s_basketball_programs"
-teams_df = pd.read_html(url, attrs={"class":"wikitable"})[0]
+from app.teams import get_resolver
 
-# print out first 5 teams
-#print(teams_df.head())
+# Team lookups now come from the bundled resolver data (app/data/teams.json) instead
+# of scraping Wikipedia at import time. Rebuild that file with
+# scripts/build_team_index.py.
+#
+# team_mapping maps the canonical team id (sports-reference slug) to the school's
+# Wikipedia name, and team_mapping_inv goes the other way:
+#   team_mapping['san-diego-state']                    -> 'San Diego State University'
+#   team_mapping_inv['San Diego State University']     -> 'san-diego-state'
+# Both are live views of the resolver, so they include the teams it learns at
+# runtime from school-stats pages and ESPN's team list as well as the bundled ones.
+# For fuzzy lookups ("SDSU", "Aztecs") use app.teams.resolve_team.
 
-# clean up team names
-teams_df['School'] = (teams_df['School']
-    .str.replace(r'\s*\([^)]*\)', '', regex=True) # remove the parenthetical stuff
-    .str.replace(r'\[.*?\]', '', regex=True) # remove the bracketed stuff (superscripts/subscripts)
-    .str.strip()) # remove any trailing whitespace
 
-#print(teams_df.tail(10))
-print(teams_df.shape) # total 364 DIV 1 Teams
-
-# now map each team name to it's corresponding team ID
-team_mapping = {i+1: row['School'] for i, row in teams_df.iterrows()}
-
-# print out first 5 teams
-for k, v in list(team_mapping.items())[:5]:
-    print(k, ":", v)
-
-
-''' Prints: 
-1 : University at Albany, SUNY
-2 : Binghamton University
-3 : Bryant University
-4 : University of Maine
-5 : University of Maryland, Baltimore County
-'''
-
-print("\nteam_id 250 maps to", team_mapping[250]) # returns Wagner College
-
-# invert the map so can look up team id, given name
-team_mapping_inv = {v: k for k,v in team_mapping.items()}
-
-# now given a team name, can search for its corresponding id
-print("SDSU team_id is", team_mapping_inv['San Diego State University']) # returns 237
+class TeamNames(Mapping):
+    """Team id -> name over every team the resolver knows (name -> id when `inverse`)."""
 
+    def __init__(self, inverse: bool = False):
+        self.inverse = inverse
+        self._names = {}
+        self._size = -1
 
+    def _current(self) -> dict:
+        teams = get_resolver().teams
+        if len(teams) != self._size:  # the resolver only ever adds teams
+            pairs = ((team.id, team.wikipedia_name or team.name) for team in teams)
+            self._names = {name: team_id for team_id, name in pairs} if self.inverse else dict(pairs)
+            self._size = len(teams)
+        return self._names
 
+    def __getitem__(self, key):
+        return self._current()[key]
 
+    def __iter__(self):
+        return iter(self._current())
 
+    def __len__(self):
+        return len(self._current())
 
 
+team_mapping = TeamNames()
 
+# invert the map so can look up team id, given name
+team_mapping_inv = TeamNames(inverse=True)
@@ -0,0 +1,142 @@
+import json
+import os
+import re
+
+from app.search_index import SearchIndex, normalize
+
+# Bundled reference data: one entry per Division I program with its Wikipedia name,
+# sports-reference slug, ESPN id/abbreviation and nicknames. Regenerate it with
+# scripts/build_team_index.py. Teams it is missing are added at runtime from
+# sports-reference school-stats pages, and from ESPN's team list when
+# SCOUTING_ESPN_TEAM_LIST is set (app.espn.resolve_espn_team).
+TEAMS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "teams.json")
+
+
+class Team:
+    __slots__ = ("id", "name", "wikipedia_name", "sref_slug", "espn_id", "espn_abbr", "nickname", "conference", "aliases")
+
+    def __init__(self, id: str, name: str, wikipedia_name: str = None, sref_slug: str = None, espn_id: int = None,
+                 espn_abbr: str = None, nickname: str = None, conference: str = None, aliases: list = None):
+        self.id = id
+        self.name = name
+        self.wikipedia_name = wikipedia_name
+        self.sref_slug = sref_slug
+        self.espn_id = espn_id
+        self.espn_abbr = espn_abbr
+        self.nickname = nickname
+        self.conference = conference
+        self.aliases = aliases or []
+
+    def to_dict(self) -> dict:
+        return {field: getattr(self, field) for field in self.__slots__}
+
+
+class TeamResolver:
+    """Maps any name we see for a team to one canonical team id (its sports-reference slug)."""
+
+    def __init__(self, teams: list):
+        self.teams = []
+        self.by_id = {}
+        self.by_espn_id = {}
+        self._index = SearchIndex()
+        for team in teams:
+            self.add(team)
+
+    def add(self, team: Team):
+        if team.id in self.by_id:
+            return
+        self.teams.append(team)
+        self.by_id[team.id] = team
+        self._index_team(team)
+
+    def _index_team(self, team: Team):
+        if team.espn_id is not None:
+            self.by_espn_id[str(team.espn_id)] = team
+        names = [team.id, team.id.replace("-", " "), team.name, team.wikipedia_name, team.sref_slug,
+                 team.espn_abbr, team.nickname, *team.aliases]
+        if team.nickname:
+            names.append(f"{team.name} {team.nickname}")
+            if team.espn_abbr:
+                names.append(f"{team.espn_abbr} {team.nickname}")
+        if team.wikipedia_name:
+            names.append(re.sub(r"^(The )?University of |( University| College)$", "", team.wikipedia_name))
+        for name in names:
+            if name:
+                self._index.add(name, team.id)
+
+    def add_school(self, sref_slug: str, name: str):
+        """Register a team seen on a sports-reference page that the bundled data doesn't know."""
+        if not sref_slug or sref_slug in self.by_id:
+            return
+        ids = self._index.exact(name)
+        if len(ids) == 1 and self.by_id[ids[0]].sref_slug is None:
+            # Registered from ESPN's team list under another slug; same school
+            team = self.by_id[ids[0]]
+            team.sref_slug = sref_slug
+            self._index.add(sref_slug, team.id)
+            return
+        self.add(Team(sref_slug, name, sref_slug=sref_slug))
+
+    def add_espn_team(self, espn_team: dict):
+        """Fill in ESPN's id for a team from an entry of ESPN's team list, registering the team if it's new.
+
+        Matched by exact name only: a fuzzy match could hand one school another's id.
+        """
+        espn_id = str(espn_team["id"])
+        if espn_id in self.by_espn_id:
+            return
+        location = espn_team.get("location") or espn_team.get("displayName")
+        ids = {team_id for name in (location, espn_team.get("displayName")) if name
+               for team_id in self._index.exact(name)}
+        team = self.by_id[ids.pop()] if len(ids) == 1 else None
+        if team is None:
+            team = Team(normalize(location).replace(" ", "-"), location)
+            if team.id in self.by_id or not team.id:
+                return  # the name is taken by a team we can't tell apart from this one
+            self.teams.append(team)
+            self.by_id[team.id] = team
+        elif team.espn_id is not None:
+            return
+        team.espn_id = int(espn_id)
+        team.espn_abbr = team.espn_abbr or espn_team.get("abbreviation")
+        team.nickname = team.nickname or espn_team.get("name")
+        self._index_team(team)
+
+    def resolve(self, query: str):
+        """The Team for an exact name, slug, abbreviation or nickname; None if unknown or ambiguous."""
+        ids = self._index.exact(query)
+        if len(ids) == 1:
+            return self.by_id[ids[0]]
+        if not ids:
+            # Typos and variants ("San Deigo State") fall through to a close fuzzy match
+            matches = self._index.fuzzy(query, limit=2, min_score=0.6)
+            if matches and (len(matches) == 1 or matches[0][1] > matches[1][1]):
+                ids = self._index.exact(matches[0][0])
+                if len(ids) == 1:
+                    return self.by_id[ids[0]]
+        return None
+
+    def search(self, query: str, limit: int = 10) -> list:
+        return [self.by_id[team_id] for team_id in self._index.search(query, limit)]
+
+
+_resolver = None
+
+
+def get_resolver() -> TeamResolver:
+    global _resolver
+    if _resolver is None:
+        with open(TEAMS_FILE, encoding="utf-8") as f:
+            data = json.load(f)
+        _resolver = TeamResolver([Team(**team) for team in data["teams"]])
+    return _resolver
+
+
+def resolve_team(query: str):
+    return get_resolver().resolve(query)
+
+
+def team_key(query: str) -> str:
+    """Canonical id for a team, or the normalized query when the team is unknown."""
+    team = resolve_team(query)
+    return team.id if team else normalize(query.replace("-", " ")).replace(" ", "-")
@@ -0,0 +1,326 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+from app.config import CACHE_DIR
+from app.metrics import stage
+
+# Local SQLite warehouse of everything we've parsed: player seasons, team seasons,
+# games, box score lines and plays. Loaders read from it before going upstream and
+# write every fresh parse back, so repeat requests skip the fetch *and* the parse
+# and keep working while upstream is down. WAL mode lets every worker read while
+# one of them writes. Calls are blocking; run them with asyncio.to_thread.
+WAREHOUSE_FILE = os.path.join(CACHE_DIR, "warehouse.sqlite3")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS players (
+    slug TEXT PRIMARY KEY,
+    name TEXT,
+    last_season TEXT,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS player_seasons (
+    slug TEXT NOT NULL,
+    table_type TEXT NOT NULL,
+    row_id TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    season TEXT,
+    team TEXT,
+    stats TEXT NOT NULL,
+    PRIMARY KEY (slug, table_type, row_id)
+);
+CREATE INDEX IF NOT EXISTS player_seasons_team ON player_seasons (season, team);
+CREATE INDEX IF NOT EXISTS players_last_season ON players (last_season, updated_at);
+CREATE INDEX IF NOT EXISTS players_updated ON players (updated_at);
+
+CREATE TABLE IF NOT EXISTS team_seasons (
+    season TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    slug TEXT,
+    name TEXT NOT NULL,
+    stats TEXT NOT NULL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (season, position)
+);
+CREATE INDEX IF NOT EXISTS team_seasons_slug ON team_seasons (slug, season);
+
+CREATE TABLE IF NOT EXISTS games (
+    league TEXT NOT NULL,
+    game_id TEXT NOT NULL,
+    date TEXT,
+    home_team_id TEXT,
+    away_team_id TEXT,
+    home_score INTEGER,
+    away_score INTEGER,
+    conference_game INTEGER,
+    completed INTEGER NOT NULL,
+    payload TEXT NOT NULL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (league, game_id)
+);
+CREATE INDEX IF NOT EXISTS games_home ON games (home_team_id, date);
+CREATE INDEX IF NOT EXISTS games_away ON games (away_team_id, date);
+CREATE INDEX IF NOT EXISTS games_completed ON games (completed, date);
+
+CREATE TABLE IF NOT EXISTS box_score_lines (
+    league TEXT NOT NULL,
+    game_id TEXT NOT NULL,
+    team TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    starter INTEGER,
+    stats TEXT NOT NULL,
+    PRIMARY KEY (league, game_id, team, position)
+);
+CREATE INDEX IF NOT EXISTS box_score_lines_name ON box_score_lines (name);
+
+CREATE TABLE IF NOT EXISTS plays (
+    league TEXT NOT NULL,
+    game_id TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    period INTEGER,
+    clock TEXT,
+    team TEXT,
+    description TEXT,
+    home_score INTEGER,
+    away_score INTEGER,
+    PRIMARY KEY (league, game_id, seq)
+) WITHOUT ROWID;
+"""
+
+# Values bound per IN (...) query, well under SQLite's bound parameter limit (999 on older builds)
+MAX_BOUND_VALUES = 500
+
+stats = {
+    "hits": 0,
+    "misses": 0,
+    "fallbacks": 0,
+    "writes": 0,
+    "errors": 0,
+}
+
+_local = threading.local()
+
+
+def connect() -> sqlite3.Connection:
+    """This thread's connection, creating the database and schema on first use."""
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        os.makedirs(os.path.dirname(WAREHOUSE_FILE), exist_ok=True)
+        conn = sqlite3.connect(WAREHOUSE_FILE, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(SCHEMA)
+        _local.conn = conn
+    return conn
+
+
+def _write(fn, *args):
+    """Run a write in one transaction; the warehouse is an optimization, so failures only log."""
+    try:
+        conn = connect()
+        with stage("warehouse"), conn:
+            fn(conn, *args)
+        stats["writes"] += 1
+    except sqlite3.Error as e:
+        stats["errors"] += 1
+        logging.getLogger("uvicorn.error").warning(f"Warehouse write failed: {e}")
+
+
+def _in_chunks(conn, sql: str, params: tuple, values: list):
+    """Rows of `sql` run once per chunk of `values`, so the bound parameters stay under SQLite's limit.
+
+    `sql` has one `{}` where the chunk's placeholders go; `params` are bound before them.
+    """
+    for start in range(0, len(values), MAX_BOUND_VALUES):
+        chunk = values[start:start + MAX_BOUND_VALUES]
+        yield from conn.execute(sql.format(",".join("?" * len(chunk))), (*params, *chunk))
+
+
+def _read(fn, *args):
+    try:
+        with stage("warehouse"):
+            return fn(connect(), *args)
+    except sqlite3.Error as e:
+        stats["errors"] += 1
+        logging.getLogger("uvicorn.error").warning(f"Warehouse read failed: {e}")
+        return None
+
+
+def _score(value):
+    return int(value) if value is not None and str(value).isdigit() else None
+
+
+# Player seasons
+
+def _store_player_page(conn, page):
+    seasons = []
+    rows = []
+    for table_type, table in page.tables.items():
+        seasons.extend(table.seasons())
+        for position, row_id in enumerate(table.row_ids):
+            row = table.row(row_id)
+            season = row_id if row_id.isdigit() else None
+            rows.append((page.slug, table_type, row_id, position, season, row.get("team_name_abbr"), json.dumps(row)))
+    conn.execute("DELETE FROM player_seasons WHERE slug = ?", (page.slug,))
+    conn.executemany("INSERT INTO player_seasons VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+    conn.execute("INSERT OR REPLACE INTO players VALUES (?, ?, ?, ?)",
+                 (page.slug, page.name, max(seasons) if seasons else None, page.loaded_at))
+
+
+def store_player_page(page):
+    _write(_store_player_page, page)
+
+
+def _player_page_rows(conn, slug):
+    player = conn.execute("SELECT name, last_season, updated_at FROM players WHERE slug = ?", (slug,)).fetchone()
+    if player is None:
+        return None
+    tables = {}
+    for table_type, row_id, row in conn.execute(
+            "SELECT table_type, row_id, stats FROM player_seasons WHERE slug = ? ORDER BY table_type, position", (slug,)):
+        tables.setdefault(table_type, []).append((row_id, json.loads(row)))
+    return {"name": player[0], "last_season": player[1], "updated_at": player[2], "tables": tables}
+
+
+def player_page_rows(slug: str):
+    """{"name", "last_season", "updated_at", "tables": {table_type: [(row_id, row)]}} or None."""
+    return _read(_player_page_rows, slug)
+
+
+def _player_versions_since(conn, since):
+    return dict(conn.execute("SELECT slug, updated_at FROM players WHERE updated_at >= ?", (since,)))
+
+
+def player_versions_since(since: float = 0.0) -> dict:
+    """{slug: updated_at} for players stored at or after `since`."""
+    return _read(_player_versions_since, since) or {}
+
+
+def _player_seasons(conn, table_type, slugs):
+    players = {}
+    for slug, name, updated_at, season, row in _in_chunks(
+            conn, "SELECT p.slug, p.name, p.updated_at, s.season, s.stats FROM players p "
+            "LEFT JOIN player_seasons s ON s.slug = p.slug AND s.table_type = ? AND s.season IS NOT NULL "
+            "WHERE p.slug IN ({}) ORDER BY p.slug, s.position", (table_type,), slugs):
+        player = players.setdefault(slug, {"name": name, "updated_at": updated_at, "seasons": []})
+        if season is not None:
+            player["seasons"].append((season, json.loads(row)))
+    return players
+
+
+def player_seasons(table_type: str, slugs: list) -> dict:
+    """{slug: {"name", "updated_at", "seasons": [(season, row)]}} for one table type of each stored player."""
+    return _read(_player_seasons, table_type, list(slugs)) or {}
+
+
+# Team seasons
+
+def _store_team_season(conn, table):
+    rows = [(table.season, i, table.slugs[i], table.names[i], json.dumps(table.row(i)), table.loaded_at)
+            for i in range(len(table))]
+    conn.execute("DELETE FROM team_seasons WHERE season = ?", (table.season,))
+    conn.executemany("INSERT INTO team_seasons VALUES (?, ?, ?, ?, ?, ?)", rows)
+
+
+def store_team_season(table):
+    _write(_store_team_season, table)
+
+
+def _team_season_rows(conn, season):
+    rows = conn.execute("SELECT name, slug, stats, updated_at FROM team_seasons WHERE season = ? ORDER BY position",
+                        (season,)).fetchall()
+    if not rows:
+        return None
+    return {"updated_at": rows[0][3], "rows": [(name, slug, json.loads(row)) for name, slug, row, _ in rows]}
+
+
+def team_season_rows(season: str):
+    """{"updated_at", "rows": [(school name, slug, row)]} in table order, or None."""
+    return _read(_team_season_rows, str(season))
+
+
+# Games, box score lines and plays
+
+def _store_game(conn, league, game_id, meta, data, lines, plays, updated_at):
+    key = (league, game_id)
+    conn.execute("INSERT OR REPLACE INTO games VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", (
+        league, game_id, meta.get("date"), meta.get("home_team_id"), meta.get("away_team_id"),
+        meta.get("home_score"), meta.get("away_score"), meta.get("conference_game"),
+        int(bool(meta.get("completed"))), json.dumps(data), updated_at,
+    ))
+    conn.execute("DELETE FROM box_score_lines WHERE league = ? AND game_id = ?", key)
+    conn.executemany("INSERT INTO box_score_lines VALUES (?, ?, ?, ?, ?, ?, ?)", [
+        (league, game_id, team, position, line["name"], line.get("starter"), json.dumps(line))
+        for team, team_lines in lines.items() for position, line in enumerate(team_lines)
+    ])
+    conn.execute("DELETE FROM plays WHERE league = ? AND game_id = ?", key)
+    conn.executemany("INSERT INTO plays VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", [
+        (league, game_id, seq, play.get("period", {}).get("number"), play.get("clock", {}).get("displayValue"),
+         play.get("team", {}).get("displayName"), play.get("text"),
+         _score(play.get("homeScore")), _score(play.get("awayScore")))
+        for seq, play in enumerate(plays)
+    ])
+
+
+def store_game(league: str, game_id: str, meta: dict, data: dict, lines: dict, plays: list, updated_at: float = None):
+    """Store a game's summary payload plus its box score lines ({team: [line]}) and plays."""
+    _write(_store_game, league, game_id, meta, data, lines, plays, updated_at or time.time())
+
+
+def _game_payload(conn, league, game_id):
+    row = conn.execute("SELECT payload, completed, updated_at FROM games WHERE league = ? AND game_id = ?",
+                       (league, game_id)).fetchone()
+    if row is None:
+        return None
+    return {"data": json.loads(row[0]), "completed": bool(row[1]), "updated_at": row[2]}
+
+
+def game_payload(league: str, game_id: str):
+    """{"data", "completed", "updated_at"} for a stored game, or None."""
+    return _read(_game_payload, league, str(game_id))
+
+
+def _completed_games(conn, league, game_ids):
+    return {game_id for (game_id,) in _in_chunks(
+        conn, "SELECT game_id FROM games WHERE league = ? AND completed = 1 AND game_id IN ({})", (league,), game_ids)}
+
+
+def completed_games(league: str, game_ids: list) -> set:
+    """Which of `game_ids` are stored as finished games."""
+    return _read(_completed_games, league, [str(game_id) for game_id in game_ids]) or set()
+
+
+# Refresh
+
+def _stale_entries(conn, season, live_season, player_ttl, season_ttl, limit):
+    now = time.time()
+    players = [slug for slug, in conn.execute(
+        "SELECT slug FROM players WHERE last_season >= ? AND updated_at < ? ORDER BY updated_at LIMIT ?",
+        (live_season, now - player_ttl, limit))]
+    seasons = [season for season, in conn.execute(
+        "SELECT DISTINCT season FROM team_seasons WHERE season >= ? AND updated_at < ?", (season, now - season_ttl))]
+    since = time.strftime("%Y-%m-%d", time.gmtime(now - 24 * 60 * 60))
+    games = conn.execute(
+        "SELECT league, game_id FROM games WHERE completed = 0 AND date >= ? ORDER BY date LIMIT ?",
+        (since, limit)).fetchall()
+    return {"players": players, "team_seasons": seasons, "games": games}
+
+
+def stale_entries(season: str, live_season: str, player_ttl: float, season_ttl: float, limit: int = 50) -> dict:
+    """Current-season tables and active players (last row from `live_season` on) older than their TTL,
+    and unfinished games from the last day."""
+    return _read(_stale_entries, str(season), str(live_season), player_ttl, season_ttl, limit) or {
+        "players": [], "team_seasons": [], "games": []}
+
+
+def _counts(conn):
+    return {table: conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+            for table in ("players", "player_seasons", "team_seasons", "games", "box_score_lines", "plays")}
+
+
+def warehouse_stats() -> dict:
+    return {**stats, "rows": _read(_counts), "file": WAREHOUSE_FILE}
@@ -0,0 +1,118 @@
+"""Parity check and before/after timing for table extraction.
+
+Compares the old approach (parse the whole page, then re-parse every comment
+into the soup) with the TableSpecs the app extracts tables through, on the
+fixture pages or on saved sports-reference pages (plain or gzipped):
+
+    python -m bench.extract_parity
+    python -m bench.extract_parity player.html 2024-school-stats.html.gz
+
+Every row a spec keeps must have the same cells and links as the legacy soup
+gives for it. Exits non-zero if any table differs.
+"""
+import gzip
+import os
+import sys
+import time
+
+from bs4 import BeautifulSoup, Comment
+
+from app.player_page import PLAYER_TABLE_SPECS
+from app.roster import ROSTER_SPEC
+from app.school_stats import SCHOOL_STATS_SPEC
+from app.tables import TableSpec
+from bench.fixtures.build import FIXTURE_DIR, FIXTURES
+
+SPECS = [*PLAYER_TABLE_SPECS.values(), SCHOOL_STATS_SPEC, ROSTER_SPEC,
+         TableSpec("basic_opp_stats", required="school_name", links=("school_name",))]
+
+
+def read_page(path: str) -> str:
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rt", encoding="utf-8") as f:
+        return f.read()
+
+
+def legacy_soup(html: str):
+    soup = BeautifulSoup(html, "html.parser")
+    comments = soup.find_all(string=lambda text: isinstance(text, Comment))
+    for comment in comments:
+        soup.append(BeautifulSoup(comment, "html.parser"))
+    return soup
+
+
+def legacy_rows(soup, spec: TableSpec):
+    """[(row id, {data-stat: text}, {link stat: (href, text)})] of the rows `spec` keeps, read from the soup."""
+    table = soup.find("table", {"id": spec.table_id})
+    if table is None:
+        return None
+    prefix = spec.row_id_prefix
+    rows = []
+    for tr in table.find_all("tr"):
+        row_id = tr.get("id") or ""
+        if prefix is not None and not row_id.startswith(prefix):
+            continue
+        cells = tr.find_all(["td", "th"])
+        if spec.required is not None and not any(
+                cell.name == "td" and cell.get("data-stat") == spec.required for cell in cells):
+            continue
+        values = {cell.get("data-stat"): cell.text.strip() or None for cell in cells}
+        links = {}
+        for cell in cells:
+            if cell.get("data-stat") in spec.links:
+                a = cell.find("a", href=True)
+                links[cell.get("data-stat")] = (a["href"], a.text.strip()) if a else None
+        rows.append((row_id[len(prefix):] if prefix else row_id, values, links))
+    return rows
+
+
+def spec_rows(table, spec: TableSpec):
+    if table is None:
+        return None
+    return [(row_id, {stat: value for stat, value in table.row(i).items() if value is not None},
+             {stat: table.links[stat][i] for stat in spec.links if table.links[stat][i] is not None})
+            for i, row_id in enumerate(table.row_ids)]
+
+
+def comparable(rows):
+    if rows is None:
+        return None
+    return [(row_id, {stat: value for stat, value in values.items() if value is not None},
+             {stat: link for stat, link in links.items() if link is not None})
+            for row_id, values, links in rows]
+
+
+def best_of(fn, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main(paths, repeat: int = 5) -> int:
+    failures = 0
+    paths = paths or [os.path.join(FIXTURE_DIR, name) for name in FIXTURES if name.endswith(".html.gz")]
+    for path in paths:
+        html = read_page(path)
+        specs = [spec for spec in SPECS if f'id="{spec.table_id}"' in html]
+        if not specs:
+            print(f"{os.path.basename(path)}: no known tables, skipped")
+            continue
+
+        soup = legacy_soup(html)
+        for spec in specs:
+            if comparable(legacy_rows(soup, spec)) != spec_rows(spec.extract(html), spec):
+                print(f"{os.path.basename(path)}: MISMATCH in {spec.table_id}")
+                failures += 1
+
+        before = best_of(lambda: [legacy_rows(legacy_soup(html), spec) for spec in specs], repeat)
+        after = best_of(lambda: [spec.extract(html) for spec in specs], repeat)
+        print(f"{os.path.basename(path)} ({', '.join(spec.table_id for spec in specs)}): "
+              f"before {before * 1000:.1f} ms, after {after * 1000:.1f} ms, {before / after:.1f}x faster")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
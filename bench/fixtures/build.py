@@ -0,0 +1,485 @@
+"""Build the fixture pages the offline benchmarks parse and the stub upstream serves.
+
+By default the pages are synthesized: deterministic, shaped like the real
+sports-reference and ESPN markup the parsers rely on (tables wrapped in HTML
+comments, repeated header rows, page-sized filler, full summary payloads), with
+stats drawn from plausible per-game college ranges and kept consistent with
+each other (see README.md; the values are made up, not real results).
+`--record` fetches the real pages instead, for refreshing the fixtures while
+online; pass `fixture=url` to record a different page (e.g. a real game id):
+
+    python -m bench.fixtures.build
+    python -m bench.fixtures.build --record summary-nba.json.gz=https://site.api.espn.com/...?event=401705764
+
+Fixtures are stored gzipped next to this file; see FIXTURES for what each one is.
+"""
+import gzip
+import html
+import json
+import os
+import random
+import sys
+
+FIXTURE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# fixture file -> (what it stands in for, the real URL --record saves)
+FIXTURES = {
+    "player.html.gz": (
+        "sports-reference player page",
+        "https://www.sports-reference.com/cbb/players/zach-edey-1.html"),
+    "school-stats.html.gz": (
+        "sports-reference school stats season page",
+        "https://www.sports-reference.com/cbb/seasons/men/2024-school-stats.html"),
+    "opponent-stats.html.gz": (
+        "sports-reference opponent stats season page",
+        "https://www.sports-reference.com/cbb/seasons/men/2024-opponent-stats.html"),
+    "team-season.html.gz": (
+        "sports-reference team season page (roster)",
+        "https://www.sports-reference.com/cbb/schools/purdue/men/2024.html"),
+    "schedule.html.gz": (
+        "ESPN men's college basketball team schedule",
+        "https://www.espn.com/mens-college-basketball/team/schedule/_/id/21/season/2024"),
+    "team-stats.html.gz": (
+        "ESPN NBA team stats page (seasons played)",
+        "https://www.espn.com/nba/team/stats/_/name/lal"),
+    "summary-conference.json.gz": (
+        "ESPN summary JSON, conference game",
+        "https://site.api.espn.com/apis/site/v2/sports/basketball/mens-college-basketball/summary?event=401600001"),
+    "summary-non-conference.json.gz": (
+        "ESPN summary JSON, non-conference game",
+        "https://site.api.espn.com/apis/site/v2/sports/basketball/mens-college-basketball/summary?event=401600002"),
+    "summary-nba.json.gz": (
+        "ESPN summary JSON, NBA game",
+        "https://site.api.espn.com/apis/site/v2/sports/basketball/nba/summary?event=401600003"),
+    "teams.json.gz": (
+        "ESPN men's college basketball team list",
+        "https://site.api.espn.com/apis/site/v2/sports/basketball/mens-college-basketball/teams?limit=500"),
+}
+
+# Game ids the synthesized summaries carry; the stub rewrites them to the id requested
+FIXTURE_GAME_IDS = {
+    "summary-conference.json.gz": "401600001",
+    "summary-non-conference.json.gz": "401600002",
+    "summary-nba.json.gz": "401600003",
+}
+
+
+def fixture_path(name: str) -> str:
+    return os.path.join(FIXTURE_DIR, name)
+
+
+def read_fixture(name: str) -> str:
+    with gzip.open(fixture_path(name), "rt", encoding="utf-8") as f:
+        return f.read()
+
+
+def write_fixture(name: str, text: str):
+    # mtime=0 so rebuilding unchanged fixtures leaves the files byte-identical
+    with open(fixture_path(name), "wb") as f:
+        f.write(gzip.compress(text.encode("utf-8"), compresslevel=9, mtime=0))
+
+
+def filler(count: int) -> str:
+    """Navigation and ad markup the parsers have to skip past."""
+    return "".join(f'<div class="x"><p>filler {i} <a href="/x/{i}">link</a></p></div>' for i in range(count))
+
+
+# sports-reference
+
+PLAYER_STATS = ["year_id", "team_name_abbr", "conf_abbr", "class", "pos", "games", "games_started", "mp",
+                "fg", "fga", "fg_pct", "fg3", "fg3a", "fg3_pct", "fg2", "fg2a", "fg2_pct", "efg_pct",
+                "ft", "fta", "ft_pct", "orb", "drb", "trb", "ast", "stl", "blk", "tov", "pf", "pts", "awards"]
+
+
+def pct(made: int, attempted: int) -> str:
+    """sports-reference's format for a fraction: .452, or blank when there were no attempts."""
+    return f"{made / attempted:.3f}".lstrip("0") if attempted else ""
+
+
+def player_season() -> dict:
+    """One season's totals for a starting college big, consistent with each other."""
+    games = random.randint(28, 38)
+
+    def total(low, high):
+        return round(random.uniform(low, high) * games)
+
+    fg2a, fg3a, fta = total(7, 13), total(0, 1.5), total(4, 10)
+    fg2 = round(fg2a * random.uniform(0.50, 0.65))
+    fg3 = round(fg3a * random.uniform(0.20, 0.40))
+    ft = round(fta * random.uniform(0.60, 0.75))
+    orb, drb = total(2, 5), total(5, 9)
+    return {"games": games, "games_started": random.randint(games - 4, games), "mp": total(22, 32),
+            "fg": fg2 + fg3, "fga": fg2a + fg3a, "fg3": fg3, "fg3a": fg3a, "fg2": fg2, "fg2a": fg2a,
+            "ft": ft, "fta": fta, "orb": orb, "drb": drb, "trb": orb + drb, "ast": total(0.5, 2.5),
+            "stl": total(0.2, 1), "blk": total(0.5, 2.5), "tov": total(1.5, 3), "pf": total(2, 3.5),
+            "pts": 2 * fg2 + 3 * fg3 + ft}
+
+
+def player_row(table_id: str, season: str, totals: dict, per_game: bool) -> str:
+    career = season == "Career"
+    games = totals["games"]
+    cells = []
+    for stat in PLAYER_STATS:
+        if stat == "year_id":
+            label = "Career" if career else f'<a href="/cbb/seasons/men/{season}.html">{int(season) - 1}-{season[2:]}</a>'
+            cells.append(f'<th scope="row" class="left" data-stat="year_id">{label}</th>')
+            continue
+        if stat == "team_name_abbr":
+            value = "" if career else f'<a href="/cbb/schools/purdue/men/{season}.html">Purdue</a>'
+        elif stat == "conf_abbr":
+            value = "" if career else "Big Ten"
+        elif stat == "class":
+            value = "SR"
+        elif stat == "pos":
+            value = "C"
+        elif stat == "efg_pct":
+            value = pct(totals["fg"] + 0.5 * totals["fg3"], totals["fga"])
+        elif stat.endswith("pct"):
+            shots = stat[:-len("_pct")]
+            value = pct(totals[shots], totals[f"{shots}a"])
+        elif stat == "awards":
+            value = "AA-1,NPOY" if season == "2024" else ""
+        elif per_game and stat not in ("games", "games_started"):
+            value = f"{totals[stat] / games:.1f}"
+        else:
+            value = str(totals[stat])
+        align = "left" if stat in ("team_name_abbr", "conf_abbr", "awards") else "right"
+        cells.append(f'<td class="{align}" data-stat="{stat}">{value}</td>')
+    return f'<tr id="{table_id}.{season}">' + "".join(cells) + "</tr>"
+
+
+def player_table(table_id: str, seasons: dict, per_game: bool) -> str:
+    head = "<thead><tr>" + "".join(f'<th data-stat="{stat}">{stat}</th>' for stat in PLAYER_STATS) + "</tr></thead>"
+    body = "".join(player_row(table_id, season, totals, per_game) for season, totals in seasons.items())
+    career = {stat: sum(totals[stat] for totals in seasons.values()) for stat in next(iter(seasons.values()))}
+    foot = player_row(table_id, "Career", career, per_game)
+    return (f'<table class="stats_table" id="{table_id}" data-cols-to-freeze=",1"><caption>{table_id}</caption>'
+            f"{head}<tbody>{body}</tbody><tfoot>{foot}</tfoot></table>")
+
+
+def player_page() -> str:
+    seasons = {str(season): player_season() for season in (2021, 2022, 2023, 2024)}
+    # Per game is in the page, totals and advanced are commented out, as on the real site
+    return f"""<html><head><title>Zach Edey College Stats</title></head><body>
+<div id="info"><h1><span>Zach Edey</span></h1></div>
+{filler(3000)}
+<div id="all_players_per_game"><div class="table_container">{player_table("players_per_game", seasons, True)}</div></div>
+<div id="all_players_totals"><!--
+<div class="table_container">{player_table("players_totals", seasons, False)}</div>
+--></div>
+<div id="all_players_advanced"><!-- <div><table id="players_advanced"><tr id="players_advanced.2024"><td data-stat="per">30</td></tr></table></div> --></div>
+{filler(3000)}
+</body></html>"""
+
+
+SCHOOLS = [("abilene-christian", "Abilene Christian"), ("air-force", "Air Force"), ("arkansas", "Arkansas"),
+           ("kansas", "Kansas"), ("kansas-state", "Kansas State"), ("san-diego-state", "San Diego State"),
+           ("nevada-las-vegas", "UNLV"), ("north-carolina", "North Carolina"), ("texas-am", "Texas A&amp;M"),
+           ("saint-marys-ca", "Saint Mary's (CA)"), ("purdue", "Purdue"), ("gonzaga", "Gonzaga")]
+SCHOOLS += [(f"school-{i}", f"School {i}") for i in range(350)]
+
+SCHOOL_STATS = ["g", "wins", "losses", "win_loss_pct", "srs", "sos", "x1", "wins_conf", "losses_conf", "x2",
+                "wins_home", "losses_home", "x3", "wins_visitor", "losses_visitor", "x4", "pts", "opp_pts", "x5",
+                "mp", "fg", "fga", "fg_pct", "fg3", "fg3a", "fg3_pct", "ft", "fta", "ft_pct", "orb", "trb", "ast",
+                "stl", "blk", "tov", "pf"]
+# The opponent page has the same columns, with opp_ on everything from minutes on
+OPPONENT_STATS = SCHOOL_STATS[:SCHOOL_STATS.index("mp")] + [
+    stat if stat.startswith("x") else f"opp_{stat}" for stat in SCHOOL_STATS[SCHOOL_STATS.index("mp"):]]
+
+
+def season_totals(games: int) -> dict:
+    """A team's (or its opponents') season totals at college rates per game, consistent with each other."""
+    def total(low, high):
+        return round(random.uniform(low, high) * games)
+
+    fga, fta = total(52, 62), total(15, 25)
+    fg3a = round(fga * random.uniform(0.30, 0.45))
+    fg3 = round(fg3a * random.uniform(0.30, 0.40))
+    fg = fg3 + round((fga - fg3a) * random.uniform(0.45, 0.56))
+    ft = round(fta * random.uniform(0.65, 0.78))
+    orb = total(7, 13)
+    return {"mp": 200 * games + 5 * random.randint(0, 3), "fg": fg, "fga": fga, "fg_pct": pct(fg, fga),
+            "fg3": fg3, "fg3a": fg3a, "fg3_pct": pct(fg3, fg3a), "ft": ft, "fta": fta, "ft_pct": pct(ft, fta),
+            "orb": orb, "trb": orb + total(22, 28), "ast": total(11, 17), "stl": total(5, 9),
+            "blk": total(2, 5), "tov": total(10, 14), "pf": total(15, 20), "pts": 2 * fg + fg3 + ft}
+
+
+def split(wins: int, losses: int, games: int) -> tuple:
+    """(wins, losses) over `games` of a wins-losses record."""
+    split_wins = random.randint(max(0, games - losses), min(wins, games))
+    return split_wins, games - split_wins
+
+
+def school_season() -> dict:
+    """A school's record, its totals and its opponents' totals for one season."""
+    games = random.randint(28, 35)
+    wins = random.randint(6, games - 4)
+    losses = games - wins
+    wins_conf, losses_conf = split(wins, losses, random.randint(16, 20))
+    neutral = random.randint(0, 4)
+    wins_home, losses_home = split(wins, losses, (games - neutral) // 2 + 1)
+    wins_visitor, losses_visitor = split(wins - wins_home, losses - losses_home,
+                                         games - neutral - wins_home - losses_home)
+    own, opponents = season_totals(games), season_totals(games)
+    return {"g": games, "wins": wins, "losses": losses, "win_loss_pct": pct(wins, games),
+            "srs": f"{random.uniform(-15, 25):.2f}", "sos": f"{random.uniform(-10, 12):.2f}",
+            "wins_conf": wins_conf, "losses_conf": losses_conf, "wins_home": wins_home,
+            "losses_home": losses_home, "wins_visitor": wins_visitor, "losses_visitor": losses_visitor,
+            "own": own, "opponents": opponents}
+
+
+def school_value(season: dict, stat: str):
+    if stat == "pts":
+        return season["own"]["pts"]
+    if stat == "opp_pts":
+        return season["opponents"]["pts"]
+    if stat.startswith("opp_"):
+        return season["opponents"][stat[len("opp_"):]]
+    return season[stat] if stat in season else season["own"][stat]
+
+
+def school_table(table_id: str, season: str, seasons: list, stats: list = SCHOOL_STATS) -> str:
+    rows = []
+    for i, (slug, name) in enumerate(SCHOOLS):
+        if i and i % 20 == 0:
+            rows.append('<tr class="thead"><th data-stat="ranker">Rk</th><th data-stat="school_name">School</th></tr>')
+        tournament = "&nbsp;<small>NCAA</small>" if i % 3 == 0 else ""
+        cells = [f'<th scope="row" class="right" data-stat="ranker">{i + 1}</th>',
+                 f'<td class="left" data-stat="school_name"><a href="/cbb/schools/{slug}/men/{season}.html">{name}</a>{tournament}</td>']
+        for stat in stats:
+            if stat.startswith("x"):
+                cells.append(f'<td class="right iz" data-stat="{stat}"></td>')
+            else:
+                cells.append(f'<td class="right" data-stat="{stat}">{school_value(seasons[i], stat)}</td>')
+        rows.append("<tr>" + "".join(cells) + "</tr>")
+    head = ('<thead><tr class="over_header"><th colspan="3"></th><th colspan="6">Overall</th></tr>'
+            '<tr><th data-stat="ranker">Rk</th><th data-stat="school_name">School</th></tr></thead>')
+    return f'<table class="sortable stats_table" id="{table_id}">{head}<tbody>{"".join(rows)}</tbody></table>'
+
+
+def school_stats_page(seasons: list) -> str:
+    return (f'<html><head><title>2023-24 School Stats</title></head><body>'
+            f'<div id="all_basic_school_stats"><div class="table_container">{school_table("basic_school_stats", "2024", seasons)}</div></div>'
+            f'{filler(2000)}'
+            f'<div id="all_adv_school_stats"><!-- <div>{school_table("adv_school_stats", "2024", seasons)}</div> --></div>'
+            f'</body></html>')
+
+
+def opponent_stats_page(seasons: list) -> str:
+    return (f'<html><head><title>2023-24 Opponent Stats</title></head><body>'
+            f'<div id="all_basic_opp_stats"><div class="table_container">'
+            f'{school_table("basic_opp_stats", "2024", seasons, OPPONENT_STATS)}</div></div>'
+            f'{filler(2000)}</body></html>')
+
+
+def team_season_page() -> str:
+    players = [("Zach Edey", "zach-edey-1")] + [(f"Player {chr(97 + i)}", f"player-{chr(97 + i)}-1") for i in range(12)]
+    rows = "".join(
+        f'<tr><th scope="row" class="left" data-stat="player"><a href="/cbb/players/{slug}.html">{name}</a></th>'
+        f'<td data-stat="number">{i}</td><td data-stat="class">SR</td><td data-stat="pos">G</td></tr>'
+        for i, (name, slug) in enumerate(players))
+    return (f"<html><body><h1>2023-24 Purdue Men's Roster</h1>{filler(500)}"
+            f'<div id="all_roster"><div class="table_container"><table class="sortable stats_table" id="roster">'
+            f'<thead><tr><th data-stat="player">Player</th></tr></thead><tbody>{rows}</tbody></table></div></div>'
+            f"{filler(500)}</body></html>")
+
+
+# ESPN
+
+OPPONENTS = [("UNLV", True), ("Gonzaga", False), ("Boise State", True), ("Arizona", False), ("Utah State", True),
+             ("Saint Mary's", False), ("New Mexico", True), ("UC San Diego", False), ("Nevada", True),
+             ("Fresno State", True), ("Colorado State", True), ("Wyoming", True), ("Air Force", True),
+             ("San Jose State", True), ("Grand Canyon", False), ("Washington", False)]
+MONTHS = [("Nov", 6, 30), ("Dec", 1, 31), ("Jan", 1, 31), ("Feb", 1, 29), ("Mar", 1, 9)]
+
+
+def schedule_page(games: int = 32, played: int = 30) -> str:
+    dates = [(month, day) for month, first, last in MONTHS for day in range(first, last + 1, 4)]
+    rows = ['<tr class="Table__TR"><td>DATE</td><td>OPPONENT</td><td>RESULT</td><td>W-L (CONF)</td></tr>']
+    wins = conference_wins = 0
+    for i in range(games):
+        month, day = dates[i]
+        opponent, conference = OPPONENTS[i % len(OPPONENTS)]
+        where = "vs" if i % 2 == 0 else "@"
+        game_id = 401600001 + i
+        href = f"https://www.espn.com/mens-college-basketball/game/_/gameId/{game_id}/sdsu-opponent"
+        if i < played:
+            won = random.random() < 0.7
+            wins += won
+            conference_wins += won and conference
+            ours, theirs = random.randint(60, 85), random.randint(55, 80)
+            if won == (ours < theirs):
+                ours, theirs = theirs, ours
+            result = f'<span>{"W" if won else "L"}</span><a href="{href}">{max(ours, theirs)}-{min(ours, theirs)}</a>'
+            record = f"{wins}-{i + 1 - wins} ({conference_wins}-0)"
+        else:
+            result = f'<a href="{href}">7:00 PM</a>'
+            record = ""
+        rows.append(f'<tr class="Table__TR"><td><span>Sat, {month} {day}</span></td>'
+                    f'<td><span>{where}</span> <span>{opponent}{" *" if conference else ""}</span></td>'
+                    f'<td>{result}</td><td>{record}</td></tr>')
+    return (f'<html><body>{filler(1500)}<div class="Table__Scroller"><table class="Table">'
+            f'{"".join(rows)}</table></div>{filler(1500)}</body></html>')
+
+
+def team_stats_page() -> str:
+    return (f'<html><body>{filler(1000)}<div class="ClubhouseHeader__Team"><h1>Los Angeles Lakers</h1>'
+            f"<p>77th season</p></div>{filler(1000)}</body></html>")
+
+
+BOX_SCORE_KEYS = {"MIN": "minutes", "FG": "fieldGoalsMade-fieldGoalsAttempted",
+                  "3PT": "threePointFieldGoalsMade-threePointFieldGoalsAttempted",
+                  "FT": "freeThrowsMade-freeThrowsAttempted", "OREB": "offensiveRebounds",
+                  "DREB": "defensiveRebounds", "REB": "rebounds", "AST": "assists", "STL": "steals",
+                  "BLK": "blocks", "TO": "turnovers", "PF": "fouls", "+/-": "plusMinus", "PTS": "points"}
+
+
+def espn_team(team_id: str, abbreviation: str, name: str, location: str) -> dict:
+    return {"id": team_id, "abbreviation": abbreviation, "displayName": name, "location": location,
+            "shortDisplayName": location}
+
+
+def team_list() -> dict:
+    """ESPN's team list for every school in SCHOOLS; the real ids for the teams the summaries use."""
+    known = {"san-diego-state": ("21", "SDSU", "Aztecs"), "nevada-las-vegas": ("2439", "UNLV", "Rebels"),
+             "gonzaga": ("2250", "GONZ", "Bulldogs")}
+    teams = []
+    for i, (slug, name) in enumerate(SCHOOLS):
+        location = html.unescape(name)
+        team_id, abbreviation, nickname = known.get(slug, (str(3000 + i), f"T{i}", f"Mascots {i}"))
+        teams.append({"team": {**espn_team(team_id, abbreviation, f"{location} {nickname}", location),
+                               "name": nickname}})
+    return {"sports": [{"leagues": [{"teams": teams}]}]}
+
+
+def box_score_block(team: dict, labels: list) -> tuple:
+    """(boxscore.players entry, points) for ten players and one who didn't play."""
+    athletes = []
+    totals = dict.fromkeys(labels, 0)
+    shots = {"FG": [0, 0], "3PT": [0, 0], "FT": [0, 0]}
+    for i in range(10):
+        fga = random.randint(0, 15)
+        fgm = random.randint(0, fga)
+        tpa = random.randint(0, min(fga, 8))
+        tpm = random.randint(0, min(tpa, fgm))
+        fta = random.randint(0, 8)
+        ftm = random.randint(0, fta)
+        line = {"MIN": random.randint(5, 35), "OREB": random.randint(0, 4), "DREB": random.randint(0, 8),
+                "AST": random.randint(0, 8), "STL": random.randint(0, 3), "BLK": random.randint(0, 3),
+                "TO": random.randint(0, 4), "PF": random.randint(0, 5), "PTS": 2 * (fgm - tpm) + 3 * tpm + ftm}
+        line["REB"] = line["OREB"] + line["DREB"]
+        for label, made, attempted in (("FG", fgm, fga), ("3PT", tpm, tpa), ("FT", ftm, fta)):
+            shots[label][0] += made
+            shots[label][1] += attempted
+            line[label] = f"{made}-{attempted}"
+        line["+/-"] = f"{random.randint(-12, 12):+d}"
+        for label, value in line.items():
+            if isinstance(value, int):
+                totals[label] += value
+        athletes.append({
+            "athlete": {"id": f"{team['id']}{i:02d}", "displayName": f"{team['location']} Player {i}",
+                        "shortName": f"P. {i}", "jersey": str(i)},
+            "starter": i < 5, "didNotPlay": False, "active": True,
+            "stats": [str(line[label]) for label in labels],
+        })
+    athletes.append({"athlete": {"id": f"{team['id']}99", "displayName": f"{team['location']} Walk-on"},
+                     "starter": False, "didNotPlay": True, "reason": "COACH'S DECISION", "stats": []})
+    total_line = [f"{shots[label][0]}-{shots[label][1]}" if label in shots else
+                  "" if label == "+/-" else str(totals[label]) for label in labels]
+    block = {"team": team, "statistics": [{"names": labels, "keys": [BOX_SCORE_KEYS[label] for label in labels],
+                                           "labels": labels, "athletes": athletes, "totals": total_line}]}
+    return block, totals["PTS"]
+
+
+def summary(game_id: str, home: dict, away: dict, conference: bool, nba: bool = False) -> dict:
+    labels = ["MIN", "FG", "3PT", "FT", "OREB", "DREB", "REB", "AST", "STL", "BLK", "TO", "PF"]
+    labels += ["+/-", "PTS"] if nba else ["PTS"]
+    home_block, home_points = box_score_block(home, labels)
+    away_block, away_points = box_score_block(away, labels)
+
+    periods, per_period = (4, 120) if nba else (2, 225)
+    plays = []
+    home_score = away_score = 0
+    for seq in range(periods * per_period):
+        team = home if seq % 2 else away
+        scoring = random.random() < 0.4
+        if scoring and team is home:
+            home_score += 2
+        elif scoring:
+            away_score += 2
+        plays.append({
+            "id": f"{game_id}{seq:04d}", "sequenceNumber": str(seq),
+            "text": f"{team['location']} Player {seq % 10} {'made' if scoring else 'missed'} Jumper.",
+            "period": {"number": 1 + seq // per_period, "displayValue": f"Period {1 + seq // per_period}"},
+            "clock": {"displayValue": f"{19 - (seq % per_period) // 12}:{(seq * 7) % 60:02d}"},
+            "team": {"id": team["id"]}, "homeScore": home_score, "awayScore": away_score,
+            "scoringPlay": scoring, "shootingPlay": seq % 3 != 2,
+        })
+
+    competition = {
+        "id": game_id, "date": "2024-01-10T03:00Z", "conferenceCompetition": conference, "neutralSite": False,
+        "status": {"type": {"completed": True, "state": "post", "description": "Final"}},
+        "competitors": [
+            {"homeAway": "home", "score": str(home_points), "winner": home_points > away_points, "team": home},
+            {"homeAway": "away", "score": str(away_points), "winner": away_points > home_points, "team": away},
+        ],
+    }
+    return {
+        "header": {"id": game_id, "season": {"year": 2024, "type": 2}, "competitions": [competition]},
+        "boxscore": {"teams": [], "players": [home_block, away_block]},
+        "plays": plays,
+        "gameInfo": {"venue": {"fullName": "Viejas Arena"}},
+    }
+
+
+def synthesize():
+    random.seed(2024)
+    sdsu = espn_team("21", "SDSU", "San Diego State Aztecs", "San Diego State")
+    unlv = espn_team("2439", "UNLV", "UNLV Rebels", "UNLV")
+    gonzaga = espn_team("2250", "GONZ", "Gonzaga Bulldogs", "Gonzaga")
+    lakers = espn_team("13", "LAL", "Los Angeles Lakers", "Los Angeles")
+    blazers = espn_team("22", "POR", "Portland Trail Blazers", "Portland")
+    seasons = [school_season() for _ in SCHOOLS]
+    pages = {
+        "player.html.gz": player_page(),
+        "school-stats.html.gz": school_stats_page(seasons),
+        "team-season.html.gz": team_season_page(),
+        "schedule.html.gz": schedule_page(),
+        "team-stats.html.gz": team_stats_page(),
+        "summary-conference.json.gz": json.dumps(summary(
+            FIXTURE_GAME_IDS["summary-conference.json.gz"], sdsu, unlv, True)),
+        "summary-non-conference.json.gz": json.dumps(summary(
+            FIXTURE_GAME_IDS["summary-non-conference.json.gz"], gonzaga, sdsu, False)),
+        "summary-nba.json.gz": json.dumps(summary(
+            FIXTURE_GAME_IDS["summary-nba.json.gz"], lakers, blazers, False, nba=True)),
+        "opponent-stats.html.gz": opponent_stats_page(seasons),
+        "teams.json.gz": json.dumps(team_list()),
+    }
+    for name, text in pages.items():
+        write_fixture(name, text)
+        print(f"{name:32} {len(text) / 1024:8.1f} KiB")
+
+
+def record(overrides: dict):
+    import httpx
+
+    from app.http_client import BROWSER_HEADERS
+
+    with httpx.Client(headers=BROWSER_HEADERS, follow_redirects=True, timeout=30) as client:
+        for name, (_, url) in FIXTURES.items():
+            url = overrides.get(name, url)
+            response = client.get(url)
+            response.raise_for_status()
+            text = response.text
+            if name in FIXTURE_GAME_IDS:
+                # Store under the fixture's own id, which the stub rewrites to the one requested
+                text = text.replace(url.rsplit("=", 1)[1], FIXTURE_GAME_IDS[name])
+            write_fixture(name, text)
+            print(f"{name:32} {len(text) / 1024:8.1f} KiB  {url}")
+
+
+if __name__ == "__main__":
+    if "--record" in sys.argv[1:]:
+        record(dict(arg.split("=", 1) for arg in sys.argv[1:] if "=" in arg))
+    else:
+        synthesize()
@@ -0,0 +1,70 @@
+"""Serialization throughput of app.responses.dumps vs the old jsonable_encoder + json.dumps path.
+
+Synthetic payloads shaped like the two largest responses: multi-game play-by-play
+and a roster with PlayerStats models.
+
+    python -m bench.json_serialize [games] [roster size]
+"""
+import json
+import random
+import sys
+import time
+
+from fastapi.encoders import jsonable_encoder
+
+from app.responses import dumps, orjson
+from app.schema import PlayerStats, field_kinds
+
+
+def play_by_play(games: int, plays_per_game: int = 450) -> dict:
+    return {
+        str(401000000 + g): [
+            {"period": 1 + i // 225, "clock": f"{random.randint(0, 19)}:{random.randint(0, 59):02d}",
+             "description": "Player Name made Three Point Jumper. Assisted by Other Player.",
+             "team": "San Diego State Aztecs", "SDSU": i // 4, "UNLV": i // 5}
+            for i in range(plays_per_game)
+        ]
+        for g in range(games)
+    }
+
+
+def roster(size: int) -> dict:
+    players = []
+    for i in range(size):
+        stats = PlayerStats(**{field: f"{random.uniform(0, 30):.1f}" for field in field_kinds(PlayerStats)})
+        players.append({"name": f"Player {i}", "slug": f"player-{i}-1", "stats": stats})
+    return {"team": "san-diego-state", "season": "2024", "players": players}
+
+
+def throughput(fn, repeat: int = 5):
+    """(best seconds per call, MB/s of output)."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        body = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, len(body) / best / 1e6
+
+
+def report(name: str, payload):
+    cases = {
+        "before  jsonable_encoder + json.dumps": lambda: json.dumps(jsonable_encoder(payload)).encode(),
+        "before  json.dumps(indent=4)         ": lambda: json.dumps(jsonable_encoder(payload), indent=4).encode(),
+        "after   dumps                        ": lambda: dumps(payload),
+        "after   dumps(pretty=True)           ": lambda: dumps(payload, pretty=True),
+    }
+    print(name)
+    for label, fn in cases.items():
+        seconds, rate = throughput(fn)
+        print(f"  {label} {seconds * 1000:8.2f} ms {rate:8.1f} MB/s")
+
+
+def main(games: int, roster_size: int):
+    random.seed(0)
+    print(f"encoder: {'orjson' if orjson else 'json (orjson not installed)'}")
+    report(f"play-by-play, {games} games", play_by_play(games))
+    report(f"roster, {roster_size} players", roster(roster_size))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10, int(sys.argv[2]) if len(sys.argv) > 2 else 15)
@@ -0,0 +1,97 @@
+"""Model construction and serialization cost: per-request models vs trusted/numeric/bulk rows.
+
+Uses synthetic rows shaped like the scrapers' output, so it needs no fixtures:
+
+    python -m bench.schema_build [teams]
+
+"before" is what the endpoints did (validate a string model per row, let FastAPI
+encode it); "after" is trusted()/numeric() and StatRows.
+"""
+import json
+import random
+import sys
+import time
+import tracemalloc
+
+from fastapi.encoders import jsonable_encoder
+
+from app.schema import (PlayerStats, TeamStats, TeamStatsNumeric, StatRows, field_kinds, numeric,
+                        numeric_values, trusted, PYDANTIC_V2)
+
+
+def fake_value(field: str, kind) -> str:
+    if kind == "pct":
+        return f".{random.randint(300, 700)}"
+    if kind is int:
+        return str(random.randint(0, 3000))
+    if kind is float:
+        return f"{random.uniform(0, 40):.1f}"
+    return field.title()
+
+
+def fake_row(model) -> dict:
+    return {field: fake_value(field, kind) for field, kind in field_kinds(model).items()}
+
+
+def timed(fn, repeat: int) -> float:
+    """Best-of-5 microseconds per call."""
+    best = float("inf")
+    for _ in range(5):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            fn()
+        best = min(best, (time.perf_counter() - start) / repeat)
+    return best * 1e6
+
+
+def peak_kib(fn) -> float:
+    tracemalloc.start()
+    kept = fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    del kept
+    return peak / 1024
+
+
+def main(teams: int):
+    from app.schema import PlayerStatsNumeric
+
+    random.seed(0)
+    player = fake_row(PlayerStatsNumeric)
+    print(f"pydantic {'2' if PYDANTIC_V2 else '1'}")
+    print("one player row (us/row)")
+    print(f"  before  PlayerStats(**row)            {timed(lambda: PlayerStats(**player), 2000):8.1f}")
+    print(f"  after   trusted(PlayerStats, row)     {timed(lambda: trusted(PlayerStats, player), 2000):8.1f}")
+    print(f"  after   numeric(PlayerStatsNumeric)   {timed(lambda: numeric(PlayerStatsNumeric, player), 2000):8.1f}")
+
+    rows = [{**fake_row(TeamStatsNumeric), "slug": f"school-{i}", "season": "2024"} for i in range(teams)]
+    fields = ["school_name", "slug", "season", *(f for f in field_kinds(TeamStatsNumeric) if f != "school_name")]
+
+    def before():
+        return json.dumps(jsonable_encoder([TeamStats(**row) for row in rows]))
+
+    def build_rows(typed: bool = False):
+        table = StatRows(fields)
+        for row in rows:
+            table.append({**numeric_values(TeamStatsNumeric, row), "slug": row["slug"], "season": "2024"} if typed else row)
+        return table
+
+    print(f"{teams} team rows, build + serialize (ms)")
+    print(f"  before  [TeamStats] + jsonable_encoder {timed(before, 5) / 1000:8.2f}")
+    print(f"  after   StatRows.to_dicts             {timed(lambda: json.dumps(build_rows().to_dicts()), 5) / 1000:8.2f}")
+    print(f"  after   StatRows.to_columns           {timed(lambda: json.dumps(build_rows().to_columns()), 5) / 1000:8.2f}")
+    print(f"  after   typed StatRows.to_columns     {timed(lambda: json.dumps(build_rows(True).to_columns()), 5) / 1000:8.2f}")
+
+    print(f"{teams} team rows held in memory (KiB peak)")
+    print(f"  before  [TeamStats]                   {peak_kib(lambda: [TeamStats(**row) for row in rows]):8.1f}")
+    print(f"  after   StatRows                      {peak_kib(build_rows):8.1f}")
+    print(f"  after   typed StatRows                {peak_kib(lambda: build_rows(True)):8.1f}")
+
+    print("payload (KiB)")
+    print(f"  objects {len(json.dumps(build_rows().to_dicts())) / 1024:8.1f}")
+    print(f"  columns {len(json.dumps(build_rows().to_columns())) / 1024:8.1f}")
+    print(f"  typed   {len(json.dumps(build_rows(True).to_columns())) / 1024:8.1f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 362)
@@ -0,0 +1,142 @@
+"""Cold start benchmark: import time, import-time RSS and time to first request, against a budget.
+
+Every sample runs in a fresh interpreter with an empty cache dir and the app
+pointed at bench.stub_server, so it needs no network:
+
+- import: `import app.main`, timed, with peak RSS and which heavy optional
+  modules it pulled in (none of HEAVY_MODULES may be imported at startup)
+- first request: spawn `uvicorn app.main:app` and time until a request that
+  only needs local data (the bundled team index) answers 200; the stub must
+  see no upstream requests by then
+
+The run fails if the median of any measure is over its budget:
+
+    python -m bench.startup
+    python -m bench.startup --runs 5 --budget-import-s 0.5
+"""
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from bench import stub_server
+
+# Budgets for the median sample, with room for slower machines than the one they were set on
+BUDGETS = {
+    "import_s": 1.0,
+    "import_rss_mib": 80.0,
+    "first_request_s": 2.5,
+}
+HEAVY_MODULES = ("pandas", "numpy", "scipy", "bs4", "lxml")
+
+FIRST_REQUEST = "/teams/search?q=sdsu"
+
+IMPORT_SCRIPT = f"""
+import json, resource, sys, time
+start = time.perf_counter()
+import app.main
+elapsed = time.perf_counter() - start
+print(json.dumps({{"import_s": elapsed, "import_rss_mib": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+                  "heavy": [name for name in {HEAVY_MODULES!r} if name in sys.modules]}}))
+"""
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def environment(upstream: str, cache_dir: str) -> dict:
+    env = dict(os.environ)
+    env.update({
+        "SCOUTING_CACHE_DIR": cache_dir,
+        "SCOUTING_SPORTS_REFERENCE_URL": upstream,
+        "SCOUTING_ESPN_URL": upstream,
+        "SCOUTING_ESPN_API_URL": upstream,
+        "PYTHONDONTWRITEBYTECODE": "1",
+    })
+    return env
+
+
+def measure_import(env: dict) -> dict:
+    output = subprocess.run([sys.executable, "-c", IMPORT_SCRIPT], cwd=ROOT, env=env, check=True,
+                            capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def measure_first_request(env: dict, timeout: float = 30.0) -> float:
+    import httpx
+
+    port = free_port()
+    start = time.perf_counter()
+    server = subprocess.Popen([sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port),
+                               "--log-level", "warning"], cwd=ROOT, env=env,
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        with httpx.Client(base_url=f"http://127.0.0.1:{port}", timeout=5) as client:
+            while time.perf_counter() - start < timeout:
+                if server.poll() is not None:
+                    raise RuntimeError(f"uvicorn exited with {server.returncode}")
+                try:
+                    if client.get(FIRST_REQUEST).status_code == 200:
+                        return time.perf_counter() - start
+                except httpx.TransportError:
+                    pass  # not listening yet
+                time.sleep(0.01)
+        raise RuntimeError(f"no response within {timeout}s")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=3)
+    for measure, budget in BUDGETS.items():
+        parser.add_argument(f"--budget-{measure.replace('_', '-')}", type=float, default=budget)
+    args = parser.parse_args()
+    budgets = {measure: getattr(args, f"budget_{measure}") for measure in BUDGETS}
+
+    upstream = stub_server.start()
+    samples = {measure: [] for measure in BUDGETS}
+    heavy = set()
+    for _ in range(args.runs):
+        with tempfile.TemporaryDirectory(prefix="scouting-startup-") as cache_dir:
+            env = environment(upstream.url, cache_dir)
+            imported = measure_import(env)
+            heavy.update(imported.pop("heavy"))
+            for measure, value in imported.items():
+                samples[measure].append(value)
+            samples["first_request_s"].append(measure_first_request(env))
+    upstream.shutdown()
+
+    failures = []
+    print(f"{'measure':20} {'median':>10} {'budget':>10}")
+    for measure, values in samples.items():
+        median = statistics.median(values)
+        over = median > budgets[measure]
+        print(f"{measure:20} {median:10.3f} {budgets[measure]:10.3f}{'  OVER BUDGET' if over else ''}")
+        if over:
+            failures.append(measure)
+    if heavy:
+        print(f"heavy modules imported at startup: {', '.join(sorted(heavy))}")
+        failures.append("heavy imports")
+    if upstream.requests:
+        print(f"{upstream.requests} upstream request(s) before the first response")
+        failures.append("upstream at startup")
+    if failures:
+        print(f"{len(failures)} startup budget(s) exceeded")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
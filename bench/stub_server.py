@@ -0,0 +1,128 @@
+"""Local stand-in for sports-reference and ESPN that serves the fixture pages.
+
+Every page of a type gets the same fixture (any player slug gets the player
+page, any event id gets a summary), so benchmarks can ask for as many distinct
+URLs as they want cold. Responses carry an ETag and are gzipped when the client
+accepts it, like upstream. Point the app at it with the SCOUTING_*_URL settings:
+
+    python -m bench.stub_server 8765
+    SCOUTING_SPORTS_REFERENCE_URL=http://127.0.0.1:8765 SCOUTING_ESPN_URL=http://127.0.0.1:8765 \\
+        SCOUTING_ESPN_API_URL=http://127.0.0.1:8765 uvicorn app.main:app
+"""
+import gzip
+import re
+import sys
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from bench.fixtures.build import FIXTURE_GAME_IDS, read_fixture
+
+# path pattern -> fixture, in match order
+ROUTES = [
+    (r"/cbb/players/[^/]+\.html", "player.html.gz"),
+    (r"/cbb/seasons/(?:men/)?\d{4}-school-stats\.html", "school-stats.html.gz"),
+    (r"/cbb/seasons/(?:men/)?\d{4}-opponent-stats\.html", "opponent-stats.html.gz"),
+    (r"/cbb/schools/[^/]+/(?:men/)?\d{4}\.html", "team-season.html.gz"),
+    (r"/(?:mens-college-basketball|nba)/team/schedule/.+", "schedule.html.gz"),
+    (r"/nba/team/stats/.+", "team-stats.html.gz"),
+    (r"/apis/site/v2/sports/basketball/nba/summary", "summary-nba.json.gz"),
+    (r"/apis/site/v2/sports/basketball/mens-college-basketball/summary", None),
+    (r"/apis/site/v2/sports/basketball/mens-college-basketball/teams", "teams.json.gz"),
+]
+
+
+def schedule_page(page: str, path: str) -> str:
+    """The schedule fixture with game ids shifted per schedule URL, so each team season has its own games."""
+    offset = zlib.crc32(path.encode("utf-8")) % 10000 * 100  # a multiple of 100 keeps each game's parity
+    return re.sub(r"/gameId/(\d+)/", lambda m: f"/gameId/{int(m.group(1)) + offset}/", page)
+
+
+def summary_fixture(game_id: str) -> str:
+    # Odd ids are conference games, even ids non-conference
+    return "summary-conference.json.gz" if int(game_id) % 2 else "summary-non-conference.json.gz"
+
+
+class StubUpstream(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, latency: float = 0.0):
+        super().__init__(address, StubHandler)
+        self.latency = latency
+        self.pages = {}
+        self.requests = 0
+
+    def page(self, name: str) -> str:
+        if name not in self.pages:
+            self.pages[name] = read_fixture(name)
+        return self.pages[name]
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.server_address[0]}:{self.server_address[1]}"
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self.server.requests += 1
+        path, _, query = self.path.partition("?")
+        body = content_type = None
+        for pattern, name in ROUTES:
+            if re.fullmatch(pattern, path):
+                if "summary" in pattern:
+                    match = re.search(r"event=(\d+)", query)
+                    if not match:
+                        break
+                    name = name or summary_fixture(match.group(1))
+                    body = self.server.page(name).replace(FIXTURE_GAME_IDS[name], match.group(1))
+                    content_type = "application/json"
+                elif name == "schedule.html.gz":
+                    body = schedule_page(self.server.page(name), path)
+                    content_type = "text/html; charset=utf-8"
+                else:
+                    body = self.server.page(name)
+                    content_type = "application/json" if name.endswith(".json.gz") else "text/html; charset=utf-8"
+                break
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        if body is None:
+            return self.respond(404, b"not found", "text/plain")
+
+        data = body.encode("utf-8")
+        etag = f'"{zlib.crc32(data):08x}"'
+        if self.headers.get("If-None-Match") == etag:
+            return self.respond(304, b"", None, {"ETag": etag})
+        headers = {"ETag": etag}
+        if "gzip" in self.headers.get("Accept-Encoding", ""):
+            data = gzip.compress(data, compresslevel=1)
+            headers["Content-Encoding"] = "gzip"
+        self.respond(200, data, content_type, headers)
+
+    def respond(self, status: int, data: bytes, content_type: str, headers: dict = None):
+        self.send_response(status)
+        if content_type:
+            self.send_header("Content-Type", content_type)
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start(port: int = 0, latency: float = 0.0) -> StubUpstream:
+    """Serve the fixtures from a background thread; `latency` seconds are added to each response."""
+    server = StubUpstream(("127.0.0.1", port), latency)
+    threading.Thread(target=server.serve_forever, name="stub-upstream", daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    server = start(int(sys.argv[1]) if len(sys.argv) > 1 else 8765)
+    print(f"Serving fixtures on {server.url}")
+    threading.Event().wait()
@@ -0,0 +1,362 @@
+"""Offline scraper benchmarks against the fixture pages, checked against a saved baseline.
+
+Measures, with no network access:
+
+- parse latency (best of N) and peak traced memory of each page parser on its fixture
+- end-to-end endpoint latency, cold (empty cache, fetched from the local stub
+  upstream) and warm (served from memory), plus warm throughput (the median of
+  several concurrent bursts, since a single burst swings by a quarter or more)
+
+The app runs in-process against bench.stub_server with a throwaway cache dir.
+Results are compared to bench/baseline.json, after scaling timings by a
+calibration workload run alongside them. The baseline and the comparison are
+each the per-metric median of --runs full runs; any metric worse than its
+threshold fails the run. Baselines are machine-specific, so save one on the
+machine you compare on before making changes:
+
+    python -m bench.suite --save      # record the baseline
+    python -m bench.suite             # compare; exits 1 on a regression
+    python -m bench.suite --runs 5    # compare the median of more runs on a noisy machine
+    python -m bench.suite --quick     # fewer repetitions; reports without comparing
+"""
+import argparse
+import asyncio
+import json
+import os
+import resource
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from bench import stub_server
+from bench.fixtures.build import read_fixture
+
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+# Allowed slowdown / growth before a metric counts as a regression, by measure,
+# applied to the median of --runs runs. Set above the spread of those medians
+# between back-to-back runs of an unchanged tree on a single-CPU machine (up to
+# about a third for the millisecond-scale parse timings and cold requests).
+THRESHOLDS = {
+    "best_ms": 0.40,
+    "peak_kib": 0.15,
+    "cold_p50_ms": 0.50,
+    "warm_p50_ms": 0.40,
+    "warm_p95_ms": 0.50,
+    "warm_rps": 0.35,
+    "max_rss_mib": 0.15,
+}
+# Throughput is higher-is-better; everything else is lower-is-better
+HIGHER_IS_BETTER = {"warm_rps"}
+
+CALIBRATION = "calibration.best_ms"
+
+# Timings below this many ms are too small for a relative threshold to be meaningful
+NOISE_FLOOR_MS = 1.0
+
+
+def calibrate() -> float:
+    """Best-of-5 ms for a fixed pure-Python workload: this machine's speed right now."""
+    def work():
+        return sum(len(str(i)) for i in range(200000))
+    return min(timed(work, 5))
+
+
+def configure(upstream: str, cache_dir: str):
+    """Point the app at the stub and a fresh cache; must run before anything under app/ is imported."""
+    os.environ["SCOUTING_CACHE_DIR"] = cache_dir
+    os.environ["SCOUTING_SPORTS_REFERENCE_URL"] = upstream
+    os.environ["SCOUTING_ESPN_URL"] = upstream
+    os.environ["SCOUTING_ESPN_API_URL"] = upstream
+    os.environ["SCOUTING_REFRESH_INTERVAL"] = "0"
+    os.environ["SCOUTING_PREFETCH_INTERVAL"] = "0"
+    os.environ.pop("SCOUTING_HOME_TEAM", None)
+
+
+def timed(fn, repeat: int) -> list:
+    """Milliseconds per call, one sample per call."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def peak_kib(fn) -> float:
+    tracemalloc.start()
+    try:
+        kept = fn()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    del kept
+    return peak / 1024
+
+
+def percentile(samples: list, q: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+
+# Parsers
+
+def parse_cases() -> dict:
+    """name -> zero-argument call that parses one fixture the way the loaders do."""
+    from app.espn import GameSummary, box_score, iter_plays, play_by_play_teams
+    from app.four_factors import compute_four_factors
+    from app.player_page import parse_player_page
+    from app.roster import parse_roster
+    from app.school_stats import parse_school_stats
+    from app.scraper import clean_schedule_data, parse_schedule
+    from app.splits import SeasonSplits
+
+    player = read_fixture("player.html.gz")
+    school_stats = read_fixture("school-stats.html.gz")
+    opponent_stats = read_fixture("opponent-stats.html.gz")
+    team_season = read_fixture("team-season.html.gz")
+    schedule = read_fixture("schedule.html.gz")
+    summary = read_fixture("summary-conference.json.gz")
+    nba_summary = read_fixture("summary-nba.json.gz")
+    game = GameSummary("401600001", "ncaab", json.loads(summary))
+    teams = play_by_play_teams(game.data)
+    school_table = parse_school_stats("2024", school_stats)
+    opponent_table = parse_school_stats("2024", opponent_stats, "basic_opp_stats")
+
+    return {
+        "player_page": lambda: parse_player_page("zach-edey-1", player),
+        "school_stats": lambda: parse_school_stats("2024", school_stats),
+        "roster": lambda: parse_roster(team_season),
+        "schedule": lambda: clean_schedule_data(parse_schedule(schedule, "ncaab"), 2024),
+        "summary_json": lambda: json.loads(summary),
+        "summary_json_nba": lambda: json.loads(nba_summary),
+        "box_score": lambda: box_score(game),
+        "play_by_play": lambda: list(iter_plays(game.data, teams)),
+        "four_factors": lambda: compute_four_factors(school_table, opponent_table),
+        "splits_ingest": lambda: SeasonSplits("san-diego-state", 21, "2024").ingest("401600001", game.data, True),
+    }
+
+
+def bench_parsers(repeat: int) -> dict:
+    results = {}
+    for name, fn in parse_cases().items():
+        fn()  # warm up imports and regex caches
+        samples = timed(fn, repeat)
+        results[f"parse.{name}.best_ms"] = min(samples)
+        results[f"parse.{name}.peak_kib"] = peak_kib(fn)
+    return results
+
+
+# Endpoints
+
+# name -> (URL for the i-th cold sample, cold samples). Each cold sample asks for
+# something not fetched yet, so it goes through the stub; the warm samples then
+# repeat the first URL.
+ENDPOINTS = {
+    "player_season": (lambda i: f"/players/bench-{chr(97 + i)}-1/season/2024", 8),
+    "career_totals": (lambda i: f"/players/bench-{chr(97 + i)}-2/career_totals", 8),
+    "season_teams": (lambda i: f"/seasons/{2001 + i}/teams", 5),
+    "team_season": (lambda i: f"/teams/kansas/season/{2006 + i}", 5),
+    "roster": (lambda i: f"/teams/purdue/roster/{2011 + i}", 3),
+    "schedule": (lambda i: f"/team-schedule/?team={['sdsu', 'unlv', 'gonzaga', 'kansas', 'purdue'][i]}&league=ncaab", 5),
+    "box_score": (lambda i: f"/ncaab/game/{401700001 + i}", 10),
+    "play_by_play": (lambda i: f"/playbyplay/?gameId={401710001 + i}", 10),
+    "splits": (lambda i: f"/teams/san-diego-state/splits/{2019 + i}", 3),
+    "four_factors": (lambda i: f"/seasons/{1991 + i}/four-factors", 3),
+    "similar": (lambda i: f"/players/bench-{chr(97 + i)}-3/similar", 3),
+}
+
+
+async def bench_endpoints(warm_requests: int, concurrency: int, bursts: int, only: set = None) -> dict:
+    import httpx
+
+    from app.http_client import close_client
+    from app.main import app
+
+    results = {}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def get(url: str) -> float:
+            start = time.perf_counter()
+            response = await client.get(url)
+            elapsed = (time.perf_counter() - start) * 1000
+            if response.status_code != 200:
+                raise RuntimeError(f"{url} returned {response.status_code}: {response.text[:200]}")
+            return elapsed
+
+        for name, (url_for, cold_samples) in ENDPOINTS.items():
+            if only and name not in only:
+                continue
+            cold = [await get(url_for(i)) for i in range(cold_samples)]
+            warm = [await get(url_for(0)) for _ in range(warm_requests)]
+
+            semaphore = asyncio.Semaphore(concurrency)
+
+            async def limited():
+                async with semaphore:
+                    await get(url_for(0))
+
+            throughput = []
+            for _ in range(bursts):
+                start = time.perf_counter()
+                await asyncio.gather(*(limited() for _ in range(warm_requests)))
+                throughput.append(warm_requests / (time.perf_counter() - start))
+
+            results[f"e2e.{name}.cold_p50_ms"] = percentile(cold, 0.5)
+            results[f"e2e.{name}.warm_p50_ms"] = percentile(warm, 0.5)
+            results[f"e2e.{name}.warm_p95_ms"] = percentile(warm, 0.95)
+            results[f"e2e.{name}.warm_rps"] = statistics.median(throughput)
+    await close_client()
+    results["e2e.max_rss_mib"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return results
+
+
+# Baselines
+
+def measure(metric: str) -> str:
+    return metric.rsplit(".", 1)[-1]
+
+
+def regressions(results: dict, baseline: dict, scale: float = 1.0) -> dict:
+    """metric -> relative change, for metrics worse than their threshold.
+
+    Timings are first scaled by how much faster or slower the machine ran the
+    calibration workload than when the baseline was saved.
+    """
+    speed = 1.0
+    if baseline.get(CALIBRATION) and results.get(CALIBRATION):
+        speed = baseline[CALIBRATION] / results[CALIBRATION]
+    found = {}
+    for metric, value in results.items():
+        base = baseline.get(metric)
+        if metric.endswith("_ms"):
+            value *= speed
+        elif metric.endswith("_rps"):
+            value /= speed
+        kind = measure(metric)
+        if not base or kind not in THRESHOLDS:
+            continue
+        change = (value - base) / base
+        if kind in HIGHER_IS_BETTER:
+            change = -change
+        elif kind.endswith("_ms") and value - base < NOISE_FLOOR_MS:
+            continue
+        if change > THRESHOLDS[kind] * scale:
+            found[metric] = change
+    return found
+
+
+def report(results: dict, baseline: dict, failed: dict):
+    print(f"{'metric':44} {'baseline':>10} {'current':>10} {'change':>8}")
+    for metric, value in results.items():
+        base = baseline.get(metric)
+        change = f"{(value - base) / base:+8.1%}" if base else ""
+        flag = "  REGRESSION" if metric in failed else ""
+        shown = f"{base:10.2f}" if base is not None else f"{'-':>10}"
+        print(f"{metric:44} {shown} {value:10.2f} {change:>8}{flag}")
+
+
+def measure_once(args) -> dict:
+    """One full measurement in this process, with a fresh stub and cache dir."""
+    upstream = stub_server.start(latency=args.latency / 1000)
+    cache_dir = tempfile.mkdtemp(prefix="scouting-bench-")
+    configure(upstream.url, cache_dir)
+
+    from app import ratelimit
+    ratelimit.HOST_LIMITS[upstream.server_address[0]] = (1000.0, 1000)  # the stub has no rate limit to respect
+
+    repeat, warm_requests, bursts = (5, 20, 1) if args.quick else (30, 100, 5)
+    before = calibrate()
+    results = bench_parsers(repeat)
+    results.update(asyncio.run(bench_endpoints(warm_requests, concurrency=8, bursts=bursts,
+                                                 only=set(args.only or ()))))
+    results[CALIBRATION] = min(before, calibrate())
+    upstream.shutdown()
+    shutil.rmtree(cache_dir, ignore_errors=True)
+    return results
+
+
+def median_of_runs(args) -> dict:
+    """Per-metric median of `args.runs` measurements, each in a fresh interpreter so cold stays cold.
+
+    Each run's timings are first rescaled to the median calibration, so a run
+    on a momentarily slower machine doesn't drag the median.
+    """
+    runs = []
+    for i in range(args.runs):
+        with tempfile.NamedTemporaryFile(suffix=".json") as out:
+            command = [sys.executable, "-m", "bench.suite", "--runs", "1", "--measure-only", "--json", out.name,
+                       "--latency", str(args.latency)]
+            if args.only:
+                command += ["--only", *args.only]
+            subprocess.run(command, check=True, cwd=os.path.dirname(os.path.dirname(BASELINE_FILE)))
+            runs.append(json.load(out))
+        print(f"run {i + 1}/{args.runs} done", file=sys.stderr)
+
+    calibration = statistics.median(run[CALIBRATION] for run in runs)
+    results = {}
+    for metric in runs[0]:
+        values = []
+        for run in runs:
+            speed = calibration / run[CALIBRATION]
+            if metric.endswith("_ms") and metric != CALIBRATION:
+                values.append(run[metric] * speed)
+            elif metric.endswith("_rps"):
+                values.append(run[metric] / speed)
+            else:
+                values.append(run[metric])
+        results[metric] = statistics.median(values)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--save", action="store_true", help="write the results as the new baseline")
+    parser.add_argument("--quick", action="store_true", help="fewer repetitions, report only")
+    parser.add_argument("--baseline", default=BASELINE_FILE)
+    parser.add_argument("--threshold-scale", type=float, default=1.0, help="multiply every threshold, e.g. 2 on noisy CI")
+    parser.add_argument("--latency", type=float, default=0.0, help="ms the stub upstream adds to each response")
+    parser.add_argument("--only", nargs="*", help="endpoint names to run (default: all)")
+    parser.add_argument("--json", help="also write the results to this file")
+    parser.add_argument("--runs", type=int, default=3, help="compare the median of this many full runs")
+    parser.add_argument("--measure-only", action="store_true", help=argparse.SUPPRESS)  # one run of median_of_runs
+    args = parser.parse_args()
+    if args.save and args.quick:
+        parser.error("--quick results are too noisy to save as a baseline")
+
+    results = measure_once(args) if args.quick or args.runs <= 1 else median_of_runs(args)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+    if args.measure_only:
+        return 0
+    if args.quick:
+        report(results, {}, {})
+        return 0
+    if args.save:
+        with open(args.baseline, "w") as f:
+            json.dump({metric: round(value, 3) for metric, value in results.items()}, f, indent=2)
+            f.write("\n")
+        report(results, {}, {})
+        print(f"Saved baseline to {args.baseline}")
+        return 0
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    failed = regressions(results, baseline, args.threshold_scale)
+    report(results, baseline, failed)
+    if failed:
+        print(f"{len(failed)} regression(s) beyond threshold")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,94 @@
+"""Rebuild app/data/teams.json, the offline team resolver data.
+
+Needs network access and pandas/lxml. Run from the repo root:
+
+    python -m scripts.build_team_index 2025
+
+Merges three sources by normalized school name:
+  - Wikipedia's list of Division I programs (school name, nickname, conference)
+  - the sports-reference school-stats page for the season (slug, display name)
+  - ESPN's team list (id, abbreviation, display name, mascot)
+Hand-maintained aliases already in the file are kept.
+"""
+import json
+import re
+import sys
+
+import httpx
+import pandas as pd
+
+from app.school_stats import SCHOOL_STATS_URL, parse_school_stats
+from app.search_index import normalize
+from app.teams import TEAMS_FILE
+
+WIKIPEDIA_URL = "https://en.wikipedia.org/wiki/List_of_NCAA_Division_I_men%27s_basketball_programs"
+ESPN_TEAMS_URL = "https://site.api.espn.com/apis/site/v2/sports/basketball/mens-college-basketball/teams?limit=500"
+HEADERS = {"User-Agent": "Mozilla/5.0 (AztecBBallScouting team index builder)"}
+
+
+def short_name(wikipedia_name: str) -> str:
+    return normalize(re.sub(r"^(The )?University of |( University| College)$", "", wikipedia_name))
+
+
+def load_wikipedia() -> list:
+    html = httpx.get(WIKIPEDIA_URL, headers=HEADERS, timeout=30).text
+    df = pd.read_html(html, attrs={"class": "wikitable"})[0]
+    df["School"] = (df["School"]
+        .str.replace(r"\s*\([^)]*\)", "", regex=True)  # remove the parenthetical stuff
+        .str.replace(r"\[.*?\]", "", regex=True)  # remove the bracketed stuff (footnotes)
+        .str.strip())
+    rows = []
+    for _, row in df.iterrows():
+        rows.append({
+            "wikipedia_name": row["School"],
+            "nickname": row.get("Nickname") if isinstance(row.get("Nickname"), str) else None,
+            "conference": row.get("Conference") if isinstance(row.get("Conference"), str) else None,
+        })
+    return rows
+
+
+def load_espn() -> list:
+    data = httpx.get(ESPN_TEAMS_URL, headers=HEADERS, timeout=30).json()
+    teams = data["sports"][0]["leagues"][0]["teams"]
+    return [t["team"] for t in teams]
+
+
+def main(season: str):
+    with open(TEAMS_FILE, encoding="utf-8") as f:
+        existing = {team["id"]: team for team in json.load(f)["teams"]}
+
+    html = httpx.get(SCHOOL_STATS_URL.format(season=season), headers=HEADERS, timeout=30).text
+    sref = parse_school_stats(season, html)
+    espn = {normalize(t["location"]): t for t in load_espn()}
+    wiki = {}
+    for row in load_wikipedia():
+        wiki[short_name(row["wikipedia_name"])] = row
+
+    teams = []
+    for name, slug in zip(sref.names, sref.slugs):
+        if not slug:
+            continue
+        key = normalize(name)
+        team = dict(existing.get(slug, {"id": slug, "aliases": []}))
+        team.update({"name": team.get("name") or name, "sref_slug": slug})
+        espn_team = espn.get(key)
+        if espn_team:
+            team["espn_id"] = int(espn_team["id"])
+            team["espn_abbr"] = espn_team.get("abbreviation")
+            team["nickname"] = team.get("nickname") or espn_team.get("name")
+        wiki_row = wiki.get(key)
+        if wiki_row:
+            team["wikipedia_name"] = wiki_row["wikipedia_name"]
+            team["nickname"] = team.get("nickname") or wiki_row["nickname"]
+            team["conference"] = team.get("conference") or wiki_row["conference"]
+        for field in ("wikipedia_name", "espn_id", "espn_abbr", "nickname", "conference"):
+            team.setdefault(field, None)
+        teams.append(team)
+
+    with open(TEAMS_FILE, "w", encoding="utf-8") as f:
+        json.dump({"source": f"built for {season}", "teams": teams}, f, indent=1, ensure_ascii=False)
+    print(f"Wrote {len(teams)} teams to {TEAMS_FILE}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1] if len(sys.argv) > 1 else "2025")